@@ -5,48 +5,46 @@ import signal
 
 # from importlib import resources
 from functools import partial
-from pandas import ExcelFile
-from openpyxl import load_workbook
 
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
 from defs.dotDict import DotDict
-from defs.globalVars import LOGFILE_NAME
-from defs.parsers import parsePassLevel
+from defs.globalVars import LOGFILE_NAME, LOG_FORMAT, LOG_DATE_FORMAT
+from defs.parsers import parsePassLevel, parseBackend, parseInventory, parseBreakerMode, parseCommandTimeouts
 from defs.functions import getInputFilePath, getLabelsDir, getOutputDir, getLoggingFileHandler
 
 from autoTest import IPMIAutoTest
+from testPlan import loadTestPlan
+from fleet import runFleet
 from argParser import IPMIAutoTestParser
 
 def exit_gracefully(logger: logging.Logger, sig: int, frame) -> None:
-    logger.info('Program terminated')
-    logging.shutdown()
-    os.remove(os.path.join(os.path.dirname(os.path.realpath(__file__)), LOGFILE_NAME))
-    sys.exit(0)
+    # finished rows are already in the run journal, the log is kept for the resumed run to append to.
+    # Handlers stay open: SystemExit unwinds runTest's finally, which still logs, logging.shutdown() runs at exit
+    logger.info('Program terminated, run again with --resume to continue from the last finished row')
+    sys.exit(130)
 
 if __name__ == '__main__':
     parser = IPMIAutoTestParser()
     args = parser.parse_args()
+    if args.inventory and not args.is_out_of_band:
+        parser.error("--inventory tests BMCs over the network, add -I (out-of-band)")
 
     logging.basicConfig(
         level=logging.DEBUG, 
-        format="[%(asctime)s][%(name)-5s][%(levelname)-5s] %(message)s (%(filename)s:%(lineno)d)",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=getLoggingFileHandler(os.path.dirname(os.path.realpath(__file__))),
+        format=LOG_FORMAT,
+        datefmt=LOG_DATE_FORMAT,
+        handlers=getLoggingFileHandler(os.path.dirname(os.path.realpath(__file__)), mode='a' if args.resume else 'w'),
     )
 
     signal.signal(signal.SIGINT, partial(exit_gracefully, logging.getLogger('main')))
 
-    excelFile = ExcelFile(getInputFilePath(args.project_name))
-    workBook = load_workbook(getInputFilePath(args.project_name))
-    # with resources.path(f'project.{args.project_name}', f'{args.project_name}.xlsx') as inputFilePath:
-    #     excelFile = ExcelFile(inputFilePath)
-    #     workBook = load_workbook(inputFilePath)
     projectConfig = DotDict({
         "projectName": args.project_name,
         "passLevel": parsePassLevel(args.pass_level),
         "ip": args.ip,
         "cypherSuite": args.cypher_suite,
+        "port": args.port,
         "userName": args.user_name,
         "password": args.password,
         "hardwareVersion": args.hardware_version,
@@ -54,13 +52,74 @@ if __name__ == '__main__':
         "tester": args.tester
     })
 
+    commandPolicy = DotDict({
+        "timeout": args.timeout,
+        "commandTimeouts": parseCommandTimeouts(args.command_timeout),
+        "retries": args.retries,
+        "breakerThreshold": args.breaker_threshold,
+        "breakerCooldown": args.breaker_cooldown,
+        "breakerMode": parseBreakerMode(args.breaker_mode)
+    })
+
+    if args.inventory:
+        projectConfigs = [
+            DotDict({**projectConfig, **{key: value for key, value in host.items() if value is not None}})
+            for host in parseInventory(args.inventory)
+        ]
+        options = DotDict({
+            "projectName": args.project_name,
+            "labelsDir": getLabelsDir(args.project_name),
+            "outputDir": getOutputDir(args.output_directory, args.project_name),
+            "isOutOfBand": args.is_out_of_band,
+            "backend": parseBackend(args.backend),
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "responseCache": not args.no_response_cache,
+            "resultsDb": args.results_db,
+            "resume": args.resume,
+            "profile": args.profile,
+            "commandPolicy": commandPolicy,
+            "logFailedRowsOnly": args.log_failed_rows_only,
+            "resultStreams": args.result_streams,
+            "testPlan": loadTestPlan(getInputFilePath(args.project_name), getLabelsDir(args.project_name)),
+            "tasks": {
+                "doRawAvailabilityTest": args.raw_availability_test,
+                "doRawFunctionalTest": args.raw_functional_test,
+                "doFruTest": args.fru,
+                "doSensorTest": args.sensor
+            }
+        })
+
+        summaryPath = runFleet(projectConfigs, options, parallel=args.parallel)
+        logging.shutdown()
+        os.rename(
+            os.path.join(os.path.dirname(os.path.realpath(__file__)), LOGFILE_NAME),
+            summaryPath.replace('.xlsx', '.log')
+        )
+        sys.exit(0)
+
+    testPlan = loadTestPlan(getInputFilePath(args.project_name), getLabelsDir(args.project_name))
+    # with resources.path(f'project.{args.project_name}', f'{args.project_name}.xlsx') as inputFilePath:
+    #     excelFile = ExcelFile(inputFilePath)
+    #     workBook = load_workbook(inputFilePath)
+
     testRoutine = IPMIAutoTest(
-        excelFile, 
-        workBook,
+        testPlan, 
+        getInputFilePath(args.project_name),
         projectConfig = projectConfig,
         labelsDir=getLabelsDir(args.project_name),
         outputDir=getOutputDir(args.output_directory, args.project_name), 
         isOutOfBand=args.is_out_of_band,
+        backend=parseBackend(args.backend),
+        concurrency=args.concurrency,
+        workers=args.workers,
+        responseCache=not args.no_response_cache,
+        resultsDb=args.results_db,
+        resume=args.resume,
+        profile=args.profile,
+        commandPolicy=commandPolicy,
+        logFailedRowsOnly=args.log_failed_rows_only,
+        resultStreams=args.result_streams,
         doRawAvailabilityTest=args.raw_availability_test,
         doRawFunctionalTest=args.raw_functional_test,
         doFruTest=args.fru,
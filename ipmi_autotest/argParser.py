@@ -1,7 +1,8 @@
 import argparse
 import os
 
-from defs.enums import PassLevel
+from defs.enums import PassLevel, Backend, BreakerMode
+from defs.globalVars import COMMAND_TIMEOUT, COMMAND_RETRIES, BREAKER_THRESHOLD, BREAKER_COOLDOWN
 
 def IPMIAutoTestParser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
@@ -26,18 +27,39 @@ def IPMIAutoTestParser() -> argparse.ArgumentParser:
                 I: ignored
             '''
     )
-    parser.add_argument(
+    hosts = parser.add_mutually_exclusive_group(required=True)
+    hosts.add_argument(
         '-H', '--ip',
         type=str,
-        required=True,
         help='BMC IP Address'
     )
+    hosts.add_argument(
+        '--inventory',
+        type=os.path.abspath,
+        help=
+            '''
+                Fleet mode: file listing one BMC per line as <ip>[,<user name>,<password>[,<cypher suite>[,<port>]]].
+                Every BMC is tested out-of-band (-I) in its own worker process with its own workbook copy and log file.
+            '''
+    )
+    parser.add_argument(
+        '--parallel',
+        type=int,
+        default=4,
+        help='Fleet mode: number of BMCs tested at the same time'
+    )
     parser.add_argument(
         '-C', '--cypher_suite',
         type=int,
         default=17,
         help='Cypher Suite Used By ipmitool'
     )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=623,
+        help='RMCP Port Of BMC'
+    )
     parser.add_argument(
         '-U', '--user-name',
         type=str,
@@ -57,11 +79,113 @@ def IPMIAutoTestParser() -> argparse.ArgumentParser:
         type=os.path.abspath,
         help='Ouput Excel Path'
     )
+    parser.add_argument(
+        '--result-streams',
+        nargs='+',
+        choices=['csv', 'jsonl'],
+        default=[],
+        help='Also stream every result cell to CSV / JSON Lines files next to the output Excel'
+    )
     parser.add_argument(
         '-I', '--is-out-of-band',
         action='store_true',
         help='Toggle Out-of-band / In-band'
     )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=[backend.value for backend in Backend],
+        default=Backend.SUBPROCESS.value,
+        help=
+            '''
+                How commands are sent to the BMC.
+                subprocess: spawn a new ipmitool process for every command
+                shell: keep one ipmitool process (and lanplus session) alive for the whole run
+                lanplus: built-in RMCP+ client, keeps one session open without spawning ipmitool for raw commands (out-of-band only)
+            '''
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Max in-flight availability probes per BMC, each with its own ipmitool process / session'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Functional tests run concurrently; tests declaring BMC resources (e.g. power state) lock them, read-only tests wait for power and BMC reset tests, tests declaring none run alone'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=COMMAND_TIMEOUT,
+        help='Seconds an ipmitool command may take before it is killed and counted as a timeout'
+    )
+    parser.add_argument(
+        '--command-timeout',
+        type=str,
+        nargs='+',
+        default=[],
+        metavar='COMMAND=SECONDS',
+        help="Per-command timeouts overriding --timeout, by NetFn/CMD or ipmitool subcommand, e.g. '0x0a 0x11=10' 'sdr=300'"
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=COMMAND_RETRIES,
+        help='Retries of a command that timed out or got no answer, with exponential backoff and jitter'
+    )
+    parser.add_argument(
+        '--breaker-threshold',
+        type=int,
+        default=BREAKER_THRESHOLD,
+        help='Consecutive timeouts / no answers after which the BMC is considered down (0 disables the circuit breaker)'
+    )
+    parser.add_argument(
+        '--breaker-cooldown',
+        type=float,
+        default=BREAKER_COOLDOWN,
+        help='Seconds between reprobes (Get Device ID) of a BMC considered down'
+    )
+    parser.add_argument(
+        '--breaker-mode',
+        type=str,
+        choices=[breakerMode.value for breakerMode in BreakerMode],
+        default=BreakerMode.FAIL.value,
+        help=
+            '''
+                What happens to the remaining commands while the BMC is considered down.
+                fail: fail them fast, until a reprobe gets an answer
+                pause: wait for the BMC to come back, reprobing every cooldown (up to 10 minutes)
+            '''
+    )
+    parser.add_argument(
+        '--no-response-cache',
+        action='store_true',
+        help='Send every request to the BMC, instead of reusing the responses of idempotent (Get) commands within the run'
+    )
+    parser.add_argument(
+        '--results-db',
+        type=str,
+        default=None,
+        help='(Optional) SQLite database the results and requests of the run are added to, see resultsStore'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted run from its journal (<output directory>/<project>/<project>_<IB|OOB>.journal.jsonl), skipping finished rows'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile the run: <name>.prof (cProfile), <name>.collapsed (flamegraph input) and <name>.profile.txt (time per component, hot functions) next to the output'
+    )
+    parser.add_argument(
+        '--log-failed-rows-only',
+        action='store_true',
+        help='Keep the DEBUG log lines of each functional test row in a ring buffer and only write them to the log for failed or partial-match rows'
+    )
     parser.add_argument(
         '-A', '--raw-availability-test',
         action='store_true',
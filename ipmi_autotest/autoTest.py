@@ -1,74 +1,151 @@
 import os
-import json
-import subprocess
 import logging
+import time
+import threading
 
-from importlib import import_module
 from datetime import datetime
-from typing import Tuple, Dict, Union
+from typing import Callable, ContextManager, Tuple, Dict, List, Union
+
+import pandas as pd
 
 from tqdm import tqdm
-from pandas import ExcelFile
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill
-from openpyxl.worksheet.worksheet import Worksheet
 
 from defs.dotDict import DotDict
-from defs.globalVars import GREEN_FILL, DARK_GREEN_FILL, YELLOW_FILL, RED_FILL, LOGFILE_NAME
-from defs.enums import AutoTestType, CommandStatus, Result, PassLevel, VerificationType
-from defs.parsers import parseNetFn, parseCmd, parseVerificationType, parseRawFunctionName
-from defs.functions import isWorkSheetColEmpty, getAccuracyMetric, getProjectConfigLogs
+from defs.globalVars import GREEN_FILL, DARK_GREEN_FILL, YELLOW_FILL, RED_FILL, LOGFILE_NAME, RAW_BATCH_SIZE, SENSOR_THRESHOLD
+from defs.globalVars import COMMAND_TIMEOUT, COMMAND_TIMEOUTS, COMMAND_RETRIES, BREAKER_THRESHOLD, BREAKER_COOLDOWN, LOG_RING_SIZE
+from defs.parsers import parseSensorList
+from defs.enums import AutoTestType, CommandStatus, Result, PassLevel, VerificationType, Backend, BreakerMode
+from defs.functions import getAccuracyMetric, getProjectConfigLogs, getHostDirName
+from defs.logHandlers import RowLogBuffer
+from backends import getCommandBackend, CommandBackend, AsyncCommandEngine, ResilientBackend, CircuitBreaker, isAnswered
+from rmcp.probe import probeBmc
+from testPlan import TestPlan, RawCommand, FruRow
+from labelStore import LabelStore
+from registry import TestCaseRegistry
+from responseCache import ResponseCache
+from resultsStore import ResultsStore
+from journal import RunJournal
+from sdrCache import SdrCache
+from timing import TimingRecorder
+from profiler import RunProfiler
+from fru import FruReader, FRU_TAG_ALIASES
+from scheduler import TestScheduler
+from base import TestCase
+from resultWriter import ResultSink
+
+ATTEMPT_COLUMNS = ['Phase', 'Command', 'Attempt', 'Outcome', 'Elapsed (ms)', 'Backoff (ms)']
 
 class IPMIAutoTest:
     def __init__(
         self, 
-        excelFile: ExcelFile, 
-        workBook: Workbook, 
+        testPlan: TestPlan, 
+        inputFilePath: str, 
         projectConfig: DotDict,
         labelsDir: str,
         outputDir: str, 
         isOutOfBand: bool=False,
+        backend: Backend=Backend.SUBPROCESS,
+        logFilePath: str=None,
+        showProgress: bool=True,
+        concurrency: int=1,
+        workers: int=1,
+        resultStreams: List[str]=None,
+        responseCache: bool=True,
+        resultsDb: str=None,
+        resume: bool=False,
+        profile: bool=False,
+        commandPolicy: DotDict=None,
+        logFailedRowsOnly: bool=False,
         **kwargs: Dict[str, bool]    # doRawAvailabilityTest, doRawFunctionalTest, doFruTest, doSensorTest
     ) -> None:
-        self.excelFile = excelFile
-        self.workBook = workBook
+        self.testPlan = testPlan
+        self.labelStore = LabelStore(testPlan.labelFiles)     # every labels json is loaded and indexed once, shared by all test cases
+        self.registry = TestCaseRegistry(projectConfig.projectName)
+        self.responseCache = ResponseCache(projectConfig.ip, testPlan.rawCommands, enabled=responseCache)
+        self.resultsStore = ResultsStore(resultsDb) if resultsDb else None
+        self.inputFilePath = inputFilePath
         self.projectConfig = projectConfig
         self.labelsDir = os.path.abspath(labelsDir)
         self.outputDir = os.path.abspath(outputDir)
         self.isOutOfBand = isOutOfBand
+        self.logFilePath = logFilePath or os.path.join(os.path.dirname(os.path.realpath(__file__)), LOGFILE_NAME)
+        self.showProgress = showProgress
         self.tasks = DotDict(kwargs)
+        self.outputPath = None
+        self.profiler = RunProfiler() if profile else None
+        self.rowLogs = RowLogBuffer(LOG_RING_SIZE) if logFailedRowsOnly else None
 
         self.time = datetime.now().strftime("%Y-%b-%d_%H-%M")
         self.logger = logging.getLogger(f'main.{self.__str__()}')
 
-        if isOutOfBand:
-            self.__commandTemplate = f"ipmitool -C {self.projectConfig.cypherSuite} -I lanplus -H {self.projectConfig.ip} -U {self.projectConfig.userName} -P {self.projectConfig.password}"
-        else:
-            self.__commandTemplate = f"ipmitool{' -I wmi' if os.name == 'nt' else ''}"
+        self.resultSink = ResultSink(
+            columnNames={
+                'Raw CMD': {colNum: label for label, colNum in testPlan.rawCommandColumns.items()},
+                'Sensor Info': {colNum: label for label, colNum in testPlan.sensorColumns.items()},
+                'Fru Info': {colNum: label for label, colNum in testPlan.fruColumns.items()}
+            },
+            streamPaths={
+                format: os.path.join(self.outputDir, self.time, f'{self.__getOutputName()}.{format}')
+                for format in resultStreams or []
+            }
+        )
+
+        self.backendType = backend
+        self.transport = f"{'OOB' if isOutOfBand else 'IB'}/{backend.value}"
+        self.timing = TimingRecorder({(int(rawCommand.netfn, 0), int(rawCommand.cmd, 0)): rawCommand.functionName for rawCommand in testPlan.rawCommands})
+
+        # timeouts, retries and the circuit breaker shared by every backend of the run, see ResilientBackend
+        self.commandPolicy = DotDict({
+            "timeout": COMMAND_TIMEOUT,
+            "commandTimeouts": {},
+            "retries": COMMAND_RETRIES,
+            "breakerThreshold": BREAKER_THRESHOLD,
+            "breakerCooldown": BREAKER_COOLDOWN,
+            "breakerMode": BreakerMode.FAIL,
+            **{key: value for key, value in (commandPolicy or {}).items() if value is not None}
+        })
+        self.breaker = CircuitBreaker(self.commandPolicy.breakerThreshold, self.commandPolicy.breakerCooldown, self.commandPolicy.breakerMode)
+        self.attempts: List[DotDict] = []
+        self.__attemptsLock = threading.Lock()
+        self.backendFactory = self.__createBackend
+        self.backend = self.backendFactory()
+        self.asyncEngine = None
+        if concurrency > 1:
+            self.asyncEngine = AsyncCommandEngine(self.backendFactory, concurrency)
+
+        # functional test workers get their own backend (ipmitool process / session), see __startWorker
+        self.workers = workers
+        self.__local = threading.local()
+        self.__workerBackends = []
+        self.__workerBackendsLock = threading.Lock()
+
+        # finished rows are checkpointed as the run goes, --resume skips them after an interruption
+        self.journal = RunJournal(
+            os.path.join(self.outputDir, f'{self.__getOutputName()}.journal.jsonl'),
+            testPlan.workbookHash,
+            projectConfig.ip,
+            resume=resume
+        )
 
     def __str__(self) -> str:
         return 'IPMIAutoCommandTest'
     
     def __checkConnection(self) -> bool:
-        ping = subprocess.Popen(
-            f"ping {self.projectConfig.ip} {'-n' if os.name == 'nt' else '-c'} 4", 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE, 
-            universal_newlines=True,
-            shell=True
-        )
-
-        stdout, stderr = ping.communicate()
-
-        if "received, 100% packet loss" in stdout or "received, 100% packet loss" in stderr:
-            return False
+        '''
+            RMCP presence ping / Get Channel Authentication Capabilities instead of ICMP, see rmcp.probe
+        '''
+        probe = probeBmc(self.projectConfig.ip, self.projectConfig.port or 623)
+        if probe.reachable:
+            self.logger.debug("%s answered %s in %.1f ms", self.projectConfig.ip, probe.method, probe.elapsed * 1000)
+        else:
+            self.logger.debug(probe.error)
 
-        return True
+        return probe.reachable
     
     def __checkIPMIToolViability(self) -> Tuple[bool,str]:
         if self.isOutOfBand and not self.__checkConnection():
-            self.logger.error('PING FAIL')
-            return False, f"Unable to ping {self.projectConfig.ip}, make sure the connection is viable."
+            self.logger.error('RMCP PROBE FAIL')
+            return False, f"Unable to reach {self.projectConfig.ip} over RMCP (UDP port {self.projectConfig.port or 623}), make sure the connection is viable."
             
         _, stderr = self.__rawCommand()
         if 'Could not open device' in stderr:
@@ -77,24 +154,70 @@ class IPMIAutoTest:
             
         return True, None
     
+    def __getFunctionalCommands(self) -> List[RawCommand]:
+        return [
+            rawCommand for rawCommand in self.testPlan.rawCommands
+            if rawCommand.functionName not in ('Warm Reset', 'Cold Reset')    # TODO: handle rest function
+            and 'SOL' not in rawCommand.functionName    # TODO: handle sol
+        ]
+
+    def __checkTestCases(self) -> None:
+        '''
+            every functional row needs a registered test case (and labels for accuracy), checked before any BMC traffic
+        '''
+        rawCommands = self.__getFunctionalCommands()
+        problems = self.registry.bind(rawCommands)
+        for rawCommand in rawCommands:
+            if (rawCommand.testType != AutoTestType.AVAILABILITY.value and rawCommand.verificationType == VerificationType.ACCURACY
+                and rawCommand.testName not in self.labelStore):
+                problems.append(f"Row {rawCommand.rowNum} {rawCommand.functionName}: labels/{rawCommand.testName[0].lower() + rawCommand.testName[1:]}Labels.json not found")
+
+        if problems:
+            for problem in problems:
+                self.logger.error(problem)
+            raise Exception(f"{len(problems)} functional test(s) cannot run, see the log for details")
+
+    def __createBackend(self) -> CommandBackend:
+        backend = ResilientBackend(
+            getCommandBackend(self.backendType, self.projectConfig, self.isOutOfBand),
+            self.breaker,
+            retries=self.commandPolicy.retries,
+            onAttempts=self.__recordAttempts,
+            isIdempotent=self.responseCache.isIdempotentCommand
+        )
+        backend.setTimeouts(self.commandPolicy.timeout, {**COMMAND_TIMEOUTS, **self.commandPolicy.commandTimeouts})
+        return backend
+
+    def __getBackend(self) -> CommandBackend:
+        return getattr(self.__local, 'backend', self.backend)
+
+    def __startWorker(self) -> None:
+        '''
+            thread pool initializer of the scheduler, the subprocess backend keeps no state and is shared
+        '''
+        if self.backendType == Backend.SUBPROCESS:
+            return
+        backend = self.backendFactory()
+        self.__local.backend = backend
+        with self.__workerBackendsLock:
+            self.__workerBackends.append(backend)
+
     def __generalCommand(
         self, 
         cmdType: str="", 
         *args: Tuple[str]
     ) -> Tuple[str, str]:
-        shell = f"{self.__commandTemplate} {cmdType}".rstrip(" ")
-        for arg in args:
-            shell += f' {arg}'
-
-        res = subprocess.Popen(
-            shell,
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE, 
-            universal_newlines=True,
-            shell=True
-        )
-
-        return res.communicate()
+        start = time.perf_counter()
+        response = self.__getBackend().generalCommand(cmdType, *args)
+        elapsed = time.perf_counter() - start
+        if cmdType == "raw":
+            if args and args[0]:    # not the bare `ipmitool raw` of the viability check
+                self.__recordRequests([args], [response], elapsed)
+            self.responseCache.put(args, response)  # single raw commands (e.g. polling) always reach the BMC, but refresh the cache
+        else:
+            self.timing.recordCommand(cmdType, args, elapsed, self.transport)
+            self.responseCache.invalidateGeneralCommand(cmdType, args)
+        return response
 
     def __rawCommand(
         self, 
@@ -104,20 +227,119 @@ class IPMIAutoTest:
     ) -> Tuple[str, str]:
         return self.__generalCommand("raw", netfn, cmd, *args)
 
-    def __writeCell(
-        self, 
-        workSheet: Worksheet,
-        row: int, 
-        col: int, 
-        value: str="", 
-        fill: PatternFill=None
+    def __deadline(self, at: float) -> ContextManager[None]:
+        '''
+            caps the timeout of the commands the calling thread sends within the block and disables their retries, see TestCase.waitFor
+        '''
+        return self.__getBackend().deadline(at)
+
+    def __rawCommandBatch(
+        self,
+        requests: List[Tuple[str]]
+    ) -> List[Tuple[str, str]]:
+        responses, misses = self.responseCache.getMisses(requests)
+        self.__recordCachedRequests(requests, responses)
+        if misses:
+            start = time.perf_counter()
+            batch = [requests[i] for i in misses]
+            sent = self.__getBackend().rawCommandBatch(batch)
+            self.__recordRequests(batch, sent, time.perf_counter() - start)
+            for i, response in zip(misses, sent):
+                responses[i] = response
+                self.responseCache.put(requests[i], response)
+        return responses
+
+    def __recordRequests(
+        self,
+        requests: List[Tuple[str]],
+        responses: List[Tuple[str, str]],
+        elapsed: float,
+        transport: str=None
     ) -> None:
-        cell = workSheet.cell(row=row, column=col)
-        cell.value = value
-        if bool(fill): 
-            cell.fill = fill
+        self.timing.recordRequests(requests, elapsed, transport or self.transport)
+        if self.resultsStore is not None and requests:
+            self.resultsStore.recordRequests(requests, responses, elapsed)
+
+    def __recordAttempts(
+        self,
+        cmdType: str,
+        args: Tuple[str],
+        attempts: List[DotDict]
+    ) -> None:
+        '''
+            attempts of a request that was retried or got no answer, for the 'Attempts' sheet and the results database
+        '''
+        command = ' '.join([cmdType, *args])
+        phase = self.timing.currentPhase
+        self.logger.debug("%s: %s", command, ' -> '.join(attempt.outcome for attempt in attempts))
+        with self.__attemptsLock:
+            self.attempts += [DotDict({"phase": phase, "command": command, **attempt}) for attempt in attempts]
+        if self.resultsStore is not None:
+            self.resultsStore.recordAttempts(phase, command, attempts)
+
+    def __recordCachedRequests(
+        self,
+        requests: List[Tuple[str]],
+        responses: List[Tuple[str, str]]
+    ) -> None:
+        hits = [(request, response) for request, response in zip(requests, responses) if response is not None]
+        if hits:
+            self.timing.recordRequests([request for request, _ in hits], 0, self.transport, cached=True)
+            if self.resultsStore is not None:
+                self.resultsStore.recordRequests(*zip(*hits), 0, cached=True)
+
+    def __rawCommands(
+        self,
+        requests: List[Tuple[str]],
+        onResponses: Callable[[int, List[Tuple[str, str]]], None]=None
+    ) -> List[Tuple[str, str]]:
+        '''
+            sends independent read-only requests [(netfn, cmd, *data)] in batches, concurrently if --concurrency > 1
+            onResponses(offset, responses) is called as each chunk of requests is answered, e.g. to checkpoint them
+        '''
+        with tqdm(
+            desc='Testing...',
+            total=len(requests),
+            ncols=100,
+            leave=True,
+            disable=not self.showProgress
+        ) as progress:
+            chunkSize = RAW_BATCH_SIZE * (self.asyncEngine.concurrency if self.asyncEngine is not None else 1)
+            results = []
+            for offset in range(0, len(requests), chunkSize):
+                chunk = requests[offset:offset+chunkSize]
+                if self.asyncEngine is not None:
+                    responses = self.__rawCommandsAsync(chunk, progress)
+                else:
+                    responses = self.__rawCommandBatch(chunk)
+                    progress.update(len(chunk))
+
+                if onResponses is not None:
+                    onResponses(offset, responses)
+                results += responses
+            return results
+
+    def __rawCommandsAsync(
+        self,
+        requests: List[Tuple[str]],
+        progress: tqdm
+    ) -> List[Tuple[str, str]]:
+        responses, misses = self.responseCache.getMisses(requests)
+        self.__recordCachedRequests(requests, responses)
+        progress.update(len(requests) - len(misses))
+        batch = [requests[i] for i in misses]
+        sent = self.asyncEngine.rawCommands(
+            batch,
+            callback=progress.update,
+            batchSize=RAW_BATCH_SIZE,
+            onBatch=lambda requests, responses, elapsed: self.__recordRequests(requests, responses, elapsed, f'{self.transport}/async')
+        )
+        for i, response in zip(misses, sent):
+            responses[i] = response
+            self.responseCache.put(requests[i], response)
+        return responses
 
-    def __testSingleRawFunction(
+    def __createTestCase(
         self, 
         functionName: str, 
         netfn: str, 
@@ -125,14 +347,13 @@ class IPMIAutoTest:
         numData: int, 
         needVerify: bool=False,
         verificationType: str=None
-    ) -> Tuple[Union[int, Result], str]:
+    ) -> TestCase:
         labels = None
         if verificationType == VerificationType.ACCURACY:
-            labels = json.load(open(os.path.join(self.labelsDir, functionName[0].lower() + functionName[1:] + 'Labels.json'))).data
+            labels = self.labelStore.get(functionName)
         # labels = {parseLabelKey(key): value for key, value in labels.items()}
-        # module = globals()[f'test{functionName}']
-        module = import_module(f'projects.{self.projectConfig.projectName}.raw.test{functionName}')
-        testCase = getattr(module, f'Test{functionName}')(
+        testCaseClass = self.registry.getByCommand(netfn, cmd) or self.registry.get(functionName)
+        testCase = testCaseClass(
             self,
             netfn,
             cmd,
@@ -141,133 +362,226 @@ class IPMIAutoTest:
             labels=labels,
             verificationType=verificationType
         )
-        result, info = testCase.test()
 
-        return result, info
+        return testCase
 
     def runTest(self) -> None:
+        if self.profiler is not None:   # stopped however the run ends, saved with the output
+            self.profiler.start()
+        if self.rowLogs is not None:
+            self.rowLogs.install()
         self.logger.info(getProjectConfigLogs(self.projectConfig))
 
-        viable, res = self.__checkIPMIToolViability()
-        if not viable: raise Exception(res)
-
-        if self.tasks.doRawAvailabilityTest:
-            self.testRawAvailability()
-        if self.tasks.doRawFunctionalTest:
-            self.testRawFunction()
-        # if self.tasks.doFruTest:
-        #     self.testFru()
-        # if self.tasks.doSensorTest:
-        #     self.testSensor()
+        try:
+            if self.tasks.doRawFunctionalTest:
+                self.__checkTestCases()
+
+            viable, res = self.__checkIPMIToolViability()
+            if not viable: raise Exception(res)
+
+            if self.tasks.doRawAvailabilityTest:
+                with self.timing.phase('availability'):
+                    self.testRawAvailability()
+            if self.tasks.doRawFunctionalTest:
+                with self.timing.phase('function'):
+                    self.testRawFunction()
+            if self.tasks.doFruTest:
+                with self.timing.phase('fru'):
+                    self.testFru()
+            if self.tasks.doSensorTest:
+                with self.timing.phase('sensor'):
+                    self.testSensor()
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+            if self.responseCache.enabled:
+                self.logger.debug("Response cache: %s hits, %s misses", self.responseCache.hits, self.responseCache.misses)
+            self.backend.close()
+            if self.asyncEngine is not None:
+                self.asyncEngine.close()
+            for backend in self.__workerBackends:
+                backend.close()
+            self.journal.close()
+            if self.rowLogs is not None:
+                self.rowLogs.uninstall()
 
         self.saveOutput()
 
+    def __getOutputName(self) -> str:
+        mode = 'OOB' if self.isOutOfBand else 'IB'
+        return '_'.join([self.projectConfig.projectName, mode])
+
     def saveOutput(self) -> None:   # TODO
-        outputPath = os.path.join(self.outputDir, self.time)
+        outputPath = self.outputPath = os.path.join(self.outputDir, self.time)
         if not os.path.exists(outputPath):
             os.makedirs(outputPath)
 
-        mode = 'OOB' if self.isOutOfBand else 'IB'
-        fileName = '_'.join([self.projectConfig.projectName, mode]) + '.xlsx'
-
-        self.workBook.save(os.path.join(outputPath,  fileName))
-        self.logger.info(f"Result generated at {os.path.join(outputPath, fileName)}")
+        fileName = self.__getOutputName() + '.xlsx'
+
+        timing = self.timing.getSummary()
+        self.timing.save(os.path.join(outputPath, self.__getOutputName() + '.timing.json'), timing)
+
+        extraSheets = {'Timing': self.timing.getSheetRows(timing)}
+        if self.attempts:
+            extraSheets['Attempts'] = [ATTEMPT_COLUMNS] + [
+                [attempt.phase, attempt.command, attempt.attempt, attempt.outcome, attempt.elapsedMs, attempt.backoffMs]
+                for attempt in self.attempts
+            ]
+            self.logger.warning("%d attempts of requests that timed out, got no answer or were retried, see the 'Attempts' sheet", len(self.attempts))
+
+        self.resultSink.close()
+        self.resultSink.saveWorkbook(
+            self.inputFilePath,
+            os.path.join(outputPath, fileName),
+            self.testPlan.layouts,
+            extraSheets=extraSheets
+        )
+        self.journal.archive(outputPath)
+        self.logger.info("Result generated at %s", os.path.join(outputPath, fileName))
+        if self.resultsStore is not None:
+            runId = self.resultsStore.saveRun(
+                self.projectConfig,
+                'OOB' if self.isOutOfBand else 'IB',
+                self.__getResultRows(),
+                os.path.join(outputPath, fileName)
+            )
+            self.logger.info("Run %s saved to %s", runId, self.resultsStore.path)
+        if self.profiler is not None:
+            paths = self.profiler.save(outputPath, self.__getOutputName())
+            self.logger.info("Profile written to %s", ', '.join(paths))
         logging.shutdown()
         os.rename(
-            os.path.join(os.path.dirname(os.path.realpath(__file__)), LOGFILE_NAME),
+            self.logFilePath,
             os.path.join(outputPath, LOGFILE_NAME)
         )
 
+    def __getResultRows(self) -> List[Tuple]:
+        '''
+            the 'Raw CMD' results as (rowNum, functionName, netfn, cmd, availability, errorResponse, result, passLevel, info)
+        '''
+        columns = [
+            self.testPlan.rawCommandColumns[label] for label in (
+                'Availability (A: available/U: unavailable)',
+                'Error Response',
+                'Result (P: pass/F: fail/%: accuracy)',
+                'Pass Level (A: all match, P: partial match, I: ignored)',
+                'Info'
+            )
+        ]
+        return [
+            (
+                rawCommand.rowNum, rawCommand.functionName, rawCommand.netfn, rawCommand.cmd,
+                *(self.resultSink.get('Raw CMD', rawCommand.rowNum, colNum) for colNum in columns)
+            )
+            for rawCommand in self.testPlan.rawCommands
+        ]
+
+    def getSummary(self) -> DotDict:
+        '''
+            counts of the 'Raw CMD' results, used by fleet mode to merge the results of many BMCs
+        '''
+        cmdStatusColNum = self.testPlan.rawCommandColumns['Availability (A: available/U: unavailable)']
+        resultColNum = self.testPlan.rawCommandColumns['Result (P: pass/F: fail/%: accuracy)']
+
+        summary = DotDict({"available": 0, "unavailable": 0, "passed": 0, "failed": 0, "accuracy": 0})
+        for rawCommand in self.testPlan.rawCommands:
+            cmdStatus = self.resultSink.get('Raw CMD', rawCommand.rowNum, cmdStatusColNum)
+            result = self.resultSink.get('Raw CMD', rawCommand.rowNum, resultColNum)
+            if cmdStatus == CommandStatus.AVAILABLE.value:
+                summary.available += 1
+            elif cmdStatus == CommandStatus.UNAVAILABLE.value:
+                summary.unavailable += 1
+            if result == Result.PASS.value:
+                summary.passed += 1
+            elif result == Result.FAIL.value:
+                summary.failed += 1
+            elif isinstance(result, str) and result.endswith('%'):
+                summary.accuracy += 1
+
+        return summary
+
     def testRawAvailability(self):
         self.logger.info("===Testing Raw CMD Availability===")
-        rawCmdDf = self.excelFile.parse('Raw CMD', header=1)
-        rawCmdSheet = self.workBook['Raw CMD']
-
-        for row in rawCmdSheet.iter_rows(max_row=2, values_only=True):
-            labels = row
-        
-        supColNum = labels.index('Availability (A: available/U: unavailable)') + 1
-        resColNum = labels.index('Error Response') + 1
-
-        for functionName, netfn, cmd, isNan, rowNum in tqdm(
-            zip(
-                rawCmdDf['Function Name'],
-                rawCmdDf['NetFn'], 
-                rawCmdDf['CMD'], 
-                rawCmdDf['NetFn'].isnull(), 
-                range(3, len(rawCmdDf['NetFn'])+3)
-            ),
-            desc='Testing...',
-            total=len(rawCmdDf['NetFn']),
-            ncols=100,
-            leave=True
-        ):
-            if isNan:
-                continue
-            if functionName == 'Warm Reset' or functionName == 'Cold Reset':    # TODO: handle rest function
+
+        supColNum = self.testPlan.rawCommandColumns['Availability (A: available/U: unavailable)']
+        resColNum = self.testPlan.rawCommandColumns['Error Response']
+
+        requests, rowNums = [], []
+        for rawCommand in self.testPlan.rawCommands:
+            if rawCommand.functionName == 'Warm Reset' or rawCommand.functionName == 'Cold Reset':    # TODO: handle rest function
                 continue
-            if 'SOL' in functionName:    # TODO: handle sol
+            if 'SOL' in rawCommand.functionName:    # TODO: handle sol
                 continue
 
-            stdout, stderr = self.__rawCommand(
-                parseNetFn(netfn).value, 
-                parseCmd(cmd),
-            )
+            requests.append((rawCommand.netfn, rawCommand.cmd))
+            rowNums.append(rawCommand.rowNum)
+
+        # rows probed before an interruption are taken from the journal, unless the BMC did not answer them
+        pending = [i for i, rowNum in enumerate(rowNums) if rowNum not in self.journal.availability or not isAnswered(self.journal.availability[rowNum])]
+        pendingRowNums = [rowNums[i] for i in pending]
+        self.__rawCommands(
+            [requests[i] for i in pending],
+            onResponses=lambda offset, responses: self.journal.recordAvailability(pendingRowNums[offset:offset+len(responses)], responses)
+        )
+
+        # probes are read-only and independent, so they may run concurrently; results are written in row order
+        for rowNum in rowNums:
+            stdout, stderr = self.journal.availability[rowNum]
             self.logger.debug(stdout.rstrip("\n") if stdout else stderr.rstrip("\n"))
 
-            if 'Invalid command' in stderr or 'Unknown' in stderr:
-                self.__writeCell(rawCmdSheet, rowNum, supColNum, CommandStatus.UNAVAILABLE.value, RED_FILL)
-                self.__writeCell(rawCmdSheet, rowNum, resColNum, stderr)
+            if not isAnswered((stdout, stderr)):    # timed out or not sent (circuit open): neither available nor unavailable
+                self.resultSink.write('Raw CMD', rowNum, resColNum, stderr)
+            elif 'Invalid command' in stderr or 'Unknown' in stderr:
+                self.resultSink.write('Raw CMD', rowNum, supColNum, CommandStatus.UNAVAILABLE.value, RED_FILL)
+                self.resultSink.write('Raw CMD', rowNum, resColNum, stderr)
             else:
-                self.__writeCell(rawCmdSheet, rowNum, supColNum, CommandStatus.AVAILABLE.value, GREEN_FILL)
+                self.resultSink.write('Raw CMD', rowNum, supColNum, CommandStatus.AVAILABLE.value, GREEN_FILL)
 
     def testRawFunction(self):
-        rawCmdDf = self.excelFile.parse('Raw CMD', header=1)
-        rawCmdSheet = self.workBook['Raw CMD']
+        columns = self.testPlan.rawCommandColumns
 
-        for row in rawCmdSheet.iter_rows(max_row=2, values_only=True):
-            labels = row
+        cmdStatusColNum = columns['Availability (A: available/U: unavailable)']
+        resultInfoColNum = columns['Info']
+        resultColNum = columns['Result (P: pass/F: fail/%: accuracy)']
+        passColnum = columns['Pass Level (A: all match, P: partial match, I: ignored)']
 
-        cmdStatusColNum = labels.index('Availability (A: available/U: unavailable)') + 1
-        resultInfoColNum = labels.index('Info') + 1
-        resultColNum = labels.index('Result (P: pass/F: fail/%: accuracy)') + 1
-        passColnum = labels.index('Pass Level (A: all match, P: partial match, I: ignored)') + 1
-
-        if (isWorkSheetColEmpty(rawCmdSheet, 3, cmdStatusColNum)):
+        if (self.resultSink.isColumnEmpty('Raw CMD', cmdStatusColNum)):
             self.logger.info("IPMI availability not tested, proceed to test raw availability...")
             self.testRawAvailability()
 
         self.logger.info("===Testing Raw Function===")
 
-        for functionName, netfn, cmd, numData, testType, needVerify, verificationType, isNan, rowNum in tqdm(
-            zip(
-                rawCmdDf['Function Name'],
-                rawCmdDf['NetFn'], 
-                rawCmdDf['CMD'],
-                rawCmdDf['Request Length'],
-                rawCmdDf['Test Type (A: availability test/F: functional test)'],
-                rawCmdDf['Need Verify (Y: yes/N: no)'],
-                rawCmdDf['Verification Type (A: accuracy/B: behavior)'],
-                rawCmdDf['NetFn'].isnull(), 
-                range(3, len(rawCmdDf['Request Length'])+3)
-            ),
-            desc='Testing...',
-            total=len(rawCmdDf['Request Length']),
-            ncols=100,
-            leave=True
-        ):
-            if isNan:
-                continue
-            if functionName == 'Warm Reset' or functionName == 'Cold Reset':    # TODO: handle rest function
-                continue
-            if 'SOL' in functionName:    # TODO: handle sol
-                continue
-
-            cmdStatus = rawCmdSheet.cell(rowNum, cmdStatusColNum).value
+        rawCommands = self.__getFunctionalCommands()
+
+        # run the functional tests first (concurrently where their resources allow), then write every row in order
+        testCases = {
+            rawCommand.rowNum: self.__createTestCase(
+                rawCommand.testName,
+                rawCommand.netfn,
+                rawCommand.cmd,
+                rawCommand.numData,
+                needVerify=rawCommand.needVerify,
+                verificationType=rawCommand.verificationType
+            )
+            for rawCommand in rawCommands
+            if rawCommand.testType != AutoTestType.AVAILABILITY.value and rawCommand.rowNum not in self.journal.function
+        }
+        TestScheduler(
+            self.workers,
+            self.__startWorker,
+            self.showProgress,
+            rowContext=self.rowLogs.row if self.rowLogs is not None else None
+        ).run(testCases, onResult=self.__onFunctionResult)
+        testResults = self.journal.function
+
+        for rawCommand in rawCommands:
+            rowNum = rawCommand.rowNum
+            needVerify = rawCommand.needVerify
+            cmdStatus = self.resultSink.get('Raw CMD', rowNum, cmdStatusColNum)
 
             result = passLevel = resultColor = passLevelColor = None
 
-            if testType == AutoTestType.AVAILABILITY.value:
+            if rawCommand.testType == AutoTestType.AVAILABILITY.value:
                 if cmdStatus == None:
                     continue
                 elif cmdStatus == CommandStatus.UNAVAILABLE.value:
@@ -284,21 +598,14 @@ class IPMIAutoTest:
                         resultColor = GREEN_FILL
                         passLevelColor = DARK_GREEN_FILL
             else: # funcional Test
-                result, info = self.__testSingleRawFunction(
-                    parseRawFunctionName(functionName),
-                    parseNetFn(netfn).value,
-                    parseCmd(cmd),
-                    int(numData),
-                    needVerify=needVerify,
-                    verificationType=parseVerificationType(verificationType)
-                )
+                result, info = testResults[rowNum]
 
                 if info is not None:
-                    self.__writeCell(rawCmdSheet, rowNum, resultInfoColNum, info)
+                    self.resultSink.write('Raw CMD', rowNum, resultInfoColNum, info)
 
                 if type(result) == int: # % accuracy
                     passLevel = getAccuracyMetric(result)
-                    if passLevel == "":
+                    if type(passLevel) == str:    # below the partial match threshold
                         resultColor = passLevelColor = RED_FILL
                     elif passLevel == PassLevel.PARTIAL_MATCH:
                         if passLevel < self.projectConfig.passLevel:
@@ -323,8 +630,133 @@ class IPMIAutoTest:
 
             passLevel = DotDict({"value": ""}) if type(passLevel) == str else passLevel
 
-            self.__writeCell(rawCmdSheet, rowNum, resultColNum, result.value, resultColor)
-            self.__writeCell(rawCmdSheet, rowNum, passColnum, passLevel.value, passLevelColor)
+            self.resultSink.write('Raw CMD', rowNum, resultColNum, result.value, resultColor)
+            self.resultSink.write('Raw CMD', rowNum, passColnum, passLevel.value, passLevelColor)
+
+    def __onFunctionResult(
+        self,
+        rowNum: int,
+        testResult: Tuple[Union[int, Result], str]
+    ) -> None:
+        self.journal.recordFunction(rowNum, testResult)
+        if self.rowLogs is not None:    # the debug records of passed rows are dropped
+            result, _ = testResult
+            self.rowLogs.release(rowNum, keep=not (result == Result.PASS or result == 100))
+
+    def testFru(self) -> None:
+        '''
+            one binary read per FRU device (see fru.FruReader) for every 'Fru Info' row instead of parsing an `ipmitool fru` dump,
+            expected data of all rows are compared at once
+        '''
+        self.logger.info("===Testing Fru===")
+
+        columns = self.testPlan.fruColumns
+        resColNum = columns['Response']
+        resultColNum = columns['Result (P: pass/F: fail)']
+        passColNum = columns['Pass Level (A: all match, L: length match, I: ignored)']
+
+        reader = FruReader()
+        fields, errors = {}, {}
+        for fruId in sorted({fru.fruId for fru in self.testPlan.frus}):
+            try:
+                fields[fruId] = reader.read(fruId, self.__rawCommand, self.__rawCommandBatch).fields
+            except Exception as e:
+                self.logger.warning(e)
+                errors[fruId] = str(e)
+
+        frus = pd.DataFrame(self.testPlan.frus, columns=FruRow._fields).set_index('rowNum')
+        tags = frus['ipmiTag'].map(lambda tag: FRU_TAG_ALIASES.get(tag, tag))
+        actual = pd.Series([fields.get(fruId, {}).get(tag) for fruId, tag in zip(frus['fruId'], tags)], index=frus.index, dtype=object)
+        expected = frus['expectedData']
+
+        read = frus['fruId'].isin(list(fields))
+        found = actual.notna()
+        ignored = expected == '[ignored]'
+        allMatch = read & ((found & (actual == expected)) | (~found & (expected == '[null]')))
+        lengthMatch = found & ~ignored & ~allMatch & (actual.str.len() == expected.str.len())
+        self.logger.debug("%d all match, %d length match, %d ignored of %d FRU fields", int(allMatch.sum()), int(lengthMatch.sum()), int(ignored.sum()), len(frus))
+
+        for rowNum in frus.index:
+            if found[rowNum]:
+                self.resultSink.write('Fru Info', rowNum, resColNum, actual[rowNum])
+            elif not read[rowNum] and not ignored[rowNum]:
+                self.resultSink.write('Fru Info', rowNum, resColNum, errors[frus.at[rowNum, 'fruId']])
+
+            if ignored[rowNum]:
+                passLevel, passLevelColor = PassLevel.IGNORED, DARK_GREEN_FILL
+            elif allMatch[rowNum]:
+                passLevel, passLevelColor = PassLevel.ALL_MATCH, GREEN_FILL
+            elif lengthMatch[rowNum]:
+                passLevel, passLevelColor = PassLevel.PARTIAL_MATCH, YELLOW_FILL
+            else:
+                passLevel = None
+
+            # '[ignored]' rows are excluded by the sheet, they pass whatever --pass-level is
+            if passLevel is None or passLevel == PassLevel.PARTIAL_MATCH and passLevel < self.projectConfig.passLevel:
+                self.resultSink.write('Fru Info', rowNum, resultColNum, Result.FAIL.value, RED_FILL)
+                self.resultSink.write('Fru Info', rowNum, passColNum, passLevel.value if passLevel is not None else "", RED_FILL)
+            else:
+                self.resultSink.write('Fru Info', rowNum, resultColNum, Result.PASS.value, GREEN_FILL)
+                self.resultSink.write('Fru Info', rowNum, passColNum, passLevel.value, passLevelColor)
+
+    def testSensor(self) -> None:
+        '''
+            one `ipmitool sensor list` (a single SDR scan) for every 'Sensor Info' row instead of a `sensor get` per sensor,
+            thresholds of all sensors are compared at once
+        '''
+        self.logger.info("===Testing Sensor===")
+
+        columns = self.testPlan.sensorColumns
+        sensors = self.testPlan.sensors
+        rowNums = [sensor.rowNum for sensor in sensors]
+        thresholds = list(SENSOR_THRESHOLD.keys())
+
+        # keyed like fleet hosts, BMCs sharing an IP behind different ports keep their own dump
+        sdrPath = SdrCache(getHostDirName(self.projectConfig) if self.isOutOfBand else None).prepare(self.__rawCommand, self.__generalCommand)
+        if sdrPath is not None:
+            self.backend.setSdrCache(sdrPath)
+
+        stdout, stderr = self.__generalCommand("sensor", "list")
+        readings = parseSensorList(stdout)
+        if readings.empty:
+            self.logger.debug(stderr.strip('\n'))
+            for rowNum in rowNums:
+                self.resultSink.write('Sensor Info', rowNum, columns['Result (P: pass/F: fail)'], Result.FAIL.value, RED_FILL)
+                self.resultSink.write('Sensor Info', rowNum, columns['Error Response'], stderr)
+            return
+        if stderr:
+            self.logger.debug(stderr.strip('\n'))
+
+        expected = pd.DataFrame([sensor.thresholds for sensor in sensors], index=rowNums, dtype=float)
+        expected = expected.rename(columns={abbr: status for status, abbr in SENSOR_THRESHOLD.items()})[thresholds]
+        actual = readings.reindex([sensor.sensorName for sensor in sensors])
+        actual.index = rowNums
+        actualValues = actual[thresholds].apply(pd.to_numeric, errors='coerce')
+
+        found = actual['Status'].notna()
+        discrete = pd.Series([sensor.sensorType.lower() in ['discrete', 'watchdog'] for sensor in sensors], index=rowNums)
+        matches = (actualValues.round(3) == expected.round(3)) | (actualValues.isna() & expected.isna())
+        passed = found & (discrete | matches.all(axis=1))
+        self.logger.debug("%d/%d sensors passed, %d not found", int(passed.sum()), len(sensors), int((~found).sum()))
+
+        for sensor in sensors:
+            rowNum = sensor.rowNum
+            if not found[rowNum]:
+                self.resultSink.write('Sensor Info', rowNum, columns['Result (P: pass/F: fail)'], Result.FAIL.value, RED_FILL)
+                self.resultSink.write('Sensor Info', rowNum, columns['Error Response'], f"Sensor {sensor.sensorName} not found")
+                continue
+
+            if not discrete[rowNum]:
+                for status in thresholds:
+                    self.resultSink.write(
+                        'Sensor Info', rowNum, columns[SENSOR_THRESHOLD[status]], actual.at[rowNum, status],
+                        None if matches.at[rowNum, status] else RED_FILL
+                    )
+
+            if passed[rowNum]:
+                self.resultSink.write('Sensor Info', rowNum, columns['Result (P: pass/F: fail)'], Result.PASS.value, GREEN_FILL)
+            else:
+                self.resultSink.write('Sensor Info', rowNum, columns['Result (P: pass/F: fail)'], Result.FAIL.value, RED_FILL)
 
     def _devTest(self):
         stdout, stderr = self.__generalCommand("power", "status")
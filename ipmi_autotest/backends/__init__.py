@@ -0,0 +1,14 @@
+from defs.dotDict import DotDict
+from defs.enums import Backend
+
+from .commandBackend import CommandBackend, SubprocessBackend
+from .shellBackend import ShellBackend
+from .lanplusBackend import LanplusBackend
+from .asyncEngine import AsyncCommandEngine
+from .resilientBackend import ResilientBackend, CircuitBreaker, isAnswered
+
+def getCommandBackend(backend: Backend, projectConfig: DotDict, isOutOfBand: bool=False) -> CommandBackend:
+    if backend == Backend.SUBPROCESS: return SubprocessBackend(projectConfig, isOutOfBand)
+    elif backend == Backend.SHELL: return ShellBackend(projectConfig, isOutOfBand)
+    elif backend == Backend.LANPLUS: return LanplusBackend(projectConfig, isOutOfBand)
+    else: raise Exception(f"Backend '{backend}' not defined.")
@@ -0,0 +1,77 @@
+import time
+import asyncio
+
+from functools import partial
+from typing import Callable, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .commandBackend import CommandBackend
+
+class AsyncCommandEngine:
+    '''
+        Issues independent read-only raw requests concurrently, at most `concurrency` in flight for the BMC.
+
+        Every in-flight slot owns its own backend instance (and therefore its own ipmitool process / RMCP+ session),
+        since the persistent backends serialize commands on a single stream.
+        Blocking backend calls run on a thread pool driven by an asyncio loop; results come back in request order.
+        Requests are handed to the backends in batches of `batchSize` (see CommandBackend.rawCommandBatch),
+        each batch is timed from the moment a backend picks it up.
+    '''
+    def __init__(
+        self,
+        backendFactory: Callable[[], CommandBackend],
+        concurrency: int=4
+    ) -> None:
+        self.backendFactory = backendFactory
+        self.concurrency = concurrency
+        self.__backends = []
+
+    def rawCommands(
+        self,
+        requests: List[Tuple[str]],
+        callback: Callable[[int], None]=None,
+        batchSize: int=1,
+        onBatch: Callable[[List[Tuple[str]], List[Tuple[str, str]], float], None]=None
+    ) -> List[Tuple[str, str]]:
+        '''
+            requests: [(netfn, cmd, *data)], callback is called with the number of requests of every completed batch (e.g. progress bar update),
+            onBatch(batch, responses, elapsed seconds) with every completed batch (e.g. to record latencies)
+        '''
+        if not self.__backends:
+            self.__backends = [self.backendFactory() for _ in range(self.concurrency)]
+
+        batches = [requests[i:i+batchSize] for i in range(0, len(requests), batchSize)]
+        results = asyncio.run(self.__run(batches, callback, onBatch))
+        return [result for batch in results for result in batch]
+
+    async def __run(
+        self,
+        batches: List[List[Tuple[str]]],
+        callback: Callable[[int], None]=None,
+        onBatch: Callable[[List[Tuple[str]], List[Tuple[str, str]], float], None]=None
+    ) -> List[List[Tuple[str, str]]]:
+        loop = asyncio.get_running_loop()
+        idleBackends = asyncio.Queue()
+        for backend in self.__backends:
+            idleBackends.put_nowait(backend)
+
+        async def send(batch: List[Tuple[str]]) -> List[Tuple[str, str]]:
+            backend = await idleBackends.get()
+            try:
+                start = time.perf_counter()
+                responses = await loop.run_in_executor(executor, partial(backend.rawCommandBatch, batch))
+                if onBatch is not None:
+                    onBatch(batch, responses, time.perf_counter() - start)
+                return responses
+            finally:
+                idleBackends.put_nowait(backend)
+                if callback is not None:
+                    callback(len(batch))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return await asyncio.gather(*(send(batch) for batch in batches))
+
+    def close(self) -> None:
+        for backend in self.__backends:
+            backend.close()
+        self.__backends = []
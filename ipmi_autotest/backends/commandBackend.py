@@ -0,0 +1,273 @@
+import os
+import re
+import time
+import uuid
+import shlex
+import shutil
+import select
+import tempfile
+import threading
+import subprocess
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from defs.dotDict import DotDict
+
+BATCH_MARKER = '__IPMI_AUTOTEST_BATCH__'
+HEX_DUMP_LINE = re.compile(r'^( [0-9a-fA-F]{2})*$')     # `ipmitool raw` response lines, an empty response prints an empty line
+TIMEOUT_ERROR = 'Timeout: no answer from ipmitool'
+NOT_SENT_ERROR = 'Not sent: the batch was stopped by a timeout'
+
+def formatTimeoutError(timeout: float) -> str:
+    return f"{TIMEOUT_ERROR} within {timeout:g} s\n"
+
+def getCommandKey(cmdType: str, args: Tuple[str]) -> str:
+    '''
+        key of --command-timeout: '0x06 0x01' for raw commands, the subcommand words otherwise (e.g. 'sdr dump', 'sensor list')
+    '''
+    if cmdType == 'raw':
+        try:
+            return f'0x{int(args[0], 0):02x} 0x{int(args[1], 0):02x}'
+        except (IndexError, ValueError):
+            return 'raw'
+    return ' '.join([cmdType, *args[:1]]).strip(' ')
+
+class CommandBackend(ABC):
+    '''
+        Transport used by IPMIAutoTest to talk to the BMC.
+        Every backend returns ipmitool-compatible (stdout, stderr) text so TestCase.verify keeps working unchanged.
+    '''
+    def __init__(
+        self,
+        projectConfig: DotDict,
+        isOutOfBand: bool=False
+    ) -> None:
+        self.projectConfig = projectConfig
+        self.isOutOfBand = isOutOfBand
+
+        if isOutOfBand:
+            self.commandTemplate = f"ipmitool -C {self.projectConfig.cypherSuite} -I lanplus -H {self.projectConfig.ip} -U {self.projectConfig.userName} -P {self.projectConfig.password}"
+            if self.projectConfig.port and self.projectConfig.port != 623:
+                self.commandTemplate += f" -p {self.projectConfig.port}"
+        else:
+            self.commandTemplate = f"ipmitool{' -I wmi' if os.name == 'nt' else ''}"
+
+        self.timeout: float = None                  # seconds, None waits forever
+        self.commandTimeouts: Dict[str, float] = {}  # getCommandKey() -> seconds
+        self.__local = threading.local()            # deadline() of the calling thread
+
+    def __enter__(self) -> 'CommandBackend':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @abstractmethod
+    def generalCommand(
+        self,
+        cmdType: str="",
+        *args: Tuple[str]
+    ) -> Tuple[str, str]:
+        raise NotImplementedError
+
+    def rawCommand(
+        self,
+        netfn: str="",
+        cmd: str="",
+        *args: Tuple[str]
+    ) -> Tuple[str, str]:
+        return self.generalCommand("raw", netfn, cmd, *args)
+
+    def rawCommandBatch(
+        self,
+        requests: List[Tuple[str]]
+    ) -> List[Tuple[str, str]]:
+        '''
+            requests: [(netfn, cmd, *data)] independent of each other, returns [(stdout, stderr)] in request order
+        '''
+        return [self.rawCommand(*request) for request in requests]
+
+    def setTimeouts(
+        self,
+        timeout: float=None,
+        commandTimeouts: Dict[str, float]=None
+    ) -> None:
+        self.timeout = timeout
+        self.commandTimeouts = commandTimeouts or {}
+
+    def getTimeout(
+        self,
+        cmdType: str,
+        args: Tuple[str]
+    ) -> float:
+        key = getCommandKey(cmdType, args)
+        timeout = self.commandTimeouts.get(key, self.commandTimeouts.get(key.split(' ')[0], self.timeout))
+        deadline = self.getDeadline()
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    @contextmanager
+    def deadline(self, at: float) -> Iterator[None]:
+        '''
+            commands sent by the calling thread within the block time out at time.monotonic() == at at the latest,
+            e.g. the polls of TestCase.waitFor
+        '''
+        previous, self.__local.deadline = self.getDeadline(), at
+        try:
+            yield
+        finally:
+            self.__local.deadline = previous
+
+    def getDeadline(self) -> float:
+        return getattr(self.__local, 'deadline', None)
+
+    def setSdrCache(self, path: str) -> None:
+        '''
+            ipmitool reads the SDR repository from a local `sdr dump` file (-S) instead of downloading it from the BMC
+        '''
+        self.commandTemplate = re.sub(r' -S \S+', '', self.commandTemplate) + f' -S {shlex.quote(path)}'
+
+    def close(self) -> None:
+        pass
+
+class SubprocessBackend(CommandBackend):
+    '''
+        Spawns a new ipmitool process for every command.
+    '''
+    def generalCommand(
+        self,
+        cmdType: str="",
+        *args: Tuple[str]
+    ) -> Tuple[str, str]:
+        shell = f"{self.commandTemplate} {cmdType}".rstrip(" ")
+        for arg in args:
+            shell += f' {arg}'
+
+        res = subprocess.Popen(
+            shell,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            shell=True,
+            start_new_session=True      # the shell and ipmitool are killed together on a timeout
+        )
+
+        timeout = self.getTimeout(cmdType, args)
+        try:
+            return res.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            killProcessGroup(res)
+            stdout, stderr = res.communicate()
+            return stdout, stderr + formatTimeoutError(timeout)
+
+    def rawCommandBatch(
+        self,
+        requests: List[Tuple[str]]
+    ) -> List[Tuple[str, str]]:
+        '''
+            Writes the requests to one `ipmitool exec` script, each preceded by an `echo <marker><index>` line,
+            and runs it as a single process (and lanplus session) with stderr merged into stdout.
+            The merged output is split at the markers; within a request, hex dump lines are its stdout and anything else its stderr.
+
+            Keeping stdout and stderr in order on one pipe needs stdout line buffered, so without stdbuf
+            (e.g. on Windows) requests are sent one by one.
+            Requests whose output is cut short (ipmitool exited mid-script) are resent one by one.
+            When a request gets no answer within its timeout the process is killed: that request fails with a timeout
+            and the requests after it with NOT_SENT_ERROR, the caller decides whether to resend them (see ResilientBackend).
+        '''
+        if len(requests) < 2 or not shutil.which('stdbuf'):
+            return super().rawCommandBatch(requests)
+
+        marker = f'{BATCH_MARKER}{uuid.uuid4().hex[:8]}_'
+        with tempfile.NamedTemporaryFile('w', suffix='.ipmi', delete=False) as script:
+            for i, request in enumerate(requests):
+                script.write(f'echo {marker}{i}\n')
+                script.write(' '.join(['raw', *request]) + '\n')
+            script.write(f'echo {marker}{len(requests)}\n')
+
+        timeouts = [self.getTimeout('raw', request) for request in requests]
+        stalledIndex = None
+        try:
+            res = subprocess.Popen(
+                f"stdbuf -oL -eL {self.commandTemplate} exec {script.name}",
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                shell=True,
+                start_new_session=True
+            )
+            if any(timeout is not None for timeout in timeouts):
+                output, stalledIndex = self.__readBatchOutput(res, marker, timeouts)
+            else:
+                output = res.communicate()[0].decode(errors='replace')
+        finally:
+            os.remove(script.name)
+
+        # the script echoes the markers in order, any other line (even one that looks like a marker) is output of the current request
+        segments = {}
+        for line in output.splitlines():
+            if line == f'{marker}{len(segments)}':
+                segments[len(segments)] = [[], []]
+            elif segments:
+                segments[len(segments) - 1][0 if HEX_DUMP_LINE.match(line) else 1].append(line + '\n')
+
+        results = []
+        for i, request in enumerate(requests):
+            if stalledIndex is not None and i >= stalledIndex:
+                stdout, stderr = segments.get(i, [[], []])
+                error = formatTimeoutError(timeouts[i]) if i == stalledIndex else f"{NOT_SENT_ERROR}\n"
+                results.append((''.join(stdout), ''.join(stderr) + error))
+                continue
+            if i + 1 not in segments:   # the next marker never showed up, the output of this request may be incomplete
+                results.append(self.rawCommand(*request))
+                continue
+            stdout, stderr = segments[i]
+            results.append((''.join(stdout), ''.join(stderr)))
+
+        return results
+
+    def __readBatchOutput(
+        self,
+        res: subprocess.Popen,
+        marker: str,
+        timeouts: List[float]
+    ) -> Tuple[str, int]:
+        '''
+            reads the merged output of an `ipmitool exec` batch, allowing each request its own timeout from the marker before it
+            returns (output, index of the request that timed out or None)
+        '''
+        fd = res.stdout.fileno()
+        output = b''
+        current = 0     # the request being answered, advanced by the markers
+        deadline = time.monotonic() + (timeouts[0] or float('inf'))
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                killProcessGroup(res)
+                res.wait()
+                return output.decode(errors='replace'), current
+
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if not readable:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:   # EOF, ipmitool exited
+                res.wait()
+                return output.decode(errors='replace'), None
+            output += chunk
+
+            answered = current
+            while answered + 1 < len(timeouts) and f'{marker}{answered + 1}\n'.encode() in output:
+                answered += 1
+            if answered > current:
+                current = answered
+                deadline = time.monotonic() + (timeouts[current] or float('inf'))
+
+def killProcessGroup(res: subprocess.Popen) -> None:
+    try:
+        os.killpg(res.pid, 9)
+    except (OSError, AttributeError):     # already gone / no process groups (Windows)
+        res.kill()
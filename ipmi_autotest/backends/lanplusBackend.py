@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+from defs.dotDict import DotDict
+from rmcp.session import LanplusSession
+from rmcp.packets import formatRawResponse, formatRawError
+from .commandBackend import CommandBackend, SubprocessBackend
+
+class LanplusBackend(CommandBackend):
+    '''
+        Native RMCP+ client: one authenticated session per BMC, raw requests are sent as byte frames.
+        Non-raw commands (e.g. `power status`) are still delegated to ipmitool.
+    '''
+    def __init__(
+        self,
+        projectConfig: DotDict,
+        isOutOfBand: bool=False
+    ) -> None:
+        if not isOutOfBand:
+            raise Exception("Backend 'lanplus' only supports out-of-band mode, set -I/--is-out-of-band.")
+
+        super().__init__(projectConfig, isOutOfBand)
+        self.session = LanplusSession(
+            self.projectConfig.ip,
+            port=self.projectConfig.port or 623,
+            userName=self.projectConfig.userName,
+            password=self.projectConfig.password,
+            cipherSuite=self.projectConfig.cypherSuite
+        )
+        self.fallback = SubprocessBackend(projectConfig, isOutOfBand)
+
+    def generalCommand(
+        self,
+        cmdType: str="",
+        *args: Tuple[str]
+    ) -> Tuple[str, str]:
+        if cmdType == 'raw':
+            return self.rawCommand(*args)
+
+        return self.fallback.generalCommand(cmdType, *args)
+
+    def rawCommand(
+        self,
+        netfn: str="",
+        cmd: str="",
+        *args: Tuple[str]
+    ) -> Tuple[str, str]:
+        if not netfn or not cmd:
+            return "", "Not enough parameters given.\nRAW Commands:  raw <netfn> <cmd> [data]\n"
+
+        try:
+            netfnValue, cmdValue = int(netfn, 0), int(cmd, 0)
+            data = bytes(int(arg, 0) for arg in args)
+        except ValueError:
+            return "", f"Given data \"{' '.join([netfn, cmd, *args])}\" is invalid.\n"
+
+        if not self.session.isOpen:
+            try:
+                self.session.open()
+            except Exception as e:
+                return "", f"Error: Unable to establish IPMI v2 / RMCP+ session ({e})\n"
+
+        try:
+            completionCode, response = self.session.sendRaw(netfnValue, cmdValue, data)
+        except Exception:
+            return "", formatRawError(netfnValue, cmdValue)
+
+        if completionCode != 0x00:
+            return "", formatRawError(netfnValue, cmdValue, completionCode)
+
+        return formatRawResponse(response), ""
+
+    def setTimeouts(
+        self,
+        timeout: float=None,
+        commandTimeouts: Dict[str, float]=None
+    ) -> None:
+        '''
+            raw requests keep the per-packet timeout and retransmits of the session, the rest goes through ipmitool
+        '''
+        super().setTimeouts(timeout, commandTimeouts)
+        self.fallback.setTimeouts(timeout, commandTimeouts)
+
+    @contextmanager
+    def deadline(self, at: float) -> Iterator[None]:
+        with super().deadline(at), self.fallback.deadline(at):
+            yield
+
+    def setSdrCache(self, path: str) -> None:
+        super().setSdrCache(path)
+        self.fallback.setSdrCache(path)     # SDR reading commands are delegated to ipmitool
+
+    def close(self) -> None:
+        self.session.close()
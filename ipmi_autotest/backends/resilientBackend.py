@@ -0,0 +1,268 @@
+import re
+import time
+import random
+import logging
+import threading
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from defs.dotDict import DotDict
+from defs.enums import AttemptOutcome, BreakerMode
+from .commandBackend import CommandBackend, TIMEOUT_ERROR, NOT_SENT_ERROR
+
+CIRCUIT_OPEN_ERROR = 'Circuit open: not sent, the BMC stopped answering'
+BREAKER_PROBE = ('0x06', '0x01')    # Get Device ID
+BREAKER_MAX_PAUSE = 600             # seconds a 'pause' breaker waits for the BMC in total before failing fast
+RETRY_BACKOFF = 0.5                 # seconds, doubled on every retry
+RETRY_MAX_BACKOFF = 8
+
+# ipmitool / lanplus errors worth retrying: no response at all, session setup, BMC busy (rsp=0xc0 node busy, 0xc3 timeout)
+TRANSIENT_ERRORS = re.compile(
+    r'Unable to send RAW command \((?![^)]*rsp=)[^)]*\)'
+    r'|rsp=0xc[03]\)'
+    r'|Unable to establish'
+    r'|Insufficient resources for session'
+    r'|Get Session Challenge command failed'
+    r'|No response from remote controller'
+)
+RETRYABLE_OUTCOMES = (AttemptOutcome.TIMEOUT, AttemptOutcome.TRANSIENT, AttemptOutcome.NOT_SENT)
+
+def getOutcome(response: Tuple[str, str]) -> AttemptOutcome:
+    stdout, stderr = response
+    if TIMEOUT_ERROR in stderr: return AttemptOutcome.TIMEOUT
+    elif NOT_SENT_ERROR in stderr: return AttemptOutcome.NOT_SENT
+    elif CIRCUIT_OPEN_ERROR in stderr: return AttemptOutcome.CIRCUIT_OPEN
+    elif TRANSIENT_ERRORS.search(stderr): return AttemptOutcome.TRANSIENT
+    elif stderr.strip() and not stdout.strip(): return AttemptOutcome.ERROR
+    else: return AttemptOutcome.OK
+
+def isAnswered(response: Tuple[str, str]) -> bool:
+    '''
+        the BMC answered, possibly with an error, rather than timing out or the request not being sent
+    '''
+    return getOutcome(response) in (AttemptOutcome.OK, AttemptOutcome.ERROR)
+
+class CircuitBreaker:
+    '''
+        Shared by all the backends of a run: opens after `threshold` consecutive timeouts / transient errors,
+        i.e. once the BMC looks down (hung, rebooting), instead of letting every remaining row wait for its timeout.
+
+        BreakerMode.FAIL:   requests fail fast with CIRCUIT_OPEN_ERROR, every `cooldown` seconds one caller reprobes the BMC
+        BreakerMode.PAUSE:  callers are held while the BMC is reprobed every `cooldown` seconds, up to BREAKER_MAX_PAUSE in total,
+                            then it fails fast like BreakerMode.FAIL
+        Any answer of the BMC, errors included, closes it again.
+    '''
+    def __init__(
+        self,
+        threshold: int=5,
+        cooldown: float=30,
+        mode: BreakerMode=BreakerMode.FAIL
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.mode = mode
+        self.failures = 0
+        self.openedAt = None        # reset by every failed reprobe
+        self.downSince = None
+        self.pausedSeconds = 0.0
+        self.logger = logging.getLogger('main.circuitBreaker')
+        self.__lock = threading.Lock()
+
+    @property
+    def isOpen(self) -> bool:
+        return self.openedAt is not None
+
+    def record(self, outcome: AttemptOutcome) -> None:
+        if outcome in (AttemptOutcome.OK, AttemptOutcome.ERROR):
+            with self.__lock:
+                self.failures = 0
+                self.__close()
+        elif outcome in (AttemptOutcome.TIMEOUT, AttemptOutcome.TRANSIENT):
+            with self.__lock:
+                self.failures += 1
+                if not self.isOpen and self.threshold and self.failures >= self.threshold:
+                    self.openedAt = self.downSince = time.monotonic()
+                    self.logger.warning("Circuit opened after %s consecutive timeouts / transient errors, the BMC stopped answering", self.failures)
+
+    def __close(self) -> None:
+        if self.isOpen:
+            self.logger.info("Circuit closed, the BMC answers again after %.1f s", time.monotonic() - self.downSince)
+        self.openedAt = self.downSince = None
+
+    def allow(self, probe: Callable[[], AttemptOutcome], pause: bool=True) -> bool:
+        '''
+            whether a request may be sent, probe() sends BREAKER_PROBE when the cooldown is over
+            pause: False fails fast during the cooldown even in BreakerMode.PAUSE
+        '''
+        if not self.isOpen:
+            return True
+
+        with self.__lock:   # held while pausing, so every caller waits for the same reprobe
+            while self.isOpen:
+                wait = self.openedAt + self.cooldown - time.monotonic()
+                if wait > 0:
+                    if not pause or self.mode != BreakerMode.PAUSE or self.pausedSeconds >= BREAKER_MAX_PAUSE:
+                        return False
+                    self.logger.info("Circuit open, pausing %.1f s before reprobing the BMC", wait)
+                    time.sleep(wait)
+                    self.pausedSeconds += wait
+
+                if probe() in (AttemptOutcome.OK, AttemptOutcome.ERROR):
+                    self.failures = 0
+                    self.__close()
+                    return True
+                self.openedAt = time.monotonic()
+                self.logger.warning("The BMC does not answer %s yet, circuit stays open", ' '.join(BREAKER_PROBE))
+            return True
+
+class ResilientBackend(CommandBackend):
+    '''
+        Wraps a backend with bounded retries and a circuit breaker.
+
+        Timeouts, no-response and BMC busy errors are retried up to `retries` times, after an exponential backoff
+        with full jitter (random 0..min(RETRY_MAX_BACKOFF, RETRY_BACKOFF * 2^n) seconds); other errors are the answer of the BMC.
+        Only commands isIdempotent(cmdType, args) accepts are retried (see ResponseCache.isIdempotentCommand):
+        a timed out Set / Reserve / Clear may have been executed, so the others get one attempt, which still counts for the breaker.
+        Batches are sent as one batch first, the transient failures of it are then retried one by one
+        and the requests a timeout kept from being sent go out again as a batch (without counting as a retry).
+
+        Within deadline() (polling) commands are sent once and a paused breaker fails fast: the poll loop retries on its own.
+
+        Every attempt of a request that needed more than one, or did not get an answer, is reported to
+        onAttempts(cmdType, args, attempts) as [DotDict(attempt, outcome, elapsedMs, backoffMs)].
+    '''
+    def __init__(
+        self,
+        inner: CommandBackend,
+        breaker: CircuitBreaker,
+        retries: int=2,
+        onAttempts: Callable[[str, Tuple[str], List[DotDict]], None]=None,
+        isIdempotent: Callable[[str, Tuple[str]], bool]=None
+    ) -> None:
+        super().__init__(inner.projectConfig, inner.isOutOfBand)
+        self.inner = inner
+        self.breaker = breaker
+        self.retries = retries
+        self.onAttempts = onAttempts
+        self.isIdempotent = isIdempotent or (lambda cmdType, args: False)
+        self.logger = logging.getLogger('main.resilientBackend')
+
+    def __probe(self) -> AttemptOutcome:
+        return getOutcome(self.inner.rawCommand(*BREAKER_PROBE))
+
+    def __getRetries(self, cmdType: str, args: Tuple[str]) -> int:
+        return self.retries if self.isIdempotent(cmdType, args) and self.getDeadline() is None else 0
+
+    def __getBackoff(self, retry: int) -> float:
+        return random.uniform(0, min(RETRY_MAX_BACKOFF, RETRY_BACKOFF * 2 ** (retry - 1)))
+
+    def __report(
+        self,
+        cmdType: str,
+        args: Tuple[str],
+        attempts: List[DotDict]
+    ) -> None:
+        if self.onAttempts is not None and (len(attempts) > 1 or AttemptOutcome(attempts[-1].outcome) in (*RETRYABLE_OUTCOMES, AttemptOutcome.CIRCUIT_OPEN)):
+            self.onAttempts(cmdType, args, attempts)
+
+    @staticmethod
+    def __getRecord(
+        attempts: List[DotDict],
+        outcome: AttemptOutcome,
+        elapsedMs: float=0,
+        backoff: float=0
+    ) -> DotDict:
+        return DotDict({"attempt": len(attempts) + 1, "outcome": outcome.value, "elapsedMs": elapsedMs, "backoffMs": round(backoff * 1000, 1)})
+
+    def __send(
+        self,
+        cmdType: str,
+        args: Tuple[str],
+        attempts: List[DotDict]
+    ) -> Tuple[str, str]:
+        '''
+            retries the command until it gets an answer, the breaker opens or `retries` is used up, appending to attempts
+        '''
+        retries = self.__getRetries(cmdType, args)
+        while True:
+            sent = sum(attempt.outcome != AttemptOutcome.NOT_SENT.value for attempt in attempts)
+            backoff = self.__getBackoff(sent) if sent else 0
+            if backoff:
+                time.sleep(backoff)
+            if not self.breaker.allow(self.__probe, pause=self.getDeadline() is None):
+                attempts.append(self.__getRecord(attempts, AttemptOutcome.CIRCUIT_OPEN, backoff=backoff))
+                return "", f"{CIRCUIT_OPEN_ERROR}\n"
+
+            start = time.perf_counter()
+            response = self.inner.generalCommand(cmdType, *args)
+            outcome = getOutcome(response)
+            self.breaker.record(outcome)
+            attempts.append(self.__getRecord(attempts, outcome, round((time.perf_counter() - start) * 1000, 1), backoff))
+            if outcome not in RETRYABLE_OUTCOMES or sent + 1 > retries:
+                return response
+            self.logger.debug("%s: %s, retry %s/%s", ' '.join([cmdType, *args]), outcome.value, sent + 1, retries)
+
+    def generalCommand(
+        self,
+        cmdType: str="",
+        *args: Tuple[str]
+    ) -> Tuple[str, str]:
+        attempts = []
+        response = self.__send(cmdType, args, attempts)
+        self.__report(cmdType, args, attempts)
+        return response
+
+    def rawCommandBatch(
+        self,
+        requests: List[Tuple[str]]
+    ) -> List[Tuple[str, str]]:
+        responses = [None] * len(requests)
+        attempts = [[] for _ in requests]
+        pending = list(range(len(requests)))
+        while pending:     # every round answers or gives up on at least the request that timed out
+            if not self.breaker.allow(self.__probe, pause=self.getDeadline() is None):
+                for i in pending:
+                    attempts[i].append(self.__getRecord(attempts[i], AttemptOutcome.CIRCUIT_OPEN))
+                    responses[i] = ("", f"{CIRCUIT_OPEN_ERROR}\n")
+                break
+
+            start = time.perf_counter()
+            sent = self.inner.rawCommandBatch([requests[i] for i in pending])
+            elapsedMs = round((time.perf_counter() - start) * 1000 / len(pending), 1)   # batched requests share the average
+
+            notSent = []
+            for i, response in zip(pending, sent):
+                outcome = getOutcome(response)
+                self.breaker.record(outcome)
+                attempts[i].append(self.__getRecord(attempts[i], outcome, elapsedMs))
+                responses[i] = response
+                if outcome == AttemptOutcome.NOT_SENT:
+                    notSent.append(i)
+                elif outcome in RETRYABLE_OUTCOMES and self.__getRetries('raw', requests[i]) > 0:
+                    responses[i] = self.__send('raw', requests[i], attempts[i])
+            pending = notSent
+
+        for request, requestAttempts in zip(requests, attempts):
+            self.__report('raw', request, requestAttempts)
+        return responses
+
+    def setTimeouts(
+        self,
+        timeout: float=None,
+        commandTimeouts: Dict[str, float]=None
+    ) -> None:
+        super().setTimeouts(timeout, commandTimeouts)
+        self.inner.setTimeouts(timeout, commandTimeouts)
+
+    @contextmanager
+    def deadline(self, at: float) -> Iterator[None]:
+        with super().deadline(at), self.inner.deadline(at):
+            yield
+
+    def setSdrCache(self, path: str) -> None:
+        super().setSdrCache(path)
+        self.inner.setSdrCache(path)
+
+    def close(self) -> None:
+        self.inner.close()
@@ -0,0 +1,144 @@
+import os
+import time
+import shlex
+import shutil
+import select
+import subprocess
+import threading
+
+from typing import Tuple
+
+from defs.dotDict import DotDict
+from .commandBackend import CommandBackend, formatTimeoutError
+
+class ShellBackend(CommandBackend):
+    '''
+        Keeps one long-lived `ipmitool ... exec /dev/stdin` process per BMC and streams commands through its stdin,
+        so a lanplus session is negotiated once per run instead of once per command.
+
+        After every command an `echo <marker>` line is sent; stdout is read up to the marker.
+        ipmitool writes stderr unbuffered and runs commands in order, so once the marker shows up on stdout
+        all stderr output of the command is already in the pipe and can be drained without waiting.
+        stdout is forced to line buffering with stdbuf (when available) so the marker is never held back.
+
+        A command that gets no marker within its timeout kills the process (it is restarted on the next command),
+        since ipmitool would still answer it before anything sent after.
+
+        POSIX only, since it relies on select() over pipes.
+    '''
+    MARKER = '__IPMI_AUTOTEST_EOC__'
+
+    def __init__(
+        self,
+        projectConfig: DotDict,
+        isOutOfBand: bool=False
+    ) -> None:
+        if os.name == 'nt':
+            raise Exception("Backend 'shell' is not supported on Windows, use 'subprocess' instead.")
+
+        super().__init__(projectConfig, isOutOfBand)
+        self.__process = None
+        self.__lock = threading.Lock()
+        self.__counter = 0
+
+    def __start(self) -> None:
+        if self.__process is not None:
+            for pipe in (self.__process.stdin, self.__process.stdout, self.__process.stderr):
+                pipe.close()
+
+        argv = shlex.split(self.commandTemplate) + ['exec', '/dev/stdin']
+        if shutil.which('stdbuf'):
+            argv = ['stdbuf', '-oL', '-eL'] + argv
+
+        self.__process = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0
+        )
+        os.set_blocking(self.__process.stdout.fileno(), False)
+        os.set_blocking(self.__process.stderr.fileno(), False)
+
+    def __isAlive(self) -> bool:
+        return self.__process is not None and self.__process.poll() is None
+
+    def __read(self, fd: int) -> bytes:
+        try:
+            return os.read(fd, 65536)
+        except BlockingIOError:
+            return None
+
+    def __communicate(self, line: str, marker: str, timeout: float=None) -> Tuple[str, str]:
+        stdoutFd = self.__process.stdout.fileno()
+        stderrFd = self.__process.stderr.fileno()
+        token = f'{marker}\n'.encode()
+        stdout = stderr = b''
+
+        try:
+            self.__process.stdin.write(f'{line}\necho {marker}\n'.encode())
+        except BrokenPipeError:     # ipmitool exited, e.g. unable to open the interface
+            pass
+
+        openFds = [stdoutFd, stderrFd]
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while token not in stdout and stdoutFd in openFds:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                self.__process.kill()
+                self.__process.wait()
+                return stdout.decode(errors='replace'), stderr.decode(errors='replace') + formatTimeoutError(timeout)
+            readable, _, _ = select.select(openFds, [], [], remaining)
+            for fd in readable:
+                chunk = self.__read(fd)
+                if chunk == b'':    # EOF
+                    openFds.remove(fd)
+                elif chunk is not None:
+                    if fd == stdoutFd:
+                        stdout += chunk
+                    else:
+                        stderr += chunk
+
+        while stderrFd in openFds:
+            chunk = self.__read(stderrFd)
+            if not chunk:
+                break
+            stderr += chunk
+
+        if stdoutFd not in openFds:     # ipmitool exited, restart it on the next command
+            self.__process.wait()
+
+        stdout = stdout.split(token)[0]
+
+        return stdout.decode(errors='replace'), stderr.decode(errors='replace')
+
+    def generalCommand(
+        self,
+        cmdType: str="",
+        *args: Tuple[str]
+    ) -> Tuple[str, str]:
+        line = ' '.join([cmdType, *args]).strip(' ')
+        timeout = self.getTimeout(cmdType, args)
+
+        with self.__lock:
+            if not self.__isAlive():
+                self.__start()
+
+            self.__counter += 1
+            return self.__communicate(line, f'{self.MARKER}{self.__counter}', timeout)
+
+    def setSdrCache(self, path: str) -> None:
+        super().setSdrCache(path)
+        self.close()    # options only apply to a new ipmitool process, restarted on the next command
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__process is None:
+                return
+            if self.__isAlive():
+                try:
+                    self.__process.stdin.close()
+                    self.__process.wait(timeout=5)
+                except (BrokenPipeError, subprocess.TimeoutExpired):
+                    self.__process.kill()
+            self.__process = None
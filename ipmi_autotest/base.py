@@ -1,7 +1,10 @@
+import time
+
 from abc import ABC, ABCMeta, abstractmethod
-from typing import List, Dict, Tuple, Union
+from typing import Callable, List, Dict, Tuple, Union
 
-from defs.enums import VerificationType, Result
+from defs.enums import VerificationType, Result, Resource
+from labelStore import normalizeResponse
 
 class TestCaseMeta(ABCMeta):
     def __init__(cls, name, bases, attrs):
@@ -18,6 +21,9 @@ class TestCaseMeta(ABCMeta):
 
 
 class TestCase(ABC, metaclass=TestCaseMeta):
+    # BMC state the test changes, e.g. (Resource.POWER_STATE,), () for read-only tests; undeclared tests run alone, see TestScheduler
+    resources: Tuple[Resource] = None
+
     def __init__(
             self, 
             testRoutine: 'IPMIAutoTest', 
@@ -33,14 +39,16 @@ class TestCase(ABC, metaclass=TestCaseMeta):
         self.cmd = cmd
         self.numData = numData
         self.needVerify = needVerify
+        self.labels = labels
+        self.verificationType = verificationType
 
         self.generalCommand = testRoutine._IPMIAutoTest__generalCommand
         self.rawCommand = testRoutine._IPMIAutoTest__rawCommand
+        self.rawCommandBatch = testRoutine._IPMIAutoTest__rawCommandBatch
+        self.deadline = testRoutine._IPMIAutoTest__deadline
 
         if needVerify:
             self.response = dict()
-            self.labels = labels
-            self.verificationType = verificationType
 
     def getData(self) -> List[List[str]]:
         '''
@@ -49,23 +57,22 @@ class TestCase(ABC, metaclass=TestCaseMeta):
         data = []
 
         if self.verificationType == VerificationType.ACCURACY:
-            for i, label in enumerate(self.labels, start=1):
-                if (len(label) != self.numData):
-                    self.testRoutine.logger.warn(f"\tReq length mismatched in {i}th req. Number of data should be {self.numData} but received {len(label.req)} from JSON")
-                data.append(label.req)
+            for i, req in enumerate(self.labels, start=1):
+                if (len(req) != self.numData):
+                    self.testRoutine.logger.warning("\tReq length mismatched in %dth req. Number of data should be %d but received %d from JSON", i, self.numData, len(req))
+                data.append(list(req))
 
         return data
     
     def test(self) -> Tuple[Union[int, Result], str]:
-        self.testRoutine.logger.debug(f"NetFn: {self.netfn}, CMD: {self.cmd}")
-        if self.verificationType == VerificationType.ACCURACY:
-            for args in self.getData():
-                stdout, stderr = self.rawCommand(self.netfn, self.cmd, *args)
-                stdout = stdout.strip('\n').strip(' ')
-                if self.needVerify:
-                    self.response[tuple(args)] = stdout if not stderr else stderr
-                else:
-                    self.testRoutine.logger.debug(f"\tReq: {args}\tRes: {stdout if not stderr else stderr}")
+        # per-request lines use %-args, formatted by the log writer thread (or never, see RowLogBuffer)
+        self.testRoutine.logger.debug("NetFn: %s, CMD: %s", self.netfn, self.cmd)
+        if self.needVerify and self.verificationType == VerificationType.ACCURACY:
+            data = self.getData()
+            responses = self.rawCommandBatch([(self.netfn, self.cmd, *args) for args in data])     # requests are independent, send them in one go
+            for args, (stdout, stderr) in zip(data, responses):
+                stdout = normalizeResponse(stdout)
+                self.response[tuple(args)] = stdout if not stderr else stderr
 
         if self.needVerify:
             result, info = self.verify(self.verificationType)
@@ -84,41 +91,80 @@ class TestCase(ABC, metaclass=TestCaseMeta):
         result = info = None
         
         if verificationType == VerificationType.ACCURACY:
-            total = len(self.labels)
-            correct = 0
-
-            # for input in self.labels.keys():
-            #     if self.response.get(input) == None:    # error: test case not exist
-            #         self.testRoutine.logger.debug(f"\tERROR: Req: {input} untested, please make sure getData() includes this test case")
-            #         continue
-
-            #     if self.response[input] != self.labels[input]:  # error: mismatch
-            #         self.testRoutine.logger.debug(f"\tERROR: Req: {input}\tRes: {self.response[input]} mismatch with expected Res {self.labels[input]}")
-            #         continue
-            #     else:   # pass
-            #         self.testRoutine.logger.debug(f"\tPASS: Req: {input}\tRes: {self.response[input]}")
-            #         correct += 1
-
-            for label in self.labels:
-                key = tuple(label.req)
-                if self.response.get(key) == None:     # error: test case not exist
-                    self.testRoutine.logger.debug(f"\tERROR: Req: {key} untested, please make sure getData() includes this test case")
-                    continue
-                    
-                if self.response[key] != self.labels[key]:      # error: mismatch
-                    self.testRoutine.logger.debug(f"\tERROR: Req: {key}\tRes: {self.response[key]} mismatch with expected Res {self.labels[key]}")
-                    continue
+            # every response is compared with its label byte by byte in one pass, masked bits are ignored (see labelStore)
+            byteMatch = self.labels.match(self.response)
+
+            for key, matched in zip(self.labels.matrix.requests, byteMatch.rowMatch):
+                response = self.response.get(key)
+                if response == None:     # error: test case not exist
+                    self.testRoutine.logger.debug("\tERROR: Req: %s untested, please make sure getData() includes this test case", key)
+                elif not matched:      # error: mismatch
+                    self.testRoutine.logger.debug("\tERROR: Req: %s\tRes: %s mismatch with expected Res %s", key, response, self.labels[key])
                 else:   # pass
-                    self.testRoutine.logger.debug(f"\tPASS: Req: {key}\tRes: {self.response[key]}")
-                    correct += 1
+                    self.testRoutine.logger.debug("\tPASS: Req: %s\tRes: %s", key, response)
 
-            result = int(correct / total * 100) if total != 0 else 100
-            info = "check log file for incorrect test case results" if result < 100 else None
+            result = byteMatch.accuracy     # % of compared response bytes that match
+            if result < 100:
+                mismatched = int((~byteMatch.rowMatch).sum())
+                info = f"{mismatched}/{len(self.labels)} responses mismatch at bytes {byteMatch.mismatchedBytes()}, check log file for incorrect test case results"
 
         elif verificationType == VerificationType.BEHAVIOR:
             result, info = self.behavioralVerification()
 
         return result, info
     
+    def waitFor(
+        self,
+        predicate: Callable[[], bool],
+        timeout: float=10.0,
+        interval: float=0.25,
+        backoff: float=1.5,
+        maxInterval: float=2.0
+    ) -> Tuple[bool, float]:
+        '''
+            polls predicate until it returns True or timeout seconds have passed,
+            starting every `interval` seconds and stretching the interval by `backoff` up to `maxInterval`.
+            The commands predicate sends time out with the remaining time and are not retried, the next poll is the retry.
+
+            return: (met, elapsed seconds until the condition was met / until giving up)
+        '''
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            try:
+                with self.deadline(deadline):
+                    met = predicate()
+            except Exception as e:      # e.g. BMC busy while resetting, keep polling
+                self.testRoutine.logger.debug("\twaitFor: predicate raised %s", e)
+                met = False
+            now = time.monotonic()
+            if met or now >= deadline:
+                return met, now - start
+
+            time.sleep(min(interval, deadline - now))
+            interval = min(interval * backoff, maxInterval)
+
+    def getPowerStatus(self) -> str:
+        '''
+            'on' / 'off' from `power status`, None if the BMC did not answer
+        '''
+        stdout, _ = self.generalCommand('power', 'status')
+        status = stdout.strip('\n').strip(' ').split(' ')[-1]
+        return status if status in ('on', 'off') else None
+
+    def isBmcResponsive(self) -> bool:
+        _, stderr = self.rawCommand('0x06', '0x01')    # Get Device ID
+        return not stderr
+
+    def getSelEntryCount(self) -> int:
+        '''
+            number of SEL entries from Get SEL Info, None if the BMC did not answer
+        '''
+        stdout, stderr = self.rawCommand('0x0a', '0x40')
+        data = stdout.split()
+        if stderr or len(data) < 3:
+            return None
+        return int(data[2] + data[1], 16)
+
     def behavioralVerification(self) -> Tuple[Result, str]:
         raise NotImplementedError("Must implement method behavioralVerification() when needVerify is set to True.")
\ No newline at end of file
@@ -0,0 +1,271 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from defs.dotDict import DotDict
+from defs.enums import PassLevel, Backend
+from defs.functions import getInputFilePath, getLabelsDir
+from testPlan import compileTestPlan, loadTestPlan
+from labelStore import LabelStore
+from resultWriter import ResultSink
+from simulator.bmc import SimulatedBMC, loadSimulatorConfig
+from benchmarks.stubBackend import StubBackend
+import autoTest
+
+BASELINES_PATH = os.path.join(ROOT, 'benchmarks', 'baselines.json')
+PROJECTS = ['example', 'AU_SPR']
+TASKS = {"doRawAvailabilityTest": True, "doRawFunctionalTest": True, "doFruTest": True, "doSensorTest": True}
+MIN_REGRESSION_SECONDS = 0.005      # differences below this are timer noise
+MIN_REGRESSION_MIB = 1.0
+CALIBRATION_ROUNDS = 5
+
+def BenchmarkParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Framework overhead of IPMIAutoTest.runTest against a zero-latency ipmitool stub')
+
+    parser.add_argument('-p', '--project-name', type=str, nargs='*', default=PROJECTS, help='Projects to benchmark')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Timed runs per project, the fastest is kept')
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed slowdown / memory growth over the baseline, 0.5 = 50%%")
+    parser.add_argument('--baselines', type=str, default=BASELINES_PATH, help='Baselines JSON')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baselines instead of comparing')
+
+    return parser
+
+class PhaseRecorder:
+    '''
+        Wall time (and with traceMemory, the peak of traced allocations) per phase of a benchmarked run.
+
+        measure():  a top-level phase, the tracemalloc peak is reset when it starts
+        wrap():     a method called many times (e.g. ResultSink.write), only its cumulative time and call count are kept
+    '''
+    def __init__(self, traceMemory: bool=False) -> None:
+        self.traceMemory = traceMemory
+        self.phases: Dict[str, DotDict] = {}
+
+    def __getPhase(self, name: str) -> DotDict:
+        return self.phases.setdefault(name, DotDict({"seconds": 0.0, "calls": 0, "peakMiB": None}))
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        if self.traceMemory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase = self.__getPhase(name)
+            phase.seconds += time.perf_counter() - start
+            phase.calls += 1
+            if self.traceMemory:
+                phase.peakMiB = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 2)
+
+    def wrap(self, owner: type, attribute: str, name: str) -> patch:
+        method = getattr(owner, attribute)
+        phase = self.__getPhase(name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                phase.seconds += time.perf_counter() - start
+                phase.calls += 1
+
+        return patch.object(owner, attribute, timed)
+
+def calibrate() -> float:
+    '''
+        seconds of a fixed pure-Python workload (hex dumps formatted and parsed back, like the framework's response handling),
+        the fastest of CALIBRATION_ROUNDS. Phase times are stored relative to it, so a baseline carries over to a faster or slower machine.
+    '''
+    fastest = None
+    for _ in range(CALIBRATION_ROUNDS):
+        start = time.perf_counter()
+        responses = {}
+        for i in range(20000):
+            dump = ' '.join(f'{(i + byte) & 0xff:02x}' for byte in range(8))
+            responses[(i & 0xff, dump)] = [int(byte, 16) for byte in dump.split()]
+        seconds = time.perf_counter() - start
+        fastest = seconds if fastest is None else min(fastest, seconds)
+    return fastest
+
+def runProject(
+    projectName: str,
+    bmc: SimulatedBMC,
+    outputDir: str,
+    traceMemory: bool=False
+) -> Dict[str, DotDict]:
+    recorder = PhaseRecorder(traceMemory)
+    inputFilePath = getInputFilePath(projectName)
+    labelsDir = getLabelsDir(projectName)
+    projectConfig = DotDict({
+        "projectName": projectName,
+        "passLevel": PassLevel.PARTIAL_MATCH,
+        "ip": "benchmark",
+        "cypherSuite": 17,
+        "port": 623,
+        "userName": "admin",
+        "password": "admin",
+    })
+    logFilePath = os.path.join(outputDir, 'benchmark.log')
+    open(logFilePath, 'w').close()  # saveOutput moves the log next to the output
+
+    start = time.perf_counter()
+    with recorder.measure('workbook load (compile)'):
+        compileTestPlan(inputFilePath)
+    with recorder.measure('workbook load (cached)'):
+        testPlan = loadTestPlan(inputFilePath, labelsDir)
+    with recorder.measure('label loading'):
+        LabelStore(testPlan.labelFiles)
+
+    with patch.object(autoTest, 'getCommandBackend', lambda backend, config, isOutOfBand: StubBackend(bmc, config, isOutOfBand)), \
+            recorder.wrap(autoTest.IPMIAutoTest, '_IPMIAutoTest__createTestCase', 'test case construction'), \
+            recorder.wrap(ResultSink, 'write', 'cell writes'), \
+            recorder.wrap(autoTest.IPMIAutoTest, 'saveOutput', 'saveOutput'):
+        with recorder.measure('IPMIAutoTest.__init__'):
+            testRoutine = autoTest.IPMIAutoTest(
+                testPlan,
+                inputFilePath,
+                projectConfig=projectConfig,
+                labelsDir=labelsDir,
+                outputDir=outputDir,
+                backend=Backend.SUBPROCESS,
+                logFilePath=logFilePath,
+                showProgress=False,
+                **TASKS
+            )
+        with recorder.measure('runTest'):
+            testRoutine.runTest()
+
+    for phase, seconds in testRoutine.timing.phaseSeconds.items():
+        recorder.phases[f'runTest: {phase}'] = DotDict({"seconds": seconds, "calls": 1, "peakMiB": None})
+    recorder.phases['total'] = DotDict({"seconds": time.perf_counter() - start, "calls": 1, "peakMiB": None})
+    return recorder.phases
+
+def benchmarkProject(projectName: str, repeat: int) -> Tuple[Dict[str, DotDict], float]:
+    '''
+        the fastest of `repeat` runs per phase after a warm-up run (imports, caches under .cache/),
+        and the memory peaks of one more run under tracemalloc (which slows it down).
+        Returns them with the calibration (see calibrate()): it is measured before every run and the relative time of
+        a phase is its best time / calibration ratio over the runs, so a run and its calibration see the same machine load.
+    '''
+    bmc = SimulatedBMC(loadSimulatorConfig(project=projectName))
+    runs = []
+    calibrations = []
+    with tempfile.TemporaryDirectory() as outputDir:
+        runProject(projectName, bmc, outputDir)
+        for _ in range(repeat):
+            calibrations.append(calibrate())
+            runs.append(runProject(projectName, bmc, outputDir))
+        tracemalloc.start()
+        try:
+            memory = runProject(projectName, bmc, outputDir, traceMemory=True)
+        finally:
+            tracemalloc.stop()
+
+    calibration = min(calibrations)
+    results = {}
+    for name in runs[0]:
+        results[name] = DotDict({
+            "seconds": round(min(run[name].seconds for run in runs), 4),
+            "relative": round(min(run[name].seconds / runCalibration for run, runCalibration in zip(runs, calibrations)), 3),
+            "calls": runs[0][name].calls,
+            "peakMiB": memory[name].peakMiB if name in memory else None
+        })
+    return results, calibration
+
+def getChange(
+    result: DotDict,
+    expected: dict,
+    calibration: float
+) -> Tuple[float, float]:
+    '''
+        (seconds, baseline seconds) of a phase on this machine: relative times scaled by the calibration,
+        absolute seconds for baselines saved before calibration
+    '''
+    if expected.get('relative') is not None:
+        return result.relative * calibration, expected['relative'] * calibration
+    return result.seconds, expected['seconds']
+
+def getRegressions(
+    results: Dict[str, DotDict],
+    baseline: Dict[str, dict],
+    tolerance: float,
+    calibration: float
+) -> List[str]:
+    '''
+        phases slower than the baseline scaled to this machine, or with a higher memory peak, by more than `tolerance`
+        and more than the noise floors (MIN_REGRESSION_SECONDS, MIN_REGRESSION_MIB)
+    '''
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        seconds, expectedSeconds = getChange(result, expected, calibration)
+        if seconds > expectedSeconds * (1 + tolerance) and seconds - expectedSeconds > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{name}: {seconds:.4f} s, baseline {expectedSeconds:.4f} s (scaled to this machine)")
+        if result.peakMiB is not None and expected.get('peakMiB') is not None \
+                and result.peakMiB > expected['peakMiB'] * (1 + tolerance) and result.peakMiB - expected['peakMiB'] > MIN_REGRESSION_MIB:
+            regressions.append(f"{name}: peak {result.peakMiB} MiB, baseline {expected['peakMiB']} MiB")
+    return regressions
+
+def printResults(
+    projectName: str,
+    results: Dict[str, DotDict],
+    baseline: Dict[str, dict],
+    calibration: float
+) -> None:
+    print(f"\n{projectName} (calibration {calibration * 1000:.1f} ms, seconds and baselines scaled to it)")
+    print(f"{'Phase':<28}{'Seconds':>10}{'Calls':>8}{'Peak MiB':>10}{'Baseline':>10}{'Change':>9}")
+    for name, result in results.items():
+        seconds, expected = getChange(result, baseline[name], calibration) if name in baseline else (result.seconds, None)
+        change = f"{(seconds / expected - 1) * 100:+.0f}%" if expected else ''
+        print(
+            f"{name:<28}{seconds:>10.4f}{result.calls:>8}{result.peakMiB if result.peakMiB is not None else '':>10}"
+            f"{f'{expected:.4f}' if expected is not None else '':>10}{change:>9}"
+        )
+
+if __name__ == '__main__':
+    args = BenchmarkParser().parse_args()
+
+    logger = logging.getLogger('main')     # the runs log to benchmark.log only through the root logger, keep the console clean
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+
+    regressions = []
+    for projectName in args.project_name:
+        results, calibration = benchmarkProject(projectName, args.repeat)
+        printResults(projectName, results, baselines.get(projectName, {}), calibration)
+        if args.save_baseline:
+            baselines[projectName] = results
+        else:
+            regressions += [f"{projectName} {regression}" for regression in getRegressions(results, baselines.get(projectName, {}), args.tolerance, calibration)]
+
+    if args.save_baseline:
+        with open(args.baselines, 'w') as f:
+            json.dump(baselines, f, indent=4)
+        print(f"\nBaselines saved to {args.baselines}")
+        sys.exit(0)
+
+    if regressions:
+        print("\nRegressions:\n" + '\n'.join(f"  {regression}" for regression in regressions))
+        sys.exit(1)
+    print("\nNo regression")
@@ -0,0 +1,53 @@
+import io
+import threading
+
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Tuple
+
+from defs.dotDict import DotDict
+from backends import CommandBackend
+from rmcp.packets import formatRawResponse, formatRawError
+from simulator.bmc import SimulatedBMC
+from simulator.fakeIpmitool import FakeIpmitool
+
+class StubBackend(CommandBackend):
+    '''
+        Zero-latency stand-in for ipmitool: answers in-process from a SimulatedBMC, no process, no socket,
+        so a benchmarked run only spends time in the framework itself.
+    '''
+    # FakeIpmitool prints its output, which is captured by redirecting the process-wide sys.stdout
+    __outputLock = threading.Lock()
+
+    def __init__(
+        self,
+        bmc: SimulatedBMC,
+        projectConfig: DotDict,
+        isOutOfBand: bool=False
+    ) -> None:
+        super().__init__(projectConfig, isOutOfBand)
+        self.bmc = bmc
+        self.sdrCache = None
+
+    def generalCommand(
+        self,
+        cmdType: str="",
+        *args: Tuple[str]
+    ) -> Tuple[str, str]:
+        if cmdType == "raw" and len(args) >= 2:    # the hot path skips FakeIpmitool and its output redirection
+            try:
+                netfn, cmd = int(args[0], 0), int(args[1], 0)
+                data = bytes(int(arg, 0) for arg in args[2:])
+            except ValueError:
+                return "", f"Given data \"{' '.join(args)}\" is invalid.\n"
+            completionCode, response = self.bmc.handleRequest(netfn, cmd, data)
+            if completionCode != 0x00:
+                return "", formatRawError(netfn, cmd, completionCode)
+            return formatRawResponse(response), ""
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with StubBackend.__outputLock, redirect_stdout(stdout), redirect_stderr(stderr):
+            FakeIpmitool(self.bmc, sdrCache=self.sdrCache).run([cmdType, *args] if cmdType else list(args))
+        return stdout.getvalue(), stderr.getvalue()
+
+    def setSdrCache(self, path: str) -> None:
+        self.sdrCache = path
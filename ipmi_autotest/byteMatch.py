@@ -0,0 +1,91 @@
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+def parseHexBytes(hexString: str) -> bytes:
+    '''
+        '00 20 00 00' -> b'\x00\x20\x00\x00', None if it is not a byte string (e.g. an ipmitool error)
+    '''
+    try:
+        return bytes.fromhex(hexString)
+    except (TypeError, ValueError):
+        return None
+
+def toByteMatrix(
+    rows: List[bytes],
+    width: int=None,
+    fill: int=0
+) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+        packs byte strings into an (n, width) uint8 matrix padded with fill, and their lengths (-1 for None)
+    '''
+    lengths = np.array([len(row) if row is not None else -1 for row in rows], dtype=np.int64)
+    width = max(width or 0, int(lengths.max(initial=0)))
+    matrix = np.full((len(rows), width), fill, dtype=np.uint8)
+    for i, row in enumerate(rows):
+        if row:
+            matrix[i, :len(row)] = np.frombuffer(row, dtype=np.uint8)
+    return matrix, lengths
+
+class ByteMatch(NamedTuple):
+    '''
+        per-byte comparison of n responses with their labels, all matrices are (n, width)
+    '''
+    matches: np.ndarray         # bool, byte i of response j equals the label where the mask cares
+    compared: np.ndarray        # bool, byte i is compared (inside the label or the response, not masked out entirely)
+    lengthMatch: np.ndarray     # bool (n,), response j has the length of its label
+    textRows: np.ndarray        # bool (n,), response j or its label is not a byte string (e.g. an expected error), compared as text
+    textMatch: np.ndarray       # bool (n,), text row j equals its label exactly
+
+    @property
+    def rowMatch(self) -> np.ndarray:
+        '''
+            responses matching their label on every compared byte, or as a whole for text rows
+        '''
+        return np.where(self.textRows, self.textMatch, self.lengthMatch & (self.matches | ~self.compared).all(axis=1))
+
+    @property
+    def accuracy(self) -> int:
+        '''
+            percentage of compared bytes that match over all responses (a text row counts as one byte),
+            100 only when every response matches
+        '''
+        total = int(self.compared.sum()) + int(self.textRows.sum())
+        matched = int((self.matches & self.compared).sum()) + int((self.textRows & self.textMatch).sum())
+        accuracy = int(matched / total * 100) if total else 100
+        return accuracy if self.rowMatch.all() else min(accuracy, 99)
+
+    def mismatchedBytes(self) -> List[int]:
+        '''
+            byte offsets at which at least one response differs from its label
+        '''
+        return np.flatnonzero((self.compared & ~self.matches).any(axis=0)).tolist()
+
+def matchResponses(
+    expected: np.ndarray,
+    mask: np.ndarray,
+    expectedLengths: np.ndarray,
+    responses: List[bytes],
+    textRows: np.ndarray=None,
+    textMatch: np.ndarray=None
+) -> ByteMatch:
+    '''
+        compares all responses with their labels at once: (response XOR label) AND mask == 0, byte by byte.
+        Bytes missing from a response (shorter, or an error) and bytes beyond the label never match.
+        mask is padded with ff, so extra response bytes are compared (and count as mismatches).
+        textRows are left out of the byte comparison, their result is textMatch.
+    '''
+    n = len(responses)
+    textRows = np.zeros(n, dtype=bool) if textRows is None else textRows
+    textMatch = np.zeros(n, dtype=bool) if textMatch is None else textMatch
+    actual, actualLengths = toByteMatrix(responses, expected.shape[1])
+    width = actual.shape[1]
+    if width > expected.shape[1]:   # responses longer than every label
+        padding = ((0, 0), (0, width - expected.shape[1]))
+        expected, mask = np.pad(expected, padding), np.pad(mask, padding, constant_values=0xff)
+
+    offsets = np.arange(width)
+    compared = (offsets < np.maximum(expectedLengths, actualLengths)[:, None]) & (mask != 0) & ~textRows[:, None]
+    inBoth = (offsets < expectedLengths[:, None]) & (offsets < actualLengths[:, None])
+    matches = inBoth & ((actual ^ expected) & mask == 0)
+    return ByteMatch(matches, compared, actualLengths == expectedLengths, textRows, textMatch)
@@ -50,4 +50,28 @@ class PassLevel(Enum):
             PassLevel.IGNORED.value: 1
         }
 
-        return cmpTable[self.value] < cmpTable[other.value]
\ No newline at end of file
+        return cmpTable[self.value] < cmpTable[other.value]
+
+class Resource(Enum):
+    POWER_STATE = 'power state'
+    BMC_RESET = 'bmc reset'
+    SEL = 'sel'
+    SDR = 'sdr'
+    FRU = 'fru'
+
+class Backend(Enum):
+    SUBPROCESS = 'subprocess'
+    SHELL = 'shell'
+    LANPLUS = 'lanplus'
+
+class BreakerMode(Enum):
+    FAIL = 'fail'       # fail the remaining requests fast, reprobing the BMC every cooldown
+    PAUSE = 'pause'     # hold every request and reprobe until the BMC answers again
+
+class AttemptOutcome(Enum):
+    OK = 'ok'
+    ERROR = 'error'                 # the BMC answered with an error (e.g. a completion code), not retried
+    TIMEOUT = 'timeout'
+    TRANSIENT = 'transient'         # no response, session or BMC busy errors
+    NOT_SENT = 'not sent'           # dropped with the rest of a batch stopped by a timeout
+    CIRCUIT_OPEN = 'circuit open'   # not sent, the BMC is considered down
@@ -8,7 +8,8 @@ from openpyxl.worksheet.worksheet import Worksheet
 
 from .dotDict import DotDict
 from .enums import PassLevel
-from .globalVars import PROJECTS_ROOT, GREEN_FILL, YELLOW_FILL, RED_FILL, LOGFILE_NAME
+from .globalVars import PROJECTS_ROOT, LOGFILE_NAME
+from .logHandlers import QueuedLogHandler
 
 def getProjectDir(projectName: str) -> str:
     return os.path.join(PROJECTS_ROOT, projectName)
@@ -22,6 +23,15 @@ def getLabelsDir(projectName: str) -> str:
 def getOutputDir(outputRoot: str, projectName: str) -> str:
     return os.path.join(outputRoot, projectName)
 
+def getHostName(projectConfig: DotDict) -> str:
+    '''
+        <ip>_<port>, BMCs may share an IP behind different ports (e.g. a NAT or simulators)
+    '''
+    return f"{projectConfig.ip}_{projectConfig.port or 623}"
+
+def getHostDirName(projectConfig: DotDict) -> str:
+    return getHostName(projectConfig).replace(':', '-')     # IPv6
+
 def isWorkSheetColEmpty(workSheet: Worksheet, startRow: int, colNum: int) -> bool:
     for row in workSheet.iter_rows(min_row=startRow, max_row=workSheet.max_row, min_col=colNum, max_col=colNum):
         for cell in row:
@@ -30,21 +40,28 @@ def isWorkSheetColEmpty(workSheet: Worksheet, startRow: int, colNum: int) -> boo
     return True
 
 def getAccuracyMetric(accuracy: int) -> PassLevel:
+    '''
+        accuracy: % of the compared response bytes matching their labels (see byteMatch)
+    '''
     if accuracy == 100:
-        return PassLevel.ALL_MATCH, GREEN_FILL
+        return PassLevel.ALL_MATCH
     elif accuracy > 60:
-        return PassLevel.PARTIAL_MATCH, YELLOW_FILL
+        return PassLevel.PARTIAL_MATCH
     else:
         return ""
 
-def getLoggingFileHandler(outputPath: str) -> List[logging.FileHandler]:
-    fileHandler = logging.FileHandler(os.path.join(outputPath, LOGFILE_NAME), 'w')
+def getLoggingFileHandler(outputPath: str, fileName: str=LOGFILE_NAME, mode: str='w') -> List[logging.Handler]:
+    '''
+        mode: 'a' keeps the log of the interrupted run when resuming
+        the DEBUG file and the INFO console are written by a background thread, see QueuedLogHandler
+    '''
+    fileHandler = logging.FileHandler(os.path.join(outputPath, fileName), mode)
     fileHandler.setLevel(logging.DEBUG)
 
     streamHandler = logging.StreamHandler(stream=sys.stdout)
     streamHandler.setLevel(logging.INFO)
 
-    return [fileHandler, streamHandler]
+    return [QueuedLogHandler(fileHandler, streamHandler)]
 
 def getProjectConfigLogs(projectConfig: DotDict) -> str:
     logs = f"Project: {projectConfig.projectName}\nPass Level: {projectConfig.passLevel}"
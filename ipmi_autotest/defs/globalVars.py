@@ -2,6 +2,7 @@ import os
 from openpyxl.styles import PatternFill
 
 PROJECTS_ROOT = os.path.abspath('./projects/')
+CACHE_DIR = os.path.abspath('./.cache/')
 
 GREEN_FILL = PatternFill(start_color='00ff00', fill_type='solid')
 DARK_GREEN_FILL = PatternFill(start_color='008000', fill_type='solid')
@@ -9,6 +10,18 @@ YELLOW_FILL = PatternFill(start_color='ffff00', fill_type='solid')
 RED_FILL = PatternFill(start_color='ff0000', fill_type='solid')
 
 LOGFILE_NAME = "logfile.log"
+RAW_BATCH_SIZE = 64     # raw requests sent per `ipmitool exec` script
+COMMAND_TIMEOUT = 30    # seconds an ipmitool command may take, see --timeout / --command-timeout
+COMMAND_TIMEOUTS = {    # commands reading the whole SDR repository take longer
+    "sdr": 120,
+    "sensor": 120
+}
+COMMAND_RETRIES = 2     # retries of a command that timed out or got no answer
+BREAKER_THRESHOLD = 5   # consecutive timeouts / transient errors before the BMC is considered down
+BREAKER_COOLDOWN = 30   # seconds between reprobes of a BMC considered down
+LOG_RING_SIZE = 256     # debug records kept per row with --log-failed-rows-only
+LOG_FORMAT = "[%(asctime)s][%(name)-5s][%(levelname)-5s] %(message)s (%(filename)s:%(lineno)d)"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 SENSOR_THRESHOLD = {
     "Lower Non-Critical": "LNC",
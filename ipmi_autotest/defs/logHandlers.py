@@ -0,0 +1,119 @@
+import os
+import queue
+import logging
+import threading
+
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Deque, Dict, Hashable, Iterator, List
+
+class QueuedLogHandler(QueueHandler):
+    '''
+        Hands log records to a background thread that formats and writes them with `handlers`,
+        so the threads running tests never wait for the log file or the console.
+
+        Records are queued as they are: formatting (the message %-args, tracebacks) happens in the writer thread,
+        unlike QueueHandler.prepare() which formats in the calling thread for queues crossing processes.
+        A formatter set on this handler (e.g. by logging.basicConfig) is passed on to the handlers without one.
+        close() (called by logging.shutdown) drains the queue before the handlers are closed.
+    '''
+    def __init__(self, *handlers: logging.Handler) -> None:
+        super().__init__(queue.SimpleQueue())
+        self.handlers = list(handlers)
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self.__pid = os.getpid()    # a forked worker inherits the handler but not the writer thread
+        self.__running = True
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def setFormatter(self, fmt: logging.Formatter) -> None:
+        super().setFormatter(fmt)
+        for handler in self.handlers:
+            if handler.formatter is None:
+                handler.setFormatter(fmt)
+
+    def close(self) -> None:
+        if self.__running and os.getpid() == self.__pid:
+            self.listener.stop()
+        self.__running = False
+        for handler in self.handlers:
+            handler.close()
+        super().close()
+
+class RowLogBuffer(logging.Filter):
+    '''
+        --log-failed-rows-only: DEBUG records logged while a row is tested (see row()) are held in a ring buffer
+        of the last `capacity` records of the row instead of being written; release() writes them for failed or
+        partial-match rows and drops them for passed ones, so sweeps with many requests per command keep a small log.
+        Records of other levels, or logged outside a row, pass through.
+
+        Installed as a filter of the root handlers, see install().
+    '''
+    def __init__(self, capacity: int) -> None:
+        super().__init__()
+        self.capacity = capacity
+        self.buffers: Dict[Hashable, Deque[logging.LogRecord]] = {}
+        self.dropped: Dict[Hashable, int] = {}
+        self.handlers: List[logging.Handler] = []
+        self.logger = logging.getLogger('main.rowLogBuffer')
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    def install(self, logger: logging.Logger=None) -> None:
+        self.handlers = [handler for handler in (logger or logging.getLogger()).handlers if handler.level <= logging.DEBUG]
+        for handler in self.handlers:
+            handler.addFilter(self)
+
+    def uninstall(self) -> None:
+        '''
+            writes the rows never released (e.g. a test raised) and removes the filter
+        '''
+        for key in list(self.buffers):
+            self.release(key, keep=True)
+        for handler in self.handlers:
+            handler.removeFilter(self)
+        self.handlers = []
+
+    @contextmanager
+    def row(self, key: Hashable) -> Iterator[None]:
+        with self.__lock:
+            self.buffers.setdefault(key, deque(maxlen=self.capacity))
+        previous, self.__local.key = getattr(self.__local, 'key', None), key
+        try:
+            yield
+        finally:
+            self.__local.key = previous
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(self.__local, 'key', None)
+        if key is None or record.levelno > logging.DEBUG:
+            return True
+        if getattr(self.__local, 'last', None) is record:   # the same record, filtered by another root handler
+            return False
+        self.__local.last = record
+        with self.__lock:
+            buffer = self.buffers[key]
+            if len(buffer) == buffer.maxlen:
+                self.dropped[key] = self.dropped.get(key, 0) + 1
+            buffer.append(record)
+        return False
+
+    def release(self, key: Hashable, keep: bool) -> None:
+        with self.__lock:
+            records = self.buffers.pop(key, ())
+            dropped = self.dropped.pop(key, 0)
+        if not keep or not records:
+            return
+
+        previous, self.__local.key = getattr(self.__local, 'key', None), None   # released records pass the filter
+        try:
+            self.logger.debug("Row %s: %d buffered debug records%s", key, len(records), f", {dropped} older ones dropped" if dropped else "")
+            for record in records:
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+        finally:
+            self.__local.key = previous
@@ -1,5 +1,6 @@
-from typing import Tuple, Dict
-from .enums import NetFn, PassLevel, VerificationType
+from typing import Tuple, Dict, List
+from .dotDict import DotDict
+from .enums import NetFn, PassLevel, VerificationType, Backend, BreakerMode
 
 def parseNetFn(netfn: str) -> NetFn:
     if netfn == 'Chassis': return NetFn.CHASSIS
@@ -21,6 +22,36 @@ def parsePassLevel(passLevel: str) -> PassLevel:
     elif passLevel == 'I': return PassLevel.IGNORED
     else: raise Exception(f"PassLevel '{passLevel}' not defined.")
 
+def parseBackend(backend: str) -> Backend:
+    if backend == 'subprocess': return Backend.SUBPROCESS
+    elif backend == 'shell': return Backend.SHELL
+    elif backend == 'lanplus': return Backend.LANPLUS
+    else: raise Exception(f"Backend '{backend}' not defined.")
+
+def parseBreakerMode(breakerMode: str) -> BreakerMode:
+    if breakerMode == 'fail': return BreakerMode.FAIL
+    elif breakerMode == 'pause': return BreakerMode.PAUSE
+    else: raise Exception(f"Breaker mode '{breakerMode}' not defined.")
+
+def parseCommandTimeouts(commandTimeouts: List[str]) -> Dict[str, float]:
+    '''
+        ['0x0a 0x11=10', 'sdr=120'] -> {'0x0a 0x11': 10.0, 'sdr': 120.0}, NetFn/CMD are written as 0x0a like getCommandKey
+    '''
+    timeouts = {}
+    for commandTimeout in commandTimeouts or []:
+        key, _, seconds = commandTimeout.rpartition('=')
+        try:
+            words = key.split()
+            if len(words) == 2 and all(word.lower().startswith('0x') for word in words):
+                key = ' '.join(f'0x{int(word, 0):02x}' for word in words)
+            timeouts[key] = float(seconds)
+        except ValueError:
+            raise Exception(f"Command timeout '{commandTimeout}' is invalid, expected <command>=<seconds>, e.g. '0x0a 0x11=10' or 'sdr=120'.")
+        if not key:
+            raise Exception(f"Command timeout '{commandTimeout}' is invalid, expected <command>=<seconds>, e.g. '0x0a 0x11=10' or 'sdr=120'.")
+
+    return timeouts
+
 def parseVerificationType(verificationType: str) -> str:
     if verificationType == 'A': return VerificationType.ACCURACY
     elif verificationType == 'B': return VerificationType.BEHAVIOR
@@ -34,6 +65,34 @@ def parseRawFunctionName(functionName: str) -> str:
 
     return PascalCase
 
+def parseInventory(path: str) -> List[DotDict]:
+    '''
+        one BMC per line: <ip>[,<user name>,<password>[,<cypher suite>[,<port>]]]
+        empty fields fall back to the command line values, lines starting with '#' are ignored
+    '''
+    hosts = []
+    with open(path) as f:
+        for lineNum, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            fields = [field.strip() for field in line.split(',')]
+            if len(fields) > 5:
+                raise Exception(f"Inventory '{path}' line {lineNum}: expected at most 5 fields, got {len(fields)}")
+            fields += [''] * (5 - len(fields))
+            ip, userName, password, cypherSuite, port = fields
+
+            hosts.append(DotDict({
+                "ip": ip,
+                "userName": userName or None,
+                "password": password or None,
+                "cypherSuite": int(cypherSuite) if cypherSuite else None,
+                "port": int(port) if port else None
+            }))
+
+    return hosts
+
 # deprecated
 # def parseLabelKey(key: str) -> Tuple[str]:
 #     keys = key.lstrip('[').rstrip(']').replace(' ', "").split(',')
@@ -50,13 +109,38 @@ def parseFruInfo(stdout: str) -> Dict[str, str]:
 
     return fruInfo
 
-# not used yet
+# `ipmitool sensor get` keys, in the column order of `ipmitool sensor list`
+SENSOR_LIST_COLUMNS = [
+    'Sensor ID', 'Sensor Reading', 'Units', 'Status',
+    'Lower Non-Recoverable', 'Lower Critical', 'Lower Non-Critical',
+    'Upper Non-Critical', 'Upper Critical', 'Upper Non-Recoverable'
+]
+
+def splitFields(line: str, separator: str, maxSplit: int=-1) -> List[str]:
+    '''
+        fields of an ipmitool output line, stripped of the padding ipmitool aligns them with
+    '''
+    return [field.strip() for field in line.split(separator, maxSplit)]
+
+def parseSensorList(stdout: str) -> 'pandas.DataFrame':
+    '''
+        parses `ipmitool sensor list` (one '|' separated line per sensor) in one pass,
+        columns are named like the keys of parseSensorInfo, indexed by 'Sensor ID' (first occurrence kept)
+    '''
+    import pandas as pd     # not at module level, the simulator's fake ipmitool imports this module on every call
+
+    rows = [splitFields(line, '|') for line in stdout.split('\n') if line.count('|') == len(SENSOR_LIST_COLUMNS) - 1]
+    sensors = pd.DataFrame(rows, columns=SENSOR_LIST_COLUMNS, dtype=str)
+    return sensors.drop_duplicates('Sensor ID').set_index('Sensor ID')
+
 def parseSensorInfo(stdout: str) -> Dict[str, str]:
-    stdout = stdout.split('\n')
+    '''
+        parses `ipmitool sensor get` ('<key> : <value>' lines, values may contain ':')
+    '''
     sensorInfo = {}
-    for line in stdout:
+    for line in stdout.split('\n'):
         if ':' in line:
-            line = line.split(':')
-            sensorInfo[line[0].strip(' ')] = line[1].strip(' ') if len(line) <= 2 else ':'.join(line[1:]).strip(' ')
+            key, value = splitFields(line, ':', 1)
+            sensorInfo[key] = value
 
     return sensorInfo
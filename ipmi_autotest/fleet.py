@@ -0,0 +1,132 @@
+import os
+import signal
+import logging
+
+from datetime import datetime
+from typing import List
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from tqdm import tqdm
+from pandas import DataFrame
+
+from defs.dotDict import DotDict
+from defs.globalVars import LOG_FORMAT, LOG_DATE_FORMAT
+from defs.functions import getInputFilePath, getLoggingFileHandler, getHostName, getHostDirName
+
+from autoTest import IPMIAutoTest
+
+def runHost(projectConfig: DotDict, options: DotDict) -> DotDict:
+    '''
+        Worker process entry: runs the whole test plan against one BMC with its own workbook copy and log file.
+    '''
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # Ctrl-C is handled by the parent process
+
+    logDir = os.path.dirname(os.path.realpath(__file__))
+    host = getHostName(projectConfig)
+    logFileName = f'logfile_{getHostDirName(projectConfig)}.log'
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format=LOG_FORMAT.replace('%(name)-5s', host),
+        datefmt=LOG_DATE_FORMAT,
+        handlers=getLoggingFileHandler(logDir, logFileName, 'a' if options.resume else 'w'),
+        force=True
+    )
+
+    summary = DotDict({"host": host, "status": "done", "error": None, "outputPath": None})
+    try:
+        testRoutine = IPMIAutoTest(
+            options.testPlan,
+            getInputFilePath(projectConfig.projectName),
+            projectConfig=projectConfig,
+            labelsDir=options.labelsDir,
+            outputDir=os.path.join(options.outputDir, getHostDirName(projectConfig)),
+            isOutOfBand=options.isOutOfBand,
+            backend=options.backend,
+            concurrency=options.concurrency,
+            workers=options.workers,
+            responseCache=options.responseCache,
+            resultsDb=options.resultsDb,
+            resume=options.resume,
+            profile=options.profile,
+            commandPolicy=options.commandPolicy,
+            logFailedRowsOnly=options.logFailedRowsOnly,
+            resultStreams=options.resultStreams,
+            logFilePath=os.path.join(logDir, logFileName),
+            showProgress=False,
+            **options.tasks
+        )
+        testRoutine.runTest()
+        summary.update(testRoutine.getSummary())
+        summary.outputPath = testRoutine.outputPath
+    except Exception as e:
+        logging.getLogger('main').exception("Test run against %s failed", host)
+        summary.status = 'error'
+        summary.error = str(e)
+
+    return summary
+
+def runFleet(
+    projectConfigs: List[DotDict],
+    options: DotDict,
+    parallel: int=4
+) -> str:
+    '''
+        Runs the same project test plan against every BMC of the inventory, at most `parallel` hosts at a time,
+        and merges the per-host results into a fleet summary next to the per-host outputs.
+
+        return: path of the fleet summary
+    '''
+    logger = logging.getLogger('main.fleet')
+    logger.info("Running project %s against %d BMCs, %s at a time", options.projectName, len(projectConfigs), parallel)
+
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=parallel) as executor:
+        futures = {executor.submit(runHost, projectConfig, options): getHostName(projectConfig) for projectConfig in projectConfigs}
+        try:
+            for future in tqdm(
+                as_completed(futures),
+                desc='Testing BMCs...',
+                total=len(futures),
+                ncols=100,
+                leave=True
+            ):
+                host = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:     # worker died, e.g. killed by the OOM killer
+                    summary = DotDict({"host": host, "status": "error", "error": str(e), "outputPath": None})
+
+                if summary.status == 'error':
+                    logger.error("%s: %s", host, summary.error)
+                else:
+                    logger.info("%s: %s passed, %s failed, %s unavailable, result at %s", host, summary.passed, summary.failed, summary.unavailable, summary.outputPath)
+                summaries[host] = summary
+        except BaseException:   # Ctrl-C (SystemExit from exit_gracefully), workers ignore SIGINT and would be waited for
+            stopWorkers(executor)
+            raise
+
+    summaries = [summaries[getHostName(projectConfig)] for projectConfig in projectConfigs]
+
+    return saveFleetSummary(summaries, options.outputDir)
+
+def stopWorkers(executor: ProcessPoolExecutor) -> None:
+    '''
+        cancels the hosts not started yet and terminates the running workers, their journals let --resume continue
+    '''
+    processes = list((executor._processes or {}).values())     # shutdown() forgets them
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+def saveFleetSummary(summaries: List[DotDict], outputDir: str) -> str:
+    if not os.path.exists(outputDir):
+        os.makedirs(outputDir)
+
+    columns = ["host", "status", "available", "unavailable", "passed", "failed", "accuracy", "error", "outputPath"]
+    summaryPath = os.path.join(outputDir, f'fleet_{datetime.now().strftime("%Y-%b-%d_%H-%M")}.xlsx')
+    DataFrame([dict(summary) for summary in summaries], columns=columns).to_excel(summaryPath, index=False, sheet_name='Fleet Summary')
+
+    logging.getLogger('main.fleet').info("Fleet summary generated at %s", summaryPath)
+    return summaryPath
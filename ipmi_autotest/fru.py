@@ -0,0 +1,182 @@
+import re
+import logging
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from defs.dotDict import DotDict
+
+FRU_READ_CHUNK = 128        # bytes per Read FRU Data, halved while the BMC rejects the length
+FRU_MIN_READ_CHUNK = 16
+FRU_LENGTH_ERRORS = {0xc7, 0xc8, 0xca}     # request data length invalid / field length exceeded / cannot return number of requested bytes
+FRU_MFG_EPOCH = datetime(1996, 1, 1)
+
+# SMBIOS chassis types, as printed by `ipmitool fru`
+CHASSIS_TYPES = [
+    'Unspecified', 'Other', 'Unknown', 'Desktop', 'Low Profile Desktop', 'Pizza Box', 'Mini Tower', 'Tower',
+    'Portable', 'LapTop', 'Notebook', 'Hand Held', 'Docking Station', 'All in One', 'Sub Notebook', 'Space-saving',
+    'Lunch Box', 'Main Server Chassis', 'Expansion Chassis', 'SubChassis', 'Bus Expansion Chassis', 'Peripheral Chassis',
+    'RAID Chassis', 'Rack Mount Chassis', 'Sealed-case PC', 'Multi-system Chassis', 'CompactPCI', 'AdvancedTCA', 'Blade',
+    'Blade Enclosure', 'Tablet', 'Convertible', 'Detachable', 'IoT Gateway', 'Embedded PC', 'Mini PC', 'Stick PC'
+]
+
+# type/length fields of each area in spec order (IPMI FRU Information Storage Definition v1.0), named like `ipmitool fru` prints them
+CHASSIS_FIELDS = ['Chassis Part Number', 'Chassis Serial']
+BOARD_FIELDS = ['Board Mfg', 'Board Product', 'Board Serial', 'Board Part Number', 'Board FRU ID']
+PRODUCT_FIELDS = [
+    'Product Manufacturer', 'Product Name', 'Product Part Number', 'Product Version',
+    'Product Serial', 'Product Asset Tag', 'Product FRU ID'
+]
+# 'Fru Info' sheet tags that differ from the names above
+FRU_TAG_ALIASES = {
+    'Chassis Serial Number': 'Chassis Serial',
+    'Board Serial Number': 'Board Serial',
+}
+
+BCD_PLUS = '0123456789 -.:,_'
+
+def decodeTypeLength(typeCode: int, raw: bytes) -> str:
+    if typeCode == 0b00:    # binary
+        return raw.hex()
+    if typeCode == 0b01:    # BCD plus
+        return ''.join(BCD_PLUS[byte >> 4] + BCD_PLUS[byte & 0x0f] for byte in raw).rstrip()
+    if typeCode == 0b10:    # 6-bit ASCII packed, 4 characters per 3 bytes LS bit first
+        bits = int.from_bytes(raw, 'little')
+        return ''.join(chr(((bits >> (6 * i)) & 0x3f) + 0x20) for i in range(len(raw) * 8 // 6)).rstrip()
+    return raw.decode('latin-1').rstrip('\x00 ')     # 8-bit ASCII + Latin 1
+
+def parseTypeLengthFields(area: bytes, offset: int) -> List[str]:
+    '''
+        returns the type/length encoded fields of an area from offset up to the end-of-fields marker (C1h)
+    '''
+    fields = []
+    while offset < len(area) and area[offset] != 0xc1:
+        typeLength = area[offset]
+        length = typeLength & 0x3f
+        fields.append(decodeTypeLength(typeLength >> 6, area[offset+1:offset+1+length]))
+        offset += 1 + length
+    return fields
+
+def parseFruData(data: bytes) -> Dict[str, str]:
+    '''
+        decodes a FRU image (common header, chassis, board and product info areas) into `ipmitool fru` tags,
+        custom fields of an area are joined with spaces under '<Area> Extra'
+    '''
+    if len(data) < 8 or data[0] & 0x0f != 0x01:
+        raise Exception(f"FRU common header not found (format version {data[:1].hex() or 'missing'})")
+    if sum(data[:8]) & 0xff:
+        raise Exception("FRU common header checksum mismatch")
+
+    logger = logging.getLogger('main.fru')
+    fruInfo = {}
+
+    def getArea(index: int, name: str) -> bytes:
+        offset = data[index] * 8
+        if not offset:
+            return None
+        area = data[offset:offset + data[offset+1] * 8]
+        if len(area) < 2 or sum(area) & 0xff:
+            logger.warning("FRU %s area checksum mismatch", name)
+        return area
+
+    area = getArea(2, 'chassis')
+    if area is not None:
+        fruInfo['Chassis Type'] = CHASSIS_TYPES[area[2]] if area[2] < len(CHASSIS_TYPES) else f'Unknown (0x{area[2]:02x})'
+        fields = parseTypeLengthFields(area, 3)
+        fruInfo.update(zip(CHASSIS_FIELDS, fields))
+        if fields[len(CHASSIS_FIELDS):]:
+            fruInfo['Chassis Extra'] = ' '.join(fields[len(CHASSIS_FIELDS):])
+
+    area = getArea(3, 'board')
+    if area is not None:
+        minutes = int.from_bytes(area[3:6], 'little')
+        fruInfo['Board Mfg Date'] = (FRU_MFG_EPOCH + timedelta(minutes=minutes)).strftime('%a %b %d %H:%M:%S %Y') if minutes else 'Unspecified'
+        fields = parseTypeLengthFields(area, 6)
+        fruInfo.update(zip(BOARD_FIELDS, fields))
+        if fields[len(BOARD_FIELDS):]:
+            fruInfo['Board Extra'] = ' '.join(fields[len(BOARD_FIELDS):])
+
+    area = getArea(4, 'product')
+    if area is not None:
+        fields = parseTypeLengthFields(area, 3)
+        fruInfo.update(zip(PRODUCT_FIELDS, fields))
+        if fields[len(PRODUCT_FIELDS):]:
+            fruInfo['Product Extra'] = ' '.join(fields[len(PRODUCT_FIELDS):])
+
+    # empty fields are not printed by ipmitool either
+    return {tag: value for tag, value in fruInfo.items() if value != ''}
+
+def parseRawBytes(stdout: str) -> bytes:
+    return bytes.fromhex(stdout.replace('\n', ' '))
+
+def getCompletionCode(stderr: str) -> int:
+    match = re.search(r'rsp=(0x[0-9a-fA-F]+)', stderr or '')
+    return int(match.group(1), 16) if match else None
+
+class FruReader:
+    '''
+        Reads the raw image of a FRU device with Read FRU Data (Storage 11h) in FRU_READ_CHUNK byte requests sent as one batch,
+        instead of parsing `ipmitool fru` text output, and decodes it with parseFruData.
+
+        The image is read on every run: only the whole image tells whether the device changed
+        (the 8-bit area checksums collide, e.g. on transposed serial number digits), and decoding it is cheap.
+    '''
+    def __init__(self) -> None:
+        self.logger = logging.getLogger('main.fru')
+        self.chunkSize = FRU_READ_CHUNK
+
+    def readImage(
+        self,
+        fruId: int,
+        rawCommand: Callable[..., Tuple[str, str]],
+        rawCommandBatch: Callable[[List[Tuple[str]]], List[Tuple[str, str]]]
+    ) -> bytes:
+        '''
+            Get FRU Inventory Area Info (Storage 10h), then the whole area in one batch of Read FRU Data requests
+        '''
+        stdout, stderr = rawCommand("0x0a", "0x10", f"0x{fruId:02x}")
+        if stderr:
+            raise Exception(f"Get FRU Inventory Area Info of FRU {fruId} failed: {stderr.strip()}")
+        info = parseRawBytes(stdout)
+        size = int.from_bytes(info[0:2], 'little')
+        byWords = len(info) > 2 and info[2] & 0x01     # offsets and counts in 16-bit words
+        if not size:
+            raise Exception(f"FRU {fruId} is empty")
+
+        while True:
+            requests = []
+            for offset in range(0, size, self.chunkSize):
+                count = min(self.chunkSize, size - offset)
+                if byWords:
+                    offset, count = offset // 2, (count + 1) // 2
+                requests.append(("0x0a", "0x11", f"0x{fruId:02x}", f"0x{offset & 0xff:02x}", f"0x{offset >> 8:02x}", f"0x{count:02x}"))
+
+            responses = rawCommandBatch(requests)
+            errors = [stderr for _, stderr in responses if stderr]
+            if not errors:
+                break
+            if getCompletionCode(errors[0]) in FRU_LENGTH_ERRORS and self.chunkSize > FRU_MIN_READ_CHUNK:
+                self.chunkSize //= 2
+                self.logger.debug("Read FRU Data rejected the length, retrying with %s byte chunks", self.chunkSize)
+                continue
+            raise Exception(f"Read FRU Data of FRU {fruId} failed: {errors[0].strip()}")
+
+        data = b''
+        for stdout, _ in responses:
+            chunk = parseRawBytes(stdout)
+            data += chunk[1:1 + chunk[0] * (2 if byWords else 1)]    # count returned, then the data
+        return data[:size]
+
+    def read(
+        self,
+        fruId: int,
+        rawCommand: Callable[..., Tuple[str, str]],
+        rawCommandBatch: Callable[[List[Tuple[str]]], List[Tuple[str, str]]]
+    ) -> DotDict:
+        '''
+            returns {'size', 'fields': {ipmitool tag: value}} of a FRU device
+        '''
+        data = self.readImage(fruId, rawCommand, rawCommandBatch)
+        fru = DotDict({"size": len(data), "fields": parseFruData(data)})
+        self.logger.debug("FRU %s decoded (%d bytes, %d fields)", fruId, len(data), len(fru.fields))
+        return fru
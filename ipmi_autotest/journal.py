@@ -0,0 +1,111 @@
+import os
+import json
+import shutil
+import logging
+import threading
+
+from typing import Dict, List, Tuple, Union
+
+from defs.enums import Result
+
+class RunJournal:
+    '''
+        Appends a checkpoint per finished 'Raw CMD' row to a JSON Lines file while the run goes on,
+        so an interrupted run can be resumed (--resume) without testing those rows again.
+
+            {"workbookHash": ..., "host": ...}                                          header, a journal of another workbook/host is not resumed
+            {"phase": "availability", "row": 12, "stdout": ..., "stderr": ...}         raw response of the availability probe
+            {"phase": "function", "row": 12, "result": "P" | 85, "info": ...}           result of the functional test
+
+        Every record is flushed and fsync'd; a truncated last line (crash while writing) is ignored on load.
+    '''
+    def __init__(
+        self,
+        path: str,
+        workbookHash: str,
+        host: str,
+        resume: bool=False
+    ) -> None:
+        self.logger = logging.getLogger('main.journal')
+        self.path = path
+        self.header = {"workbookHash": workbookHash, "host": host}
+        self.availability: Dict[int, Tuple[str, str]] = {}
+        self.__endsWithNewline = True
+        self.function: Dict[int, Tuple[Union[int, Result], str]] = {}
+        self.__lock = threading.Lock()
+
+        if resume and os.path.exists(path) and self.__load():
+            self.logger.info("Resuming from %s: %d availability and %d functional rows done", path, len(self.availability), len(self.function))
+            self.__file = open(path, 'a')
+            if not self.__endsWithNewline:   # do not append to the truncated line
+                self.__file.write('\n')
+        else:
+            if resume and not os.path.exists(path):
+                self.logger.info("No journal to resume at %s, starting over", path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.__file = open(path, 'w')
+            self.__append([self.header])
+
+    def __load(self) -> bool:
+        path = self.path
+        with open(path) as f:
+            lines = f.read().split('\n')
+        self.__endsWithNewline = lines[-1] == ''
+
+        records = []
+        for lineNum, line in enumerate(lines, start=1):
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                self.logger.warning("%s:%s is incomplete and ignored", path, lineNum)
+
+        if not records or records[0] != self.header:
+            self.logger.warning("%s was written for another workbook or host, starting over", path)
+            return False
+
+        for record in records[1:]:
+            if record.get('phase') == 'availability':
+                self.availability[record['row']] = (record['stdout'], record['stderr'])
+            elif record.get('phase') == 'function':
+                result = record['result']
+                self.function[record['row']] = (result if isinstance(result, int) else Result(result), record['info'])
+        return True
+
+    def __append(self, records: List[dict]) -> None:
+        with self.__lock:
+            self.__file.write(''.join(json.dumps(record) + '\n' for record in records))
+            self.__file.flush()
+            os.fsync(self.__file.fileno())
+
+    def recordAvailability(
+        self,
+        rowNums: List[int],
+        responses: List[Tuple[str, str]]
+    ) -> None:
+        self.__append([
+            {"phase": "availability", "row": rowNum, "stdout": stdout, "stderr": stderr}
+            for rowNum, (stdout, stderr) in zip(rowNums, responses)
+        ])
+        self.availability.update(zip(rowNums, responses))
+
+    def recordFunction(
+        self,
+        rowNum: int,
+        testResult: Tuple[Union[int, Result], str]
+    ) -> None:
+        result, info = testResult
+        self.__append([{"phase": "function", "row": rowNum, "result": result if isinstance(result, int) else result.value, "info": info}])
+        self.function[rowNum] = testResult
+
+    def close(self) -> None:
+        if not self.__file.closed:
+            self.__file.close()
+
+    def archive(self, outputPath: str) -> None:
+        '''
+            moves the journal of a finished run next to its output, so the next run starts over
+        '''
+        self.close()
+        shutil.move(self.path, os.path.join(outputPath, os.path.basename(self.path)))
@@ -0,0 +1,119 @@
+import json
+import logging
+
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from byteMatch import ByteMatch, parseHexBytes, toByteMatrix, matchResponses
+
+def normalizeRequest(req: list) -> Tuple[str]:
+    return tuple(str(byte).strip().lower() for byte in req)
+
+def normalizeResponse(res: str) -> str:
+    '''
+        ipmitool wraps long responses over several lines, compare the bytes only
+    '''
+    return ' '.join(str(res).split()).lower()
+
+class LabelMatrix(NamedTuple):
+    requests: List[Tuple[str]]      # row order of the matrices
+    expected: np.ndarray            # (n, width) uint8, labels padded with 00
+    mask: np.ndarray                # (n, width) uint8, set bits are compared, ff where the label gives no mask
+    lengths: np.ndarray             # (n,) label lengths in bytes
+    text: np.ndarray                # (n,) bool, the label is not a byte string (e.g. an expected error) and is compared as text
+
+class Labels(dict):
+    '''
+        request data bytes -> expected response, in label file order,
+        with the don't-care masks of the labels and their byte matrices for vectorized verification
+    '''
+    def __init__(self, labels: Dict[Tuple[str], str], masks: Dict[Tuple[str], str]=None) -> None:
+        super().__init__(labels)
+        self.masks: Dict[Tuple[str], str] = masks or {}
+        self.__matrix = None
+
+    @property
+    def matrix(self) -> LabelMatrix:
+        '''
+            compiled on first use, labels are parsed into bytes once per run
+        '''
+        if self.__matrix is None:
+            requests = list(self.keys())
+            parsed = [parseHexBytes(self[req]) for req in requests]
+            expected, lengths = toByteMatrix([label or b'' for label in parsed])
+            mask, _ = toByteMatrix([parseHexBytes(self.masks.get(req, '')) or b'' for req in requests], expected.shape[1], fill=0xff)
+            self.__matrix = LabelMatrix(requests, expected, mask, lengths, np.array([label is None for label in parsed], dtype=bool))
+        return self.__matrix
+
+    def match(self, responses: Dict[Tuple[str], str]) -> ByteMatch:
+        '''
+            compares {request: response} with every label at once, a request without response counts as an error.
+            When the label or the response is not a byte string (an ipmitool error), the two are compared as text.
+        '''
+        matrix = self.matrix
+        actual = [responses.get(req) for req in matrix.requests]
+        parsed = [parseHexBytes(res) for res in actual]
+        textRows = matrix.text | np.array([res is not None and data is None for res, data in zip(actual, parsed)], dtype=bool)
+        textMatch = np.array([res is not None and normalizeResponse(res) == normalizeResponse(self[req]) for req, res in zip(matrix.requests, actual)], dtype=bool)
+        return matchResponses(matrix.expected, matrix.mask, matrix.lengths, parsed, textRows, textMatch)
+
+class LabelStore:
+    '''
+        Loads every labels json of the project once and indexes it by request, for accuracy verification.
+
+        labels/<testName in camelCase>Labels.json:
+            {"mask": "ff ff 3f", "data": [{"req": ["0x03"], "res": "00 20 00 00", "mask": "00 ff", "description": ""}, ...]}
+        becomes {('0x03',): '00 20 00 00', ...}, so looking up the expected response of a request is O(1)
+        and a test case with n labels is verified in O(n).
+
+        "mask" (optional, per label or for the whole file) marks the bits compared in each response byte,
+        e.g. "00" for a changing sensor reading or "3f" to ignore reading-valid flags; bytes past the mask are compared in full.
+    '''
+    def __init__(self, labelFiles: Dict[str, str]) -> None:
+        '''
+            labelFiles: {testName: path}, see testPlan.getLabelFiles
+        '''
+        self.logger = logging.getLogger('main.labelStore')
+        self.labelFiles = labelFiles
+        self.labels: Dict[str, Labels] = {testName: self.__load(testName, path) for testName, path in labelFiles.items()}
+
+    def __load(
+        self,
+        testName: str,
+        path: str
+    ) -> Labels:
+        with open(path) as f:
+            content = json.load(f)
+        data = content['data']
+
+        labels, masks = {}, {}
+        for label in data:
+            req = normalizeRequest(label['req'])
+            labels[req] = normalizeResponse(label['res'])
+            mask = label.get('mask', content.get('mask'))
+            if mask is not None:
+                masks[req] = normalizeResponse(mask)
+
+        if len(labels) != len(data):
+            self.logger.warning("%s: %d duplicated req, the last res of each is kept", path, len(data) - len(labels))
+        self.logger.debug("%s: %d labels (%d masked) loaded from %s", testName, len(labels), len(masks), path)
+        return Labels(labels, masks)
+
+    def __contains__(self, testName: str) -> bool:
+        return testName in self.labels
+
+    def get(self, testName: str) -> Labels:
+        if testName not in self.labels:
+            raise Exception(f"Labels of {testName} not found, please prepare labels/{testName[0].lower() + testName[1:]}Labels.json")
+        return self.labels[testName]
+
+    def expected(
+        self,
+        testName: str,
+        req: list
+    ) -> str:
+        '''
+            returns the expected response of req, None if the request is not labeled
+        '''
+        return self.get(testName).get(normalizeRequest(req))
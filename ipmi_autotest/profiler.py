@@ -0,0 +1,131 @@
+import os
+import io
+import sys
+import time
+import pstats
+import cProfile
+import threading
+
+from collections import Counter
+from typing import Dict, List, Tuple
+
+PROFILE_SAMPLE_INTERVAL = 0.005     # seconds between stack samples
+PROFILE_TOP_N = 40
+
+# component of a stack sample: the innermost frame whose file matches decides, see RunProfiler.getComponent
+PROFILE_COMPONENTS: List[Tuple[str, Tuple[str, ...]]] = [
+    ('ipmitool subprocess (spawn + BMC latency)', ('/subprocess.py', '/shellBackend.py', '/commandBackend.py')),
+    ('BMC I/O (lanplus)', ('/socket.py', '/rmcp/')),
+    ('openpyxl', ('/openpyxl/', '/et_xmlfile/', '/xml/')),
+    ('pandas / numpy', ('/pandas/', '/numpy/')),
+    ('sqlite', ('/sqlite3/', '/resultsStore.py')),
+    ('idle (waiting threads)', ('/threading.py', '/queue.py', '/concurrent/futures/')),
+]
+
+class RunProfiler:
+    '''
+        --profile: profiles a whole run with
+            cProfile (deterministic, the thread that runs the test) -> <name>.prof, for pstats / snakeviz
+            a stack sampler (every PROFILE_SAMPLE_INTERVAL seconds, all threads) -> <name>.collapsed,
+                one `frame;frame;frame count` line per stack, the input of flamegraph.pl / speedscope
+        and a summary of both, <name>.profile.txt: time per component (subprocess, openpyxl, pandas, BMC I/O, ...)
+        from the samples and the top PROFILE_TOP_N functions by cumulative and own time.
+    '''
+    def __init__(
+        self,
+        interval: float=PROFILE_SAMPLE_INTERVAL,
+        topN: int=PROFILE_TOP_N
+    ) -> None:
+        self.interval = interval
+        self.topN = topN
+        self.profile = cProfile.Profile()
+        self.samples: Counter = Counter()
+        self.elapsed = 0.0
+        self.__stop = threading.Event()
+        self.__sampler = None
+
+    def __enter__(self) -> 'RunProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self.__stop.clear()
+        self.__sampler = threading.Thread(target=self.__sample, name='profiler', daemon=True)
+        self.__start = time.perf_counter()
+        self.__sampler.start()
+        self.profile.enable()
+
+    def stop(self) -> None:
+        if self.__sampler is None:
+            return
+        self.profile.disable()
+        self.__stop.set()
+        self.__sampler.join()
+        self.__sampler = None
+        self.elapsed += time.perf_counter() - self.__start
+
+    def __sample(self) -> None:
+        samplerId = threading.get_ident()
+        while not self.__stop.wait(self.interval):
+            threadNames = {thread.ident: thread.name for thread in threading.enumerate()}
+            for threadId, frame in sys._current_frames().items():
+                if threadId == samplerId:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+                    frame = frame.f_back
+                self.samples[(threadNames.get(threadId, str(threadId)), tuple(reversed(stack)))] += 1
+
+    @staticmethod
+    def getComponent(stack: Tuple[Tuple[str, str, int], ...]) -> str:
+        for fileName, _, _ in reversed(stack):
+            fileName = fileName.replace(os.sep, '/')
+            for component, patterns in PROFILE_COMPONENTS:
+                if any(pattern in fileName for pattern in patterns):
+                    return component
+        return 'framework'
+
+    def getCollapsedStacks(self) -> List[str]:
+        lines = []
+        for (threadName, stack), count in self.samples.most_common():
+            frames = [threadName] + [f'{os.path.basename(fileName)}:{name}:{lineNum}' for fileName, name, lineNum in stack]
+            lines.append(f"{';'.join(frame.replace(';', ',').replace(' ', '_') for frame in frames)} {count}")
+        return lines
+
+    def getComponentSeconds(self) -> Dict[str, float]:
+        components = Counter()
+        for (_, stack), count in self.samples.items():
+            components[self.getComponent(stack)] += count
+        return {component: count * self.interval for component, count in components.most_common()}
+
+    def getSummary(self) -> str:
+        summary = io.StringIO()
+        summary.write(f"Wall time: {self.elapsed:.3f} s, {sum(self.samples.values())} stack samples every {self.interval * 1000:g} ms (all threads)\n\n")
+        summary.write("Sampled time by component (threads add up, may exceed the wall time):\n")
+        for component, seconds in self.getComponentSeconds().items():
+            summary.write(f"  {component:<45}{seconds:>9.3f} s\n")
+
+        stats = pstats.Stats(self.profile, stream=summary)
+        for sortKey in ('cumulative', 'tottime'):
+            summary.write(f"\nTop {self.topN} functions by {sortKey} time (cProfile, main thread):\n")
+            stats.sort_stats(sortKey).print_stats(self.topN)
+        return summary.getvalue()
+
+    def save(self, outputPath: str, name: str) -> List[str]:
+        '''
+            returns the paths written: <name>.prof, <name>.collapsed, <name>.profile.txt
+        '''
+        os.makedirs(outputPath, exist_ok=True)
+        paths = [os.path.join(outputPath, f'{name}{suffix}') for suffix in ('.prof', '.collapsed', '.profile.txt')]
+
+        self.profile.dump_stats(paths[0])
+        with open(paths[1], 'w') as f:
+            f.write('\n'.join(self.getCollapsedStacks()) + '\n')
+        with open(paths[2], 'w') as f:
+            f.write(self.getSummary())
+        return paths
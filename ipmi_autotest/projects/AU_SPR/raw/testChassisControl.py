@@ -1,7 +1,7 @@
 from typing import Dict, Tuple
 
 from base import TestCase
-from defs.enums import Result
+from defs.enums import Result, Resource
 
 class TestChassisControl(TestCase):
     '''
@@ -18,6 +18,8 @@ class TestChassisControl(TestCase):
 
         refer to ipmi spec section "Chassis Control Command" for further information
     '''
+    resources = (Resource.POWER_STATE,)
+
     def __init__(
             self, 
             testRoutine: 'IPMIAutoTest',
@@ -47,48 +49,43 @@ class TestChassisControl(TestCase):
                 Result (Result.PASS | Result.FAIL): whether the behavior is correct or not (Result.PASS or Result.FAIL)
                 Info (str): comments about the behavior, set to None if not needed 
         '''
-        import time
-
         result = Result.PASS
         info = ""
 
         # test power on
-        self.testRoutine.logger.debug(f"\tTEST: power on")
+        self.testRoutine.logger.debug("\tTEST: power on")
         self.rawCommand(self.netfn, self.cmd, '0x01')
-        time.sleep(10)
-        stdout, stderr = self.generalCommand('power', 'status')
-        stdout = stdout.strip('\n').strip(' ').split(' ')[-1]
-        stderr = stderr.strip('\n').strip(' ')
-        if stdout != 'on':
+        met, elapsed = self.waitFor(lambda: self.getPowerStatus() == 'on', timeout=10)
+        if not met:
             info += f"FAILED: Req: '0x01' should be power on\n"
-            self.testRoutine.logger.debug(f"\tFAILED: Req: '0x01' should be power on")
+            self.testRoutine.logger.debug("\tFAILED: Req: '0x01' should be power on")
             result = Result.FAIL
+        else:
+            info += f"power on: {elapsed:.2f}s\n"
+            self.testRoutine.logger.debug("\tPASS: power on after %.2fs", elapsed)
 
         # test power off
-        self.testRoutine.logger.debug(f"\tTEST: power off")
+        self.testRoutine.logger.debug("\tTEST: power off")
         self.rawCommand(self.netfn, self.cmd, '0x00')
-        time.sleep(10)
-        stdout, stderr = self.generalCommand('power', 'status')
-        stdout = stdout.strip('\n').strip(' ').split(' ')[-1]
-        stderr = stderr.strip('\n').strip(' ')
-        if stdout != 'off':
+        met, elapsed = self.waitFor(lambda: self.getPowerStatus() == 'off', timeout=10)
+        if not met:
             info += f"FAILED: Req: '0x00' should be power off"
-            self.testRoutine.logger.debug(f"\tFAILED: Req: '0x00' should be power off")
+            self.testRoutine.logger.debug("\tFAILED: Req: '0x00' should be power off")
             result = Result.FAIL
+        else:
+            info += f"power off: {elapsed:.2f}s"
+            self.testRoutine.logger.debug("\tPASS: power off after %.2fs", elapsed)
 
         # TODO: test power cycle
         # self.rawCommand(self.netfn, self.cmd, '0x02')
 
         # TODO: test power reset
-        # self.testRoutine.logger.debug(f"\tTEST: power reset")
+        # self.testRoutine.logger.debug("\tTEST: power reset")
         # self.rawCommand(self.netfn, self.cmd, '0x03')
-        # time.sleep(10)
-        # stdout, stderr = self.generalCommand('power', 'status')
-        # stdout = stdout.strip('\n').strip(' ').split(' ')[-1]
-        # stderr = stderr.strip('\n').strip(' ')
-        # if stdout != 'off':
+        # met, elapsed = self.waitFor(lambda: self.getPowerStatus() == 'off', timeout=10)
+        # if not met:
         #     info += f"FAILED: Req: '0x03' should be power reset"
-        #     self.testRoutine.logger.debug(f"\tFAILED: Req: '0x03' should be power reset")
+        #     self.testRoutine.logger.debug("\tFAILED: Req: '0x03' should be power reset")
         #     result = Result.FAIL
 
         return result, info
\ No newline at end of file
@@ -10,6 +10,8 @@ class TestGetChassisStatus(TestCase):
 
         refer to ipmi spec section "Get Chassis Status Command" for further information
     '''
+    resources = ()
+
     def __init__(
             self, 
             testRoutine: 'IPMIAutoTest',
@@ -6,9 +6,15 @@ from defs.enums import Result
 class TestCaseTemplate(TestCase):
     '''
         For following conditions, one must prepare label pairs or implement behavioralVerification() method:
-        1. Verification Type = A (Accuracy):    Must prepare labels/xxxLabels.json, in which the size of req == Request Length
+        1. Verification Type = A (Accuracy):    Must prepare labels/xxxLabels.json, in which the size of req == Request Length,
+                                                an optional "mask" ("ff 00 3f") per label or per file marks the compared bits of each response byte
         2. Verification Type = B (Behavior):    Must implement behavioralVerification()
+
+        Declare the BMC state the test changes in `resources`, e.g. (Resource.POWER_STATE,), or () if it only reads,
+        so the scheduler can run it next to other tests; tests leaving it undeclared run alone.
     '''
+    # resources = ()
+
     def __init__(
             self, 
             testRoutine: 'IPMIAutoTest',
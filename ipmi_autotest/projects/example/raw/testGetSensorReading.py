@@ -3,6 +3,8 @@ from typing import Dict, Tuple
 from base import TestCase
 
 class TestGetSensorReading(TestCase):
+    resources = ()
+
     def __init__(
             self, 
             testRoutine: 'IPMIAutoTest',
@@ -0,0 +1,138 @@
+import os
+import re
+import inspect
+import logging
+
+from importlib import import_module
+from typing import Dict, List, Tuple, Type
+
+from base import TestCase
+from defs.globalVars import PROJECTS_ROOT
+from defs.enums import AutoTestType, VerificationType, Resource
+from testPlan import RawCommand
+
+TEST_CASE_ARGS = ('testRoutine', 'netfn', 'cmd', 'numData', 'needVerify', 'labels', 'verificationType')
+
+def getRegistryKey(name: str) -> str:
+    '''
+        'Get Device ID', 'GetDeviceId' and 'TestGetDeviceID' all become 'getdeviceid'
+    '''
+    name = re.sub(r'[^0-9a-z]', '', name.lower())
+    return name[len('test'):] if name.startswith('test') else name
+
+class TestCaseRegistry:
+    '''
+        Imports projects/<projectName>/raw/test*.py once and indexes the TestCase subclasses they define,
+        by function name and, once bound to the test plan (see bind), by (NetFn, CMD).
+
+        Problems found while loading (import errors, invalid classes) are kept in `errors`,
+        bind() adds the functional rows without a usable implementation, so a run can refuse to start
+        before any command is sent to the BMC.
+    '''
+    def __init__(
+        self,
+        projectName: str,
+        rawDir: str=None
+    ) -> None:
+        self.logger = logging.getLogger('main.registry')
+        self.projectName = projectName
+        self.rawDir = rawDir or os.path.join(PROJECTS_ROOT, projectName, 'raw')
+
+        self.testCases: Dict[str, Type[TestCase]] = {}
+        self.commands: Dict[Tuple[str, str], Type[TestCase]] = {}
+        self.errors: List[str] = []
+
+        self.__discover()
+
+    def __discover(self) -> None:
+        if not os.path.isdir(self.rawDir):
+            self.logger.debug("%s not found, no functional test implemented", self.rawDir)
+            return
+
+        for fileName in sorted(os.listdir(self.rawDir)):
+            if not (fileName.startswith('test') and fileName.endswith('.py')):     # __testXXXTemplate.py and helpers are skipped
+                continue
+
+            moduleName = f'projects.{self.projectName}.raw.{fileName[:-len(".py")]}'
+            try:
+                module = import_module(moduleName)
+            except Exception as e:
+                self.errors.append(f"{fileName}: cannot be imported, {type(e).__name__}: {e}")
+                continue
+
+            classes = [
+                cls for _, cls in inspect.getmembers(module, inspect.isclass)
+                if issubclass(cls, TestCase) and cls is not TestCase and cls.__module__ == module.__name__
+            ]
+            if not classes:
+                self.errors.append(f"{fileName}: no TestCase subclass defined")
+
+            for cls in classes:
+                error = self.__validate(cls)
+                if error is not None:
+                    self.errors.append(f"{fileName}: {cls.__name__} {error}")
+                    continue
+
+                key = getRegistryKey(cls.__name__)
+                if key in self.testCases:
+                    self.errors.append(f"{fileName}: {cls.__name__} duplicates {self.testCases[key].__name__}")
+                    continue
+                self.testCases[key] = cls
+
+        self.logger.debug("%d test cases registered from %s", len(self.testCases), self.rawDir)
+
+    def __validate(self, cls: Type[TestCase]) -> str:
+        '''
+            returns why cls cannot be used, None if it can
+        '''
+        if not cls.__name__.startswith('Test'):
+            return "should be named Test<Function Name>"
+        if inspect.isabstract(cls):
+            return f"does not implement {', '.join(sorted(cls.__abstractmethods__))}"
+
+        parameters = inspect.signature(cls.__init__).parameters
+        if not any(parameter.kind == parameter.VAR_KEYWORD for parameter in parameters.values()):
+            missing = [arg for arg in TEST_CASE_ARGS if arg not in parameters]
+            if missing:
+                return f"__init__ does not accept {', '.join(missing)}"
+
+        if cls.resources is not None and (not isinstance(cls.resources, tuple) or not all(isinstance(resource, Resource) for resource in cls.resources)):
+            return "resources should be a tuple of Resource"
+
+        return None
+
+    def get(self, functionName: str) -> Type[TestCase]:
+        return self.testCases.get(getRegistryKey(functionName))
+
+    def getByCommand(
+        self,
+        netfn: str,
+        cmd: str
+    ) -> Type[TestCase]:
+        return self.commands.get((netfn.lower(), cmd.lower()))
+
+    def bind(self, rawCommands: List[RawCommand]) -> List[str]:
+        '''
+            maps (NetFn, CMD) of the functional rows to their test case,
+            returns every problem that would stop those rows from being tested
+        '''
+        problems = list(self.errors)
+        for rawCommand in rawCommands:
+            if rawCommand.testType == AutoTestType.AVAILABILITY.value:
+                continue
+
+            cls = self.get(rawCommand.functionName)
+            if cls is None:
+                problems.append(
+                    f"Row {rawCommand.rowNum} {rawCommand.functionName}: no test case, "
+                    f"please implement Test{rawCommand.testName} in {os.path.join(self.rawDir, f'test{rawCommand.testName}.py')}"
+                )
+                continue
+
+            if rawCommand.needVerify and rawCommand.verificationType == VerificationType.BEHAVIOR and cls.behavioralVerification is TestCase.behavioralVerification:
+                problems.append(f"Row {rawCommand.rowNum} {rawCommand.functionName}: {cls.__name__} does not implement behavioralVerification()")
+                continue
+
+            self.commands[(rawCommand.netfn.lower(), rawCommand.cmd.lower())] = cls
+
+        return problems
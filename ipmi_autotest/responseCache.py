@@ -0,0 +1,144 @@
+import logging
+import threading
+
+from typing import Dict, Iterable, List, Tuple
+
+from testPlan import RawCommand
+
+# 'Get' commands that are not plain reads (IPMI spec): they dequeue or allocate state on the BMC
+SIDE_EFFECTING_GET_COMMANDS = {
+    (0x06, 0x33),   # Get Message, dequeues the receive message queue
+    (0x06, 0x39),   # Get Session Challenge, allocates a temporary session
+    (0x0a, 0x42),   # Reserve SEL, cancels the previous reservation
+    (0x0a, 0x48),   # Get SEL Time, the clock moves
+    (0x0a, 0x5c),   # Get SEL Time UTC Offset
+}
+# idempotent commands whose name does not start with 'Get'
+READ_COMMANDS = {
+    (0x0a, 0x11),   # Read FRU Data
+}
+# ipmitool subcommand words that only read, e.g. 'power status', 'sdr list', 'fru print', 'sdr dump <file>'
+READ_ONLY_VERBS = {'status', 'list', 'elist', 'info', 'print', 'get', 'dump'}
+# ipmitool subcommands whose action is the next word, e.g. 'chassis power status', 'mc watchdog get'
+NESTED_SUBCOMMANDS = {
+    'chassis': {'power', 'policy', 'bootparam'},
+    'mc': {'watchdog'},
+    'sel': {'time'},
+}
+
+RequestKey = Tuple[str, int, int, Tuple[int]]
+
+def getSubcommandVerb(cmdType: str, args: Tuple[str]) -> str:
+    '''
+        the word of an ipmitool command naming its action: 'list' of 'sdr list', 'status' of 'chassis power status',
+        None when there is none (e.g. a bare 'fru')
+    '''
+    words = [str(arg).lower() for arg in args]
+    position = 1 if words and words[0] in NESTED_SUBCOMMANDS.get(str(cmdType).lower(), ()) else 0
+    return words[position] if len(words) > position else None
+
+def parseByte(byte: str) -> int:
+    '''
+        ipmitool reads raw bytes with base 0, '0x0a' == '10'
+    '''
+    try:
+        return int(str(byte), 0)
+    except ValueError:
+        return str(byte).lower()
+
+class ResponseCache:
+    '''
+        Memoizes raw command responses of one run by (host, netfn, cmd, data).
+
+        Only idempotent commands are cached: 'Get' commands of the test plan (minus SIDE_EFFECTING_GET_COMMANDS) and READ_COMMANDS.
+        Any other command answered without error may have changed the BMC state, so it clears the cache;
+        commands rejected with a completion code (e.g. availability probes without request data) do not.
+        Responses that never reached the BMC (no completion code) are not cached.
+    '''
+    def __init__(
+        self,
+        host: str,
+        rawCommands: Iterable[RawCommand]=(),
+        enabled: bool=True
+    ) -> None:
+        self.logger = logging.getLogger('main.responseCache')
+        self.host = host
+        self.enabled = enabled
+        self.idempotent = set(READ_COMMANDS)
+        for rawCommand in rawCommands:
+            command = (parseByte(rawCommand.netfn), parseByte(rawCommand.cmd))
+            if rawCommand.functionName.startswith('Get') and command not in SIDE_EFFECTING_GET_COMMANDS:
+                self.idempotent.add(command)
+
+        self.responses: Dict[RequestKey, Tuple[str, str]] = {}
+        self.hits = self.misses = 0
+        self.__lock = threading.Lock()
+
+    def getKey(self, request: Tuple[str]) -> RequestKey:
+        netfn, cmd, *data = request
+        return (self.host, parseByte(netfn), parseByte(cmd), tuple(parseByte(byte) for byte in data))
+
+    def isIdempotent(self, request: Tuple[str]) -> bool:
+        return len(request) >= 2 and (parseByte(request[0]), parseByte(request[1])) in self.idempotent
+
+    def isIdempotentCommand(self, cmdType: str, args: Tuple[str]) -> bool:
+        '''
+            whether the ipmitool command can be sent twice: idempotent raw commands and read-only subcommands,
+            classified by the action word only ('user set name 2 info' is a write)
+        '''
+        if cmdType == 'raw':
+            return self.isIdempotent(args)
+        return getSubcommandVerb(cmdType, args) in READ_ONLY_VERBS
+
+    def get(self, request: Tuple[str]) -> Tuple[str, str]:
+        '''
+            returns the cached (stdout, stderr) of request, None on a miss
+        '''
+        if not self.enabled or not self.isIdempotent(request):
+            return None
+
+        with self.__lock:
+            response = self.responses.get(self.getKey(request))
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def put(
+        self,
+        request: Tuple[str],
+        response: Tuple[str, str]
+    ) -> None:
+        if not self.enabled or len(request) < 2:
+            return
+
+        _, stderr = response
+        if self.isIdempotent(request):
+            if not stderr or 'rsp=0x' in stderr:    # answered by the BMC, possibly with a completion code
+                with self.__lock:
+                    self.responses[self.getKey(request)] = response
+        elif not stderr:
+            self.invalidate(f"{' '.join(request[:2])} may change BMC state")
+
+    def invalidate(self, reason: str=None) -> None:
+        with self.__lock:
+            if self.responses:
+                self.logger.debug("%d cached responses dropped: %s", len(self.responses), reason)
+            self.responses.clear()
+
+    def invalidateGeneralCommand(self, cmdType: str, args: Tuple[str]) -> None:
+        '''
+            ipmitool subcommands other than reads (e.g. 'power on', 'mc reset cold', 'sel clear') invalidate the cache
+        '''
+        if not self.enabled or not cmdType:
+            return
+        if not self.isIdempotentCommand(cmdType, args):
+            self.invalidate(f"'{' '.join([cmdType, *args])}' may change BMC state")
+
+    def getMisses(self, requests: List[Tuple[str]]) -> Tuple[List[Tuple[str, str]], List[int]]:
+        '''
+            returns the cached responses in request order (None for a miss) and the indices of the misses
+        '''
+        responses = [self.get(request) for request in requests]
+        return responses, [i for i, response in enumerate(responses) if response is None]
@@ -0,0 +1,196 @@
+import os
+import csv
+import json
+
+from typing import Any, Dict, List, Tuple
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.indexed_list import IndexedList
+from openpyxl.worksheet.dimensions import ColumnDimension
+
+from testPlan import SheetLayout
+
+class ResultSink:
+    '''
+        Collects test results as {sheetName: {(row, col): (value, fill)}} instead of editing a loaded workbook cell by cell.
+
+        write():            records a result cell, and appends it to the CSV / JSON Lines streams right away
+        saveWorkbook():     copies the input workbook in one streaming pass (read-only in, write-only out),
+                            overlaying the recorded results; styles are created once per (source style, fill) and reused
+    '''
+    def __init__(
+        self,
+        columnNames: Dict[str, Dict[int, str]]=None,
+        streamPaths: Dict[str, str]=None
+    ) -> None:
+        '''
+            columnNames: {sheetName: {colNum: header}}, used to label stream records
+            streamPaths: {'csv' | 'jsonl': path}
+        '''
+        self.columnNames = columnNames or {}
+        self.streamPaths = streamPaths or {}
+        self.results: Dict[str, Dict[Tuple[int, int], Tuple[Any, PatternFill]]] = {}
+
+        self.__streams = {}
+        self.__csvWriter = None
+
+    def write(
+        self,
+        sheetName: str,
+        row: int,
+        col: int,
+        value: Any="",
+        fill: PatternFill=None
+    ) -> None:
+        self.results.setdefault(sheetName, {})[(row, col)] = (value, fill)
+        if self.streamPaths:
+            self.__stream(sheetName, row, col, value)
+
+    def get(
+        self,
+        sheetName: str,
+        row: int,
+        col: int
+    ) -> Any:
+        result = self.results.get(sheetName, {}).get((row, col))
+        return result[0] if result is not None else None
+
+    def isColumnEmpty(
+        self,
+        sheetName: str,
+        col: int
+    ) -> bool:
+        return not any(key[1] == col for key in self.results.get(sheetName, {}))
+
+    def __openStreams(self) -> None:
+        for format, path in self.streamPaths.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.__streams[format] = open(path, 'w', newline='', buffering=1)
+        if 'csv' in self.__streams:
+            self.__csvWriter = csv.writer(self.__streams['csv'])
+            self.__csvWriter.writerow(['sheet', 'row', 'column', 'value'])
+
+    def __stream(
+        self,
+        sheetName: str,
+        row: int,
+        col: int,
+        value: Any
+    ) -> None:
+        if not self.__streams:
+            self.__openStreams()
+
+        column = self.columnNames.get(sheetName, {}).get(col, col)
+        if self.__csvWriter is not None:
+            self.__csvWriter.writerow([sheetName, row, column, value])
+        if 'jsonl' in self.__streams:
+            self.__streams['jsonl'].write(json.dumps({"sheet": sheetName, "row": row, "column": column, "value": value}) + '\n')
+
+    def close(self) -> None:
+        for stream in self.__streams.values():
+            stream.close()
+        self.__streams = {}
+        self.__csvWriter = None
+
+    def saveWorkbook(
+        self,
+        inputFilePath: str,
+        outputFilePath: str,
+        layouts: Dict[str, SheetLayout]=None,
+        extraSheets: Dict[str, List[List[Any]]]=None
+    ) -> None:
+        '''
+            layouts: column widths, row heights and merged cells per sheet, which read-only worksheets do not expose (see testPlan)
+            extraSheets: {sheetName: rows} appended after the sheets of the input workbook, e.g. 'Timing'
+        '''
+        layouts = layouts or {}
+        source = load_workbook(inputFilePath, read_only=True)
+        output = Workbook(write_only=True)
+        output._fonts = IndexedList([source._fonts[0]])     # unstyled cells use the default font of the source workbook
+        styles = {}
+
+        try:
+            for sourceSheet in source.worksheets:
+                sheet = output.create_sheet(sourceSheet.title)
+                layout = layouts.get(sourceSheet.title)
+                if layout is not None:
+                    for first, last, width in layout.columnWidths:
+                        letter = get_column_letter(first)
+                        sheet.column_dimensions[letter] = ColumnDimension(sheet, index=letter, min=first, max=last, width=width)
+                    for rowNum, height in layout.rowHeights.items():
+                        sheet.row_dimensions[rowNum].height = height
+                    for cellRange in layout.mergedCells:
+                        sheet.merged_cells.add(cellRange)
+                    sheet.freeze_panes = layout.freezePanes
+
+                results = self.results.get(sourceSheet.title, {})
+                resultCols = {}
+                for row, col in results:
+                    resultCols.setdefault(row, []).append(col)
+
+                for rowNum, cells in enumerate(sourceSheet.iter_rows(), start=1):
+                    cells = list(cells)
+                    maxCol = max([len(cells), *resultCols.get(rowNum, [])])
+                    sheet.append([
+                        self.__copyCell(sheet, styles, cells[col - 1] if col <= len(cells) else None, results.get((rowNum, col)))
+                        for col in range(1, maxCol + 1)
+                    ])
+
+                # results past the end of the source sheet
+                lastRow = sourceSheet.max_row or 0
+                for rowNum in sorted(row for row in resultCols if row > lastRow):
+                    while lastRow < rowNum - 1:
+                        sheet.append([])
+                        lastRow += 1
+                    sheet.append([
+                        self.__copyCell(sheet, styles, None, results.get((rowNum, col)))
+                        for col in range(1, max(resultCols[rowNum]) + 1)
+                    ])
+                    lastRow = rowNum
+
+            for sheetName, rows in (extraSheets or {}).items():
+                sheet = output.create_sheet(sheetName)
+                for row in rows:
+                    sheet.append(row)
+
+            os.makedirs(os.path.dirname(outputFilePath), exist_ok=True)
+            output.save(outputFilePath)
+        finally:
+            source.close()
+
+    def __copyCell(
+        self,
+        sheet: Any,
+        styles: Dict[Tuple[int, PatternFill], Any],
+        source: Any,
+        result: Tuple[Any, PatternFill]
+    ) -> Any:
+        hasStyle = getattr(source, 'has_style', False)     # EmptyCell has no style
+        value = source.value if source is not None else None
+        fill = None
+        if result is not None:
+            value, fill = result
+
+        if not hasStyle and fill is None:
+            return value
+
+        key = (source._style_id if hasStyle else None, fill)
+        cell = WriteOnlyCell(sheet, value)
+        if key in styles:
+            cell._style = styles[key]
+            return cell
+
+        if hasStyle:
+            cell.font = source.font
+            cell.fill = source.fill
+            cell.border = source.border
+            cell.alignment = source.alignment
+            cell.number_format = source.number_format
+            cell.protection = source.protection
+        if fill is not None:
+            cell.fill = fill
+        styles[key] = cell._style
+        return cell
@@ -0,0 +1,234 @@
+import os
+import time
+import sqlite3
+import threading
+
+from typing import List, Tuple
+
+from defs.dotDict import DotDict
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    host TEXT,
+    mode TEXT,
+    hardware_version TEXT,
+    firmware_version TEXT,
+    tester TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    output_path TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_project_firmware ON runs (project, firmware_version, started_at);
+CREATE INDEX IF NOT EXISTS runs_host ON runs (host, started_at);
+
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    netfn TEXT NOT NULL,
+    cmd TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    row_num INTEGER,
+    function_name TEXT,
+    data TEXT,
+    response TEXT,
+    error TEXT,
+    latency_ms REAL,
+    averaged INTEGER NOT NULL DEFAULT 0,
+    cached INTEGER NOT NULL DEFAULT 0,
+    availability TEXT,
+    error_response TEXT,
+    result TEXT,
+    pass_level TEXT,
+    info TEXT,
+    PRIMARY KEY (run_id, netfn, cmd, seq)
+);
+CREATE INDEX IF NOT EXISTS results_command ON results (netfn, cmd, data);
+CREATE INDEX IF NOT EXISTS results_function ON results (function_name, run_id);
+
+CREATE TABLE IF NOT EXISTS attempts (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    seq INTEGER NOT NULL,
+    phase TEXT,
+    command TEXT NOT NULL,
+    attempt INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    elapsed_ms REAL,
+    backoff_ms REAL,
+    PRIMARY KEY (run_id, seq)
+);
+'''
+
+# latest run of the project per (host, firmware), test cases matched by NetFn/CMD that passed on one build and not on the other
+REGRESSIONS_QUERY = '''
+WITH latest AS (
+    SELECT MAX(id) AS id, host, firmware_version FROM runs
+    WHERE project = :project AND firmware_version IN (:before, :after)
+    GROUP BY host, firmware_version
+),
+testCases AS (
+    SELECT run_id, netfn, cmd, row_num, function_name, availability, result, pass_level,
+        AVG(CASE WHEN cached = 0 THEN latency_ms END) AS latency_ms
+    FROM results
+    WHERE run_id IN (SELECT id FROM latest) AND row_num IS NOT NULL
+    GROUP BY run_id, row_num
+)
+SELECT oldRun.host AS host, new.function_name AS functionName, new.netfn AS netfn, new.cmd AS cmd,
+    old.availability AS availabilityBefore, new.availability AS availabilityAfter,
+    old.result AS resultBefore, new.result AS resultAfter,
+    old.pass_level AS passLevelBefore, new.pass_level AS passLevelAfter,
+    old.latency_ms AS latencyMsBefore, new.latency_ms AS latencyMsAfter
+FROM latest oldRun
+JOIN latest newRun ON newRun.host IS oldRun.host AND oldRun.firmware_version = :before AND newRun.firmware_version = :after
+JOIN testCases old ON old.run_id = oldRun.id
+JOIN testCases new ON new.run_id = newRun.id AND new.netfn = old.netfn AND new.cmd = old.cmd AND new.function_name IS old.function_name
+WHERE (old.availability = 'A' AND new.availability = 'U')
+    OR (old.result = 'P' AND new.result = 'F')
+    OR (old.result LIKE '%\\%' ESCAPE '\\' AND new.result LIKE '%\\%' ESCAPE '\\'
+        AND CAST(REPLACE(new.result, '%', '') AS INTEGER) < CAST(REPLACE(old.result, '%', '') AS INTEGER))
+ORDER BY oldRun.host, new.row_num
+'''
+
+NO_TEST_CASE = (None,) * 7     # rowNum, functionName, availability, errorResponse, result, passLevel, info
+
+def getCommandKey(netfn: str, cmd: str) -> Tuple[str, str]:
+    '''
+        NetFn/CMD written as 0x0a, so the requests of '0x2D' land in the test case of '0x2d'
+    '''
+    try:
+        return f'0x{int(str(netfn), 0):02x}', f'0x{int(str(cmd), 0):02x}'
+    except ValueError:
+        return str(netfn), str(cmd)
+
+class ResultsStore:
+    '''
+        Keeps the results of every run in a SQLite database, for comparing runs without opening the output workbooks.
+
+        runs:       one row per test run (project, host, firmware version, time)
+        results:    one row per (run, test case, request): every raw request sent (or served by the response cache)
+                    with its response and latency, next to the verdict of the 'Raw CMD' row of its NetFn/CMD
+                    as written to the output workbook. Requests sent in one batch share its average latency (averaged = 1),
+                    rows no request was recorded for get one entry for their verdict, requests of no row (e.g. SDR reads) one without
+        attempts:   every attempt of the requests that were retried or got no answer (timeout, circuit open), see ResilientBackend
+
+        Requests are buffered during the run and the whole run is written in one transaction by saveRun(),
+        WAL mode lets fleet workers write to the same database.
+    '''
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(path)
+        self.requests: List[Tuple[str, str, str, str, str, float, int, int]] = []
+        self.attempts: List[Tuple[str, str, int, str, float, float]] = []
+        self.startedAt = time.time()
+        self.__lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=60)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript(SCHEMA)
+        return connection
+
+    def recordRequests(
+        self,
+        requests: List[Tuple[str]],
+        responses: List[Tuple[str, str]],
+        elapsed: float,
+        cached: bool=False
+    ) -> None:
+        '''
+            elapsed: seconds taken by the whole batch
+        '''
+        latency = elapsed * 1000 / len(requests) if requests else 0
+        averaged = not cached and len(requests) > 1
+        records = [
+            (*getCommandKey(netfn, cmd), ' '.join(data), stdout.strip() or None, stderr.strip() or None, latency, int(averaged), int(cached))
+            for (netfn, cmd, *data), (stdout, stderr) in zip(requests, responses)
+        ]
+        with self.__lock:
+            self.requests += records
+
+    def recordAttempts(
+        self,
+        phase: str,
+        command: str,
+        attempts: List[DotDict]
+    ) -> None:
+        records = [(phase, command, attempt.attempt, attempt.outcome, attempt.elapsedMs, attempt.backoffMs) for attempt in attempts]
+        with self.__lock:
+            self.attempts += records
+
+    def saveRun(
+        self,
+        projectConfig: DotDict,
+        mode: str,
+        rows: List[Tuple],
+        outputPath: str=None
+    ) -> int:
+        '''
+            rows: [(rowNum, functionName, netfn, cmd, availability, errorResponse, result, passLevel, info)]
+            returns the id of the run
+        '''
+        connection = self.connect()
+        try:
+            with connection:
+                runId = connection.execute(
+                    'INSERT INTO runs (project, host, mode, hardware_version, firmware_version, tester, started_at, finished_at, output_path) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (projectConfig.projectName, projectConfig.ip, mode, projectConfig.hardwareVersion, projectConfig.softwareVersion,
+                     projectConfig.tester, self.startedAt, time.time(), outputPath)
+                ).lastrowid
+                with self.__lock:
+                    connection.executemany(
+                        'INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        [(runId, *result) for result in self.__getResults(rows)]
+                    )
+                    connection.executemany(
+                        'INSERT INTO attempts VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        [(runId, seq, *attempt) for seq, attempt in enumerate(self.attempts)]
+                    )
+                    self.requests = []
+                    self.attempts = []
+        finally:
+            connection.close()
+
+        return runId
+
+    def __getResults(self, rows: List[Tuple]) -> List[Tuple]:
+        '''
+            the recorded requests under the row testing their NetFn/CMD (the first one if several rows test the same command),
+            then an entry for every row left without a request
+        '''
+        testCases = {}
+        for rowNum, functionName, netfn, cmd, *verdict in rows:
+            testCases.setdefault(getCommandKey(netfn, cmd), []).append((rowNum, functionName, *verdict))
+
+        seqs = {}
+        results = []
+        for netfn, cmd, *request in self.requests:
+            rowNum, functionName, *verdict = testCases.get((netfn, cmd), [NO_TEST_CASE])[0]
+            seq = seqs[(netfn, cmd)] = seqs.get((netfn, cmd), -1) + 1
+            results.append((netfn, cmd, seq, rowNum, functionName, *request, *verdict))
+        for (netfn, cmd), testCaseRows in testCases.items():
+            for rowNum, functionName, *verdict in testCaseRows[1 if (netfn, cmd) in seqs else 0:]:
+                seq = seqs[(netfn, cmd)] = seqs.get((netfn, cmd), -1) + 1
+                results.append((netfn, cmd, seq, rowNum, functionName, None, None, None, None, 0, 0, *verdict))
+        return results
+
+def getRegressions(
+    path: str,
+    projectName: str,
+    before: str,
+    after: str
+) -> List[DotDict]:
+    '''
+        commands that became unavailable, stopped passing or lost accuracy between two firmware versions,
+        comparing the latest run of each host on each version
+    '''
+    connection = ResultsStore(path).connect()
+    connection.row_factory = sqlite3.Row
+    try:
+        rows = connection.execute(REGRESSIONS_QUERY, {"project": projectName, "before": before, "after": after}).fetchall()
+    finally:
+        connection.close()
+
+    return [DotDict(dict(row)) for row in rows]
@@ -0,0 +1,127 @@
+'''
+    Minimal pure-Python AES-128 (FIPS-197) with CBC mode, used for the AES-CBC-128 confidentiality algorithm of RMCP+.
+    IPMI payloads are small, so a table based implementation is fast enough and avoids a native crypto dependency.
+'''
+from typing import List
+
+BLOCK_SIZE = 16
+
+def _rotl8(x: int, shift: int) -> int:
+    return ((x << shift) | (x >> (8 - shift))) & 0xff
+
+def _xtime(a: int) -> int:
+    return ((a << 1) ^ 0x1b) & 0xff if a & 0x80 else a << 1
+
+def _mul(a: int, b: int) -> int:
+    res = 0
+    while b:
+        if b & 1:
+            res ^= a
+        a = _xtime(a)
+        b >>= 1
+    return res
+
+def _buildSbox() -> List[int]:
+    sbox = [0] * 256
+    p = q = 1
+    while True:
+        p = p ^ ((p << 1) & 0xff) ^ (0x1b if p & 0x80 else 0)      # multiply p by 3
+        q ^= q << 1                                                 # divide q by 3
+        q ^= q << 2
+        q ^= q << 4
+        q &= 0xff
+        if q & 0x80:
+            q ^= 0x09
+        sbox[p] = q ^ _rotl8(q, 1) ^ _rotl8(q, 2) ^ _rotl8(q, 3) ^ _rotl8(q, 4) ^ 0x63
+        if p == 1:
+            break
+    sbox[0] = 0x63
+    return sbox
+
+SBOX = _buildSbox()
+INV_SBOX = [0] * 256
+for i, s in enumerate(SBOX):
+    INV_SBOX[s] = i
+
+MUL2 = [_mul(i, 2) for i in range(256)]
+MUL3 = [_mul(i, 3) for i in range(256)]
+MUL9 = [_mul(i, 9) for i in range(256)]
+MUL11 = [_mul(i, 11) for i in range(256)]
+MUL13 = [_mul(i, 13) for i in range(256)]
+MUL14 = [_mul(i, 14) for i in range(256)]
+
+def expandKey(key: bytes) -> List[List[int]]:
+    if len(key) != 16:
+        raise Exception(f"AES-128 key must be 16 bytes, got {len(key)}")
+
+    words = [list(key[i:i+4]) for i in range(0, 16, 4)]
+    rcon = 1
+    for i in range(4, 44):
+        word = list(words[i-1])
+        if i % 4 == 0:
+            word = [SBOX[b] for b in word[1:] + word[:1]]
+            word[0] ^= rcon
+            rcon = _xtime(rcon)
+        words.append([a ^ b for a, b in zip(words[i-4], word)])
+
+    return [sum(words[r*4:r*4+4], []) for r in range(11)]
+
+def encryptBlock(roundKeys: List[List[int]], block: bytes) -> bytes:
+    s = [b ^ k for b, k in zip(block, roundKeys[0])]
+    for r in range(1, 11):
+        s = [SBOX[b] for b in s]
+        s = [s[(i + 4 * (i % 4)) % 16] for i in range(16)]     # shift rows
+        if r != 10:
+            mixed = []
+            for c in range(0, 16, 4):
+                a0, a1, a2, a3 = s[c:c+4]
+                mixed += [
+                    MUL2[a0] ^ MUL3[a1] ^ a2 ^ a3,
+                    a0 ^ MUL2[a1] ^ MUL3[a2] ^ a3,
+                    a0 ^ a1 ^ MUL2[a2] ^ MUL3[a3],
+                    MUL3[a0] ^ a1 ^ a2 ^ MUL2[a3]
+                ]
+            s = mixed
+        s = [b ^ k for b, k in zip(s, roundKeys[r])]
+    return bytes(s)
+
+def decryptBlock(roundKeys: List[List[int]], block: bytes) -> bytes:
+    s = [b ^ k for b, k in zip(block, roundKeys[10])]
+    for r in range(9, -1, -1):
+        s = [s[(i - 4 * (i % 4)) % 16] for i in range(16)]     # inverse shift rows
+        s = [INV_SBOX[b] for b in s]
+        s = [b ^ k for b, k in zip(s, roundKeys[r])]
+        if r != 0:
+            mixed = []
+            for c in range(0, 16, 4):
+                a0, a1, a2, a3 = s[c:c+4]
+                mixed += [
+                    MUL14[a0] ^ MUL11[a1] ^ MUL13[a2] ^ MUL9[a3],
+                    MUL9[a0] ^ MUL14[a1] ^ MUL11[a2] ^ MUL13[a3],
+                    MUL13[a0] ^ MUL9[a1] ^ MUL14[a2] ^ MUL11[a3],
+                    MUL11[a0] ^ MUL13[a1] ^ MUL9[a2] ^ MUL14[a3]
+                ]
+            s = mixed
+    return bytes(s)
+
+def encryptCbc(key: bytes, iv: bytes, data: bytes) -> bytes:
+    '''
+        data must already be padded to a multiple of the block size (RMCP+ defines its own padding)
+    '''
+    roundKeys = expandKey(key)
+    res = b''
+    prev = iv
+    for i in range(0, len(data), BLOCK_SIZE):
+        prev = encryptBlock(roundKeys, bytes(a ^ b for a, b in zip(data[i:i+BLOCK_SIZE], prev)))
+        res += prev
+    return res
+
+def decryptCbc(key: bytes, iv: bytes, data: bytes) -> bytes:
+    roundKeys = expandKey(key)
+    res = b''
+    prev = iv
+    for i in range(0, len(data), BLOCK_SIZE):
+        block = data[i:i+BLOCK_SIZE]
+        res += bytes(a ^ b for a, b in zip(decryptBlock(roundKeys, block), prev))
+        prev = block
+    return res
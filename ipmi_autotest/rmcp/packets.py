@@ -0,0 +1,341 @@
+import os
+import hmac
+import struct
+import hashlib
+
+from enum import IntEnum
+from typing import Tuple
+
+from . import aes
+
+RMCP_HEADER = bytes([0x06, 0x00, 0xff, 0x07])     # version 1.0, reserved, no RMCP ACK, class IPMI
+ASF_RMCP_HEADER = bytes([0x06, 0x00, 0xff, 0x06])     # version 1.0, reserved, no RMCP ACK, class ASF
+
+ASF_IANA = 0x000011be
+ASF_PRESENCE_PING = 0x80
+ASF_PRESENCE_PONG = 0x40
+
+AUTH_TYPE_NONE = 0x00
+AUTH_TYPE_RMCPPLUS = 0x06
+
+BMC_ADDR = 0x20
+REMOTE_CONSOLE_ADDR = 0x81
+
+class PayloadType(IntEnum):
+    IPMI = 0x00
+    OPEN_SESSION_REQUEST = 0x10
+    OPEN_SESSION_RESPONSE = 0x11
+    RAKP1 = 0x12
+    RAKP2 = 0x13
+    RAKP3 = 0x14
+    RAKP4 = 0x15
+
+class Privilege(IntEnum):
+    CALLBACK = 0x01
+    USER = 0x02
+    OPERATOR = 0x03
+    ADMINISTRATOR = 0x04
+
+PAYLOAD_ENCRYPTED = 0x80
+PAYLOAD_AUTHENTICATED = 0x40
+NAME_ONLY_LOOKUP = 0x10
+
+# cipher suite id: (authentication, integrity, confidentiality) algorithm numbers
+CIPHER_SUITES = {
+    0: (0x00, 0x00, 0x00),
+    1: (0x01, 0x00, 0x00),
+    2: (0x01, 0x01, 0x00),
+    3: (0x01, 0x01, 0x01),
+    15: (0x03, 0x00, 0x00),
+    16: (0x03, 0x04, 0x00),
+    17: (0x03, 0x04, 0x01),
+}
+
+AUTH_ALGORITHMS = {
+    # algorithm: (hash, RAKP4 integrity check value length)
+    0x01: (hashlib.sha1, 12),      # RAKP-HMAC-SHA1
+    0x03: (hashlib.sha256, 16),    # RAKP-HMAC-SHA256
+}
+
+INTEGRITY_ALGORITHMS = {
+    # algorithm: (hash, AuthCode length)
+    0x01: (hashlib.sha1, 12),      # HMAC-SHA1-96
+    0x04: (hashlib.sha256, 16),    # HMAC-SHA256-128
+}
+
+CONFIDENTIALITY_AES_CBC_128 = 0x01
+
+COMPLETION_CODES = {
+    0x00: "Command completed normally",
+    0xc0: "Node busy",
+    0xc1: "Invalid command",
+    0xc2: "Invalid command on LUN",
+    0xc3: "Timeout",
+    0xc4: "Out of space",
+    0xc5: "Reservation cancelled or invalid",
+    0xc6: "Request data truncated",
+    0xc7: "Request data length invalid",
+    0xc8: "Request data field length limit exceeded",
+    0xc9: "Parameter out of range",
+    0xca: "Cannot return number of requested data bytes",
+    0xcb: "Requested sensor, data, or record not found",
+    0xcc: "Invalid data field in request",
+    0xcd: "Command illegal for specified sensor or record type",
+    0xce: "Command response could not be provided",
+    0xcf: "Cannot execute duplicated request",
+    0xd0: "SDR Repository in update mode",
+    0xd1: "Device firmeware in update mode",
+    0xd2: "BMC initialization in progress",
+    0xd3: "Destination unavailable",
+    0xd4: "Insufficient privilege level",
+    0xd5: "Command not supported in present state",
+    0xd6: "Cannot execute command, command disabled",
+    0xff: "Unspecified error",
+}
+
+RAKP_STATUS_CODES = {
+    0x00: "No errors",
+    0x01: "Insufficient resources to create a session",
+    0x02: "Invalid session ID",
+    0x03: "Invalid payload type",
+    0x04: "Invalid authentication algorithm",
+    0x05: "Invalid integrity algorithm",
+    0x06: "No matching authentication payload",
+    0x07: "No matching integrity payload",
+    0x08: "Inactive session ID",
+    0x09: "Invalid role",
+    0x0a: "Unauthorized role or privilege level requested",
+    0x0b: "Insufficient resources to create a session at the requested role",
+    0x0c: "Invalid name length",
+    0x0d: "Unauthorized name",
+    0x0e: "Unauthorized GUID",
+    0x0f: "Invalid integrity check value",
+    0x10: "Invalid confidentiality algorithm",
+    0x11: "No cipher suite match with proposed security algorithms",
+    0x12: "Illegal or unrecognized parameter",
+}
+
+def checksum(data: bytes) -> int:
+    return (-sum(data)) & 0xff
+
+def passwordKey(password: str) -> bytes:
+    '''
+        Kuid: the user password zero padded to 20 bytes
+    '''
+    return (password or '').encode()[:20].ljust(20, b'\x00')
+
+def hmacDigest(hashFunction, key: bytes, data: bytes) -> bytes:
+    return hmac.new(key, data, hashFunction).digest()
+
+class SessionKeys:
+    '''
+        Keys negotiated by RAKP, shared by the remote console (client) and the managed system (simulator).
+
+        SIK = HMAC(Kuid, Rm | Rc | ROLEm | ULENGTHm | UNAMEm)
+        K1 = HMAC(SIK, 0x01 * 20), integrity key
+        K2 = HMAC(SIK, 0x02 * 20), confidentiality key (first 16 bytes for AES-128)
+    '''
+    def __init__(
+        self,
+        cipherSuite: int,
+        password: str,
+        consoleRandom: bytes,
+        managedRandom: bytes,
+        role: int,
+        userName: str
+    ) -> None:
+        if cipherSuite not in CIPHER_SUITES:
+            raise Exception(f"Cipher suite {cipherSuite} not supported, choose one of {sorted(CIPHER_SUITES)}")
+
+        self.authAlgorithm, self.integrityAlgorithm, self.confidentialityAlgorithm = CIPHER_SUITES[cipherSuite]
+        self.sik = self.k1 = self.k2 = b''
+
+        if self.authAlgorithm:
+            authHash, _ = AUTH_ALGORITHMS[self.authAlgorithm]
+            userNameBytes = (userName or '').encode()
+            self.sik = hmacDigest(
+                authHash,
+                passwordKey(password),
+                consoleRandom + managedRandom + bytes([role, len(userNameBytes)]) + userNameBytes
+            )
+            self.k1 = hmacDigest(authHash, self.sik, b'\x01' * 20)
+            self.k2 = hmacDigest(authHash, self.sik, b'\x02' * 20)
+
+    @property
+    def isAuthenticated(self) -> bool:
+        return self.integrityAlgorithm != 0x00
+
+    @property
+    def isEncrypted(self) -> bool:
+        return self.confidentialityAlgorithm == CONFIDENTIALITY_AES_CBC_128
+
+    def authCode(self, data: bytes) -> bytes:
+        integrityHash, length = INTEGRITY_ALGORITHMS[self.integrityAlgorithm]
+        return hmacDigest(integrityHash, self.k1, data)[:length]
+
+    def authCodeLength(self) -> int:
+        return INTEGRITY_ALGORITHMS[self.integrityAlgorithm][1] if self.isAuthenticated else 0
+
+    def encrypt(self, payload: bytes) -> bytes:
+        padLength = (aes.BLOCK_SIZE - (len(payload) + 1) % aes.BLOCK_SIZE) % aes.BLOCK_SIZE
+        plain = payload + bytes(range(1, padLength + 1)) + bytes([padLength])
+        iv = os.urandom(aes.BLOCK_SIZE)
+        return iv + aes.encryptCbc(self.k2[:16], iv, plain)
+
+    def decrypt(self, payload: bytes) -> bytes:
+        if len(payload) < 2 * aes.BLOCK_SIZE or len(payload) % aes.BLOCK_SIZE:
+            raise Exception(f"Invalid encrypted payload length {len(payload)}")
+        plain = aes.decryptCbc(self.k2[:16], payload[:aes.BLOCK_SIZE], payload[aes.BLOCK_SIZE:])
+        return plain[:-(plain[-1] + 1)]
+
+def packSessionPacket(
+    payloadType: int,
+    payload: bytes,
+    sessionId: int=0,
+    sequence: int=0,
+    keys: SessionKeys=None
+) -> bytes:
+    '''
+        RMCP header | AuthType | PayloadType | SessionID | Sequence | Length | Payload | [Pad | PadLength | NextHeader | AuthCode]
+    '''
+    flags = 0
+    if keys is not None and keys.isEncrypted:
+        payload = keys.encrypt(payload)
+        flags |= PAYLOAD_ENCRYPTED
+    if keys is not None and keys.isAuthenticated:
+        flags |= PAYLOAD_AUTHENTICATED
+
+    body = bytes([AUTH_TYPE_RMCPPLUS, payloadType | flags]) + struct.pack('<IIH', sessionId, sequence, len(payload)) + payload
+    if flags & PAYLOAD_AUTHENTICATED:
+        padLength = (4 - (len(body) + 2) % 4) % 4
+        body += b'\xff' * padLength + bytes([padLength, 0x07])
+        body += keys.authCode(body)
+
+    return RMCP_HEADER + body
+
+def unpackSessionPacket(
+    packet: bytes,
+    keys: SessionKeys=None
+) -> Tuple[int, int, int, bytes]:
+    '''
+        returns (payloadType, sessionId, sequence, payload), the payload is verified and decrypted with keys if needed.
+        keys: those of the session the packet belongs to, its packets must be authenticated / encrypted as negotiated
+    '''
+    if len(packet) < 16 or packet[:4] != RMCP_HEADER or packet[4] != AUTH_TYPE_RMCPPLUS:
+        raise Exception("Not an RMCP+ packet")
+
+    flags = packet[5]
+    payloadType = flags & 0x3f
+    sessionId, sequence, length = struct.unpack('<IIH', packet[6:16])
+    payload = packet[16:16+length]
+    if len(payload) != length:
+        raise Exception("Truncated RMCP+ packet")
+
+    if keys is not None:    # clearing the flags must not skip the integrity check or the decryption
+        if keys.isAuthenticated and not flags & PAYLOAD_AUTHENTICATED:
+            raise Exception("Unauthenticated packet received in an authenticated session")
+        if keys.isEncrypted and not flags & PAYLOAD_ENCRYPTED:
+            raise Exception("Unencrypted packet received in an encrypted session")
+
+    if flags & PAYLOAD_AUTHENTICATED:
+        if keys is None or not keys.isAuthenticated:
+            raise Exception("Authenticated packet received without integrity keys")
+        codeLength = keys.authCodeLength()
+        body, code = packet[4:-codeLength], packet[-codeLength:]
+        if not hmac.compare_digest(keys.authCode(body), code):
+            raise Exception("RMCP+ packet integrity check failed")
+
+    if flags & PAYLOAD_ENCRYPTED:
+        if keys is None or not keys.isEncrypted:
+            raise Exception("Encrypted packet received without confidentiality keys")
+        payload = keys.decrypt(payload)
+
+    return payloadType, sessionId, sequence, payload
+
+def packPresencePing(tag: int) -> bytes:
+    '''
+        ASF RMCP header | IANA | MessageType | Tag | Reserved | DataLength
+    '''
+    return ASF_RMCP_HEADER + struct.pack('>IBBBB', ASF_IANA, ASF_PRESENCE_PING, tag, 0x00, 0x00)
+
+def packPresencePong(tag: int) -> bytes:
+    '''
+        IANA | OEM | Supported Entities (IPMI) | Supported Interactions | Reserved
+    '''
+    data = struct.pack('>II', ASF_IANA, 0x00000000) + bytes([0x81, 0x00]) + b'\x00' * 6
+    return ASF_RMCP_HEADER + struct.pack('>IBBBB', ASF_IANA, ASF_PRESENCE_PONG, tag, 0x00, len(data)) + data
+
+def unpackAsfMessage(packet: bytes) -> Tuple[int, int]:
+    '''
+        returns (messageType, tag)
+    '''
+    if len(packet) < 12 or packet[:4] != ASF_RMCP_HEADER:
+        raise Exception("Not an ASF RMCP packet")
+    iana, messageType, tag = struct.unpack('>IBB', packet[4:10])
+    if iana != ASF_IANA:
+        raise Exception("Not an ASF RMCP packet")
+    return messageType, tag
+
+def packSessionlessPacket(message: bytes) -> bytes:
+    '''
+        IPMI v1.5 packet outside of a session: RMCP header | AuthType | Sequence | SessionID | Length | Message
+    '''
+    return RMCP_HEADER + bytes([AUTH_TYPE_NONE]) + struct.pack('<IIB', 0, 0, len(message)) + message
+
+def unpackSessionlessPacket(packet: bytes) -> bytes:
+    if len(packet) < 14 or packet[:4] != RMCP_HEADER or packet[4] != AUTH_TYPE_NONE:
+        raise Exception("Not an IPMI v1.5 session-less packet")
+    return packet[14:14+packet[13]]
+
+def packIpmiRequest(
+    netfn: int,
+    cmd: int,
+    data: bytes,
+    rqSeq: int,
+    lun: int=0
+) -> bytes:
+    header = bytes([BMC_ADDR, (netfn << 2) | lun])
+    body = bytes([REMOTE_CONSOLE_ADDR, (rqSeq << 2) | 0x00, cmd]) + data
+    return header + bytes([checksum(header)]) + body + bytes([checksum(body)])
+
+def unpackIpmiRequest(message: bytes) -> Tuple[int, int, int, bytes]:
+    '''
+        returns (netfn, cmd, rqSeq, data)
+    '''
+    if len(message) < 7 or checksum(message[:2]) != message[2] or checksum(message[3:-1]) != message[-1]:
+        raise Exception("Invalid IPMI request checksum")
+    return message[1] >> 2, message[5], message[4] >> 2, message[6:-1]
+
+def packIpmiResponse(
+    netfn: int,
+    cmd: int,
+    rqSeq: int,
+    completionCode: int,
+    data: bytes=b''
+) -> bytes:
+    header = bytes([REMOTE_CONSOLE_ADDR, ((netfn | 0x01) << 2) | 0x00])
+    body = bytes([BMC_ADDR, (rqSeq << 2) | 0x00, cmd, completionCode]) + data
+    return header + bytes([checksum(header)]) + body + bytes([checksum(body)])
+
+def unpackIpmiResponse(message: bytes) -> Tuple[int, int, int, int, bytes]:
+    '''
+        returns (netfn, cmd, rqSeq, completionCode, data)
+    '''
+    if len(message) < 8 or checksum(message[:2]) != message[2] or checksum(message[3:-1]) != message[-1]:
+        raise Exception("Invalid IPMI response checksum")
+    return message[1] >> 2, message[5], message[4] >> 2, message[6], message[7:-1]
+
+def formatRawResponse(data: bytes) -> str:
+    '''
+        same layout as `ipmitool raw`: " xx" per byte, 16 bytes per line
+    '''
+    lines = [''.join(f' {b:02x}' for b in data[i:i+16]) for i in range(0, len(data), 16)]
+    return '\n'.join(lines) + '\n'
+
+def formatRawError(netfn: int, cmd: int, completionCode: int=None) -> str:
+    '''
+        same message as `ipmitool raw` on failure
+    '''
+    if completionCode is None:
+        return f"Unable to send RAW command (channel=0x0 netfn=0x{netfn:x} lun=0x0 cmd=0x{cmd:x})\n"
+    return f"Unable to send RAW command (channel=0x0 netfn=0x{netfn:x} lun=0x0 cmd=0x{cmd:x} rsp=0x{completionCode:x}): {COMPLETION_CODES.get(completionCode, 'Unknown (0x%02X)' % completionCode)}\n"
@@ -0,0 +1,111 @@
+import time
+import socket
+import threading
+
+from typing import Dict, Tuple
+
+from defs.dotDict import DotDict
+from .packets import (
+    Privilege, ASF_PRESENCE_PONG,
+    packPresencePing, unpackAsfMessage, packSessionlessPacket, unpackSessionlessPacket, packIpmiRequest, unpackIpmiResponse
+)
+
+GET_CHANNEL_AUTH_CAPABILITIES = (0x06, 0x38)
+
+_cache: Dict[Tuple[str, int], DotDict] = {}
+_cacheLock = threading.Lock()
+
+def probeBmc(
+    host: str,
+    port: int=623,
+    timeout: float=0.3,
+    retries: int=2,
+    useCache: bool=True
+) -> DotDict:
+    '''
+        Checks that a BMC answers on its RMCP port, without ICMP and without opening a session.
+
+        Every attempt sends an ASF presence ping and a session-less Get Channel Authentication Capabilities request,
+        the first valid answer to either one counts (some BMCs ignore ASF pings, IPMI v2 BMCs must answer the latter).
+        Results are cached per (host, port) for the life of the process.
+
+        returns DotDict(reachable, method, elapsed, ipmi20, error)
+    '''
+    key = (host, port)
+    with _cacheLock:
+        if useCache and key in _cache:
+            return _cache[key]
+
+    result = _probe(host, port, timeout, retries)
+
+    with _cacheLock:
+        _cache[key] = result
+    return result
+
+def clearProbeCache() -> None:
+    with _cacheLock:
+        _cache.clear()
+
+def _probe(
+    host: str,
+    port: int,
+    timeout: float,
+    retries: int
+) -> DotDict:
+    start = time.perf_counter()
+    try:
+        family, type, proto, _, address = socket.getaddrinfo(host, port, type=socket.SOCK_DGRAM)[0]
+    except socket.gaierror as e:
+        return DotDict({"reachable": False, "method": None, "elapsed": time.perf_counter() - start, "ipmi20": None, "error": str(e)})
+
+    error = f"No RMCP response from {host}:{port} after {retries + 1} attempts"
+    with socket.socket(family, type, proto) as sock:
+        sock.connect(address)
+        for attempt in range(retries + 1):
+            tag = attempt & 0xff
+            try:
+                sock.send(packPresencePing(tag))
+                sock.send(packSessionlessPacket(packIpmiRequest(*GET_CHANNEL_AUTH_CAPABILITIES, bytes([0x8e, Privilege.ADMINISTRATOR]), tag & 0x3f)))
+            except (ConnectionRefusedError, ConnectionResetError):
+                error = f"{host}:{port} refused the connection"
+                break
+            except OSError as e:
+                error = str(e)
+                break
+
+            deadline = time.perf_counter() + timeout
+            while (remaining := deadline - time.perf_counter()) > 0:
+                sock.settimeout(remaining)
+                try:
+                    packet = sock.recv(1024)
+                except socket.timeout:
+                    break
+                except (ConnectionRefusedError, ConnectionResetError):     # ICMP port unreachable, host is up but nothing listens
+                    error = f"{host}:{port} refused the connection"
+                    break
+                response = _parseResponse(packet)
+                if response is not None:
+                    response.update({"reachable": True, "elapsed": time.perf_counter() - start, "error": None})
+                    return response
+
+    return DotDict({"reachable": False, "method": None, "elapsed": time.perf_counter() - start, "ipmi20": None, "error": error})
+
+def _parseResponse(packet: bytes) -> DotDict:
+    try:
+        messageType, _ = unpackAsfMessage(packet)
+        if messageType == ASF_PRESENCE_PONG:
+            return DotDict({"method": "presence ping", "ipmi20": None})
+        return None
+    except Exception:
+        pass
+
+    try:
+        _, cmd, _, completionCode, data = unpackIpmiResponse(unpackSessionlessPacket(packet))
+    except Exception:   # stray or malformed datagram
+        return None
+    if cmd != GET_CHANNEL_AUTH_CAPABILITIES[1]:
+        return None
+    return DotDict({
+        "method": "get channel authentication capabilities",
+        "ipmi20": completionCode == 0x00 and len(data) > 3 and bool(data[3] & 0x02)
+    })
@@ -0,0 +1,220 @@
+import os
+import time
+import random
+import socket
+import struct
+import threading
+
+from typing import Tuple
+
+from .packets import (
+    PayloadType, Privilege, SessionKeys, CIPHER_SUITES, AUTH_ALGORITHMS, RAKP_STATUS_CODES, NAME_ONLY_LOOKUP,
+    passwordKey, hmacDigest, packSessionPacket, unpackSessionPacket, packIpmiRequest, unpackIpmiResponse
+)
+
+class LanplusSession:
+    '''
+        IPMI v2.0 RMCP+ (lanplus) client keeping one authenticated session open.
+
+        open():     Open Session Request/Response, RAKP 1-4, then Set Session Privilege Level
+        sendRaw():  sends an IPMI request as a byte frame and returns (completionCode, data)
+        close():    Close Session
+    '''
+    def __init__(
+        self,
+        host: str,
+        port: int=623,
+        userName: str="",
+        password: str="",
+        cipherSuite: int=17,
+        privilege: Privilege=Privilege.ADMINISTRATOR,
+        timeout: float=1.0,
+        retries: int=3
+    ) -> None:
+        if cipherSuite not in CIPHER_SUITES:
+            raise Exception(f"Cipher suite {cipherSuite} not supported, choose one of {sorted(CIPHER_SUITES)}")
+
+        self.host = host
+        self.port = port
+        self.userName = userName or ""
+        self.password = password or ""
+        self.cipherSuite = cipherSuite
+        self.privilege = privilege
+        self.timeout = timeout
+        self.retries = retries
+
+        self.__socket = None
+        self.__keys = None
+        self.__lock = threading.RLock()
+        self.__tag = 0
+        self.__rqSeq = 0
+        self.__sequence = 0
+        self.__consoleSessionId = 0
+        self.__managedSessionId = 0
+
+    @property
+    def isOpen(self) -> bool:
+        return self.__keys is not None
+
+    def __nextTag(self) -> int:
+        self.__tag = (self.__tag + 1) & 0xff
+        return self.__tag
+
+    def __connect(self) -> None:
+        family, type, proto, _, address = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_DGRAM)[0]
+        self.__socket = socket.socket(family, type, proto)
+        self.__socket.settimeout(self.timeout)
+        self.__socket.connect(address)
+
+    def __exchange(self, packet: bytes, responseType: PayloadType, tag: int) -> bytes:
+        '''
+            sends a session setup packet and waits for the matching response payload, retransmitting on timeout
+        '''
+        for _ in range(self.retries + 1):
+            self.__socket.send(packet)
+            deadline = time.monotonic() + self.timeout
+            while time.monotonic() < deadline:
+                try:
+                    payloadType, _, _, payload = unpackSessionPacket(self.__socket.recv(1024))
+                except socket.timeout:
+                    break
+                except (ConnectionRefusedError, ConnectionResetError) as e:
+                    raise Exception(f"{self.host}:{self.port} refused the connection") from e
+                except Exception:   # stray or malformed datagram
+                    continue
+                if payloadType == responseType and payload[:1] == bytes([tag]):
+                    return payload
+
+        raise Exception(f"No {responseType.name} response from {self.host}:{self.port}")
+
+    def __checkStatus(self, step: str, status: int) -> None:
+        if status != 0x00:
+            raise Exception(f"{step} failed: {RAKP_STATUS_CODES.get(status, f'unknown status 0x{status:02x}')}")
+
+    def open(self) -> None:
+        with self.__lock:
+            if self.isOpen:
+                return
+
+            self.__connect()
+            try:
+                self.__handshake()
+            except Exception:
+                self.__reset()
+                raise
+
+    def __handshake(self) -> None:
+        authAlgorithm, integrityAlgorithm, confidentialityAlgorithm = CIPHER_SUITES[self.cipherSuite]
+        self.__consoleSessionId = random.randint(1, 0xffffffff)
+
+        # Open Session
+        tag = self.__nextTag()
+        request = bytes([tag, self.privilege, 0x00, 0x00]) + struct.pack('<I', self.__consoleSessionId)
+        request += bytes([0x00, 0x00, 0x00, 0x08, authAlgorithm, 0x00, 0x00, 0x00])
+        request += bytes([0x01, 0x00, 0x00, 0x08, integrityAlgorithm, 0x00, 0x00, 0x00])
+        request += bytes([0x02, 0x00, 0x00, 0x08, confidentialityAlgorithm, 0x00, 0x00, 0x00])
+        response = self.__exchange(packSessionPacket(PayloadType.OPEN_SESSION_REQUEST, request), PayloadType.OPEN_SESSION_RESPONSE, tag)
+        self.__checkStatus('Open Session', response[1])
+        managedSessionId, = struct.unpack('<I', response[8:12])
+
+        # RAKP 1/2
+        tag = self.__nextTag()
+        consoleRandom = os.urandom(16)
+        role = self.privilege | NAME_ONLY_LOOKUP
+        userName = self.userName.encode()
+        request = bytes([tag, 0x00, 0x00, 0x00]) + struct.pack('<I', managedSessionId) + consoleRandom
+        request += bytes([role, 0x00, 0x00, len(userName)]) + userName
+        response = self.__exchange(packSessionPacket(PayloadType.RAKP1, request), PayloadType.RAKP2, tag)
+        self.__checkStatus('RAKP 2', response[1])
+        managedRandom, managedGuid, keyExchangeCode = response[8:24], response[24:40], response[40:]
+
+        if authAlgorithm:
+            authHash, icvLength = AUTH_ALGORITHMS[authAlgorithm]
+            expected = hmacDigest(
+                authHash,
+                passwordKey(self.password),
+                struct.pack('<II', self.__consoleSessionId, managedSessionId) + consoleRandom + managedRandom + managedGuid + bytes([role, len(userName)]) + userName
+            )
+            if expected != keyExchangeCode:
+                raise Exception("RAKP 2 HMAC is invalid, check the user name and password")
+
+        keys = SessionKeys(self.cipherSuite, self.password, consoleRandom, managedRandom, role, self.userName)
+
+        # RAKP 3/4
+        tag = self.__nextTag()
+        request = bytes([tag, 0x00, 0x00, 0x00]) + struct.pack('<I', managedSessionId)
+        if authAlgorithm:
+            request += hmacDigest(
+                authHash,
+                passwordKey(self.password),
+                managedRandom + struct.pack('<I', self.__consoleSessionId) + bytes([role, len(userName)]) + userName
+            )
+        response = self.__exchange(packSessionPacket(PayloadType.RAKP3, request), PayloadType.RAKP4, tag)
+        self.__checkStatus('RAKP 4', response[1])
+
+        if authAlgorithm:
+            expected = hmacDigest(authHash, keys.sik, consoleRandom + struct.pack('<I', managedSessionId) + managedGuid)[:icvLength]
+            if expected != response[8:8+icvLength]:
+                raise Exception("RAKP 4 integrity check value is invalid")
+
+        self.__managedSessionId = managedSessionId
+        self.__keys = keys
+        self.__sequence = 0
+
+        completionCode, _ = self.sendRaw(0x06, 0x3b, bytes([self.privilege]))     # Set Session Privilege Level
+        if completionCode != 0x00:
+            raise Exception(f"Set Session Privilege Level failed with completion code 0x{completionCode:02x}")
+
+    def sendRaw(
+        self,
+        netfn: int,
+        cmd: int,
+        data: bytes=b''
+    ) -> Tuple[int, bytes]:
+        '''
+            returns (completionCode, response data)
+        '''
+        with self.__lock:
+            if not self.isOpen:
+                self.open()
+
+            self.__rqSeq = (self.__rqSeq + 1) & 0x3f
+            message = packIpmiRequest(netfn, cmd, data, self.__rqSeq)
+
+            for _ in range(self.retries + 1):
+                self.__sequence = (self.__sequence % 0xffffffff) + 1
+                self.__socket.send(packSessionPacket(PayloadType.IPMI, message, self.__managedSessionId, self.__sequence, self.__keys))
+                deadline = time.monotonic() + self.timeout
+                while time.monotonic() < deadline:
+                    try:
+                        payloadType, sessionId, _, payload = unpackSessionPacket(self.__socket.recv(1024), self.__keys)
+                        if payloadType != PayloadType.IPMI or sessionId != self.__consoleSessionId:
+                            continue
+                        _, rspCmd, rqSeq, completionCode, rspData = unpackIpmiResponse(payload)
+                    except socket.timeout:
+                        break
+                    except (ConnectionRefusedError, ConnectionResetError) as e:
+                        self.__reset()
+                        raise Exception(f"{self.host}:{self.port} refused the connection") from e
+                    except Exception:   # stale, corrupted or forged datagram
+                        continue
+                    if rqSeq == self.__rqSeq and rspCmd == cmd:
+                        return completionCode, rspData
+
+            self.__reset()      # the BMC may have dropped the session, negotiate a new one on the next request
+            raise Exception(f"No response from {self.host}:{self.port} for netfn=0x{netfn:x} cmd=0x{cmd:x}")
+
+    def __reset(self) -> None:
+        if self.__socket is not None:
+            self.__socket.close()
+        self.__socket = None
+        self.__keys = None
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.isOpen:
+                try:
+                    self.sendRaw(0x06, 0x3c, struct.pack('<I', self.__managedSessionId))     # Close Session
+                except Exception:
+                    pass
+            self.__reset()
@@ -0,0 +1,139 @@
+import logging
+import threading
+
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Dict, Iterator, Set, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tqdm import tqdm
+
+from base import TestCase
+from defs.enums import Result, Resource
+
+# a power cycle or a BMC reset changes what every read returns, read-only tests do not run next to them
+DISRUPTIVE_RESOURCES = frozenset((Resource.POWER_STATE, Resource.BMC_RESET))
+
+class ResourceLocks:
+    '''
+        Per-resource locks of the tests running concurrently.
+
+        acquire(resources):     waits until no running test holds any of `resources`,
+                                and until no read-only test runs if `resources` include a DISRUPTIVE_RESOURCES
+        acquire(()):            read-only, takes no lock but waits until no test holds DISRUPTIVE_RESOURCES
+        acquire(None):          undeclared, the test may change anything: waits until no test runs and keeps others from starting
+    '''
+    def __init__(self) -> None:
+        self.held: Set[Resource] = set()
+        self.running = 0
+        self.reading = 0            # read-only tests running
+        self.exclusive = False      # an undeclared test runs
+        self.waiting = 0            # undeclared tests waiting, new tests wait behind them
+        self.disrupting = 0         # tests waiting for DISRUPTIVE_RESOURCES, new read-only tests wait behind them
+        self.__condition = threading.Condition()
+
+    @contextmanager
+    def acquire(self, resources: Tuple[Resource]=None) -> Iterator[None]:
+        with self.__condition:
+            if resources is None:
+                self.waiting += 1
+                self.__condition.wait_for(lambda: not self.exclusive and not self.running)
+                self.waiting -= 1
+                self.exclusive = True
+            elif not resources:
+                self.__condition.wait_for(lambda: not self.exclusive and not self.waiting and not self.disrupting and not self.held & DISRUPTIVE_RESOURCES)
+                self.reading += 1
+            else:
+                disruptive = not DISRUPTIVE_RESOURCES.isdisjoint(resources)
+                self.disrupting += disruptive
+                self.__condition.wait_for(lambda: (
+                    not self.exclusive and not self.waiting and not self.held.intersection(resources)
+                    and not (disruptive and self.reading)
+                ))
+                self.disrupting -= disruptive
+                self.held.update(resources)
+            self.running += 1
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.running -= 1
+                if resources is None:
+                    self.exclusive = False
+                elif not resources:
+                    self.reading -= 1
+                else:
+                    self.held.difference_update(resources)
+                self.__condition.notify_all()
+
+class TestScheduler:
+    '''
+        Runs functional test cases according to the resources they declare (TestCase.resources), see ResourceLocks.
+
+        Tests declaring () only read from the BMC and run concurrently on `workers` threads, but not during a power cycle or a BMC reset.
+        Tests declaring resources change that BMC state (power, reset, SEL...), a test waits for the ones holding the same resources.
+        Tests leaving resources undeclared (None) may change anything, they run alone.
+        workers == 1 keeps the sequential row order.
+        rowContext(rowNum) is entered around each test in the thread running it (e.g. RowLogBuffer.row).
+    '''
+    def __init__(
+        self,
+        workers: int=1,
+        onWorkerStart: Callable[[], None]=None,
+        showProgress: bool=True,
+        rowContext: Callable[[int], ContextManager]=None
+    ) -> None:
+        self.workers = workers
+        self.onWorkerStart = onWorkerStart
+        self.showProgress = showProgress
+        self.rowContext = rowContext or (lambda rowNum: nullcontext())
+        self.locks = ResourceLocks()
+        self.logger = logging.getLogger('main.scheduler')
+
+    def __test(self, rowNum: int, testCase: TestCase) -> Tuple[Union[int, Result], str]:
+        with self.rowContext(rowNum):
+            return testCase.test()
+
+    def __testLocked(self, rowNum: int, testCase: TestCase) -> Tuple[Union[int, Result], str]:
+        with self.locks.acquire(testCase.resources):
+            return self.__test(rowNum, testCase)
+
+    def run(
+        self,
+        testCases: Dict[int, TestCase],
+        onResult: Callable[[int, Tuple[Union[int, Result], str]], None]=None
+    ) -> Dict[int, Tuple[Union[int, Result], str]]:
+        '''
+            testCases: {rowNum: TestCase}, returns {rowNum: (result, info)}
+            onResult(rowNum, (result, info)) is called in the calling thread as each test finishes
+        '''
+        onResult = onResult or (lambda rowNum, result: None)
+        results = {}
+        with tqdm(
+            desc='Testing...',
+            total=len(testCases),
+            ncols=100,
+            leave=True,
+            disable=not self.showProgress
+        ) as progress:
+            if self.workers <= 1:
+                for rowNum, testCase in testCases.items():
+                    results[rowNum] = self.__test(rowNum, testCase)
+                    onResult(rowNum, results[rowNum])
+                    progress.update(1)
+                return results
+
+            undeclared = [rowNum for rowNum, testCase in testCases.items() if testCase.resources is None]
+            readOnly = [rowNum for rowNum, testCase in testCases.items() if testCase.resources == ()]
+            self.logger.debug(
+                "%d read-only tests on %d workers, %d locking their resources, %d without declared resources running alone",
+                len(readOnly), self.workers, len(testCases) - len(readOnly) - len(undeclared), len(undeclared)
+            )
+
+            with ThreadPoolExecutor(max_workers=self.workers, initializer=self.onWorkerStart) as executor:
+                futures = {executor.submit(self.__testLocked, rowNum, testCase): rowNum for rowNum, testCase in testCases.items()}
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    onResult(futures[future], results[futures[future]])
+                    progress.update(1)
+
+        return results
@@ -0,0 +1,91 @@
+import os
+import re
+import json
+import logging
+
+from typing import Callable, Tuple
+
+from defs.dotDict import DotDict
+from defs.globalVars import CACHE_DIR
+
+SDR_CACHE_DIR = os.path.join(CACHE_DIR, 'sdr')
+
+def parseSdrRepositoryInfo(stdout: str) -> DotDict:
+    '''
+        Get SDR Repository Info (Storage 20h) response:
+            1: SDR version, 2-3: record count, 4-5: free space, 6-9: most recent addition timestamp,
+            10-13: most recent erase timestamp, 14: operation support (all LS byte first)
+    '''
+    data = bytes.fromhex(stdout.replace('\n', ' '))
+    if len(data) < 13:
+        raise Exception(f"Get SDR Repository Info response too short: '{stdout.strip()}'")
+
+    return DotDict({
+        "version": data[0],
+        "recordCount": int.from_bytes(data[1:3], 'little'),
+        "addTimestamp": int.from_bytes(data[5:9], 'little'),
+        "eraseTimestamp": int.from_bytes(data[9:13], 'little')
+    })
+
+class SdrCache:
+    '''
+        Keeps an `ipmitool sdr dump` of each BMC under .cache/sdr/<host>.sdr (host: <ip>_<port> as in fleet mode, 'local' in-band),
+        handed to ipmitool with -S so sensor commands stop downloading the whole SDR repository on every call.
+
+        The dump is reused as long as Get SDR Repository Info reports the same most recent addition / erase timestamps
+        (and record count), any SDR change on the BMC updates them and the repository is dumped again.
+    '''
+    def __init__(
+        self,
+        host: str,
+        cacheDir: str=SDR_CACHE_DIR
+    ) -> None:
+        self.logger = logging.getLogger('main.sdrCache')
+        name = re.sub(r'[^0-9A-Za-z.-]', '_', host or 'local')
+        self.dumpPath = os.path.join(cacheDir, f'{name}.sdr')
+        self.infoPath = os.path.join(cacheDir, f'{name}.json')
+
+    def __loadInfo(self) -> DotDict:
+        try:
+            with open(self.infoPath) as f:
+                return DotDict(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def prepare(
+        self,
+        rawCommand: Callable[..., Tuple[str, str]],
+        generalCommand: Callable[..., Tuple[str, str]]
+    ) -> str:
+        '''
+            returns the path of an up-to-date dump, None if the BMC cannot provide one (the SDR is then read as usual)
+        '''
+        stdout, stderr = rawCommand("0x0a", "0x20")
+        if stderr:
+            self.logger.debug("Get SDR Repository Info failed, SDR cache not used: %s", stderr.strip())
+            return None
+        try:
+            info = parseSdrRepositoryInfo(stdout)
+        except Exception as e:
+            self.logger.debug("%s, SDR cache not used", e)
+            return None
+
+        cached = self.__loadInfo()
+        if cached == info and os.path.exists(self.dumpPath) and os.path.getsize(self.dumpPath):
+            self.logger.debug("SDR repository unchanged (%s records), using %s", info.recordCount, self.dumpPath)
+            return self.dumpPath
+
+        os.makedirs(os.path.dirname(self.dumpPath), exist_ok=True)
+        tmpPath = f'{self.dumpPath}.{os.getpid()}.tmp'
+        _, stderr = generalCommand("sdr", "dump", tmpPath)
+        if not os.path.exists(tmpPath) or not os.path.getsize(tmpPath):
+            self.logger.debug("sdr dump failed, SDR cache not used: %s", stderr.strip())
+            if os.path.exists(tmpPath):
+                os.remove(tmpPath)
+            return None
+
+        os.replace(tmpPath, self.dumpPath)
+        with open(self.infoPath, 'w') as f:
+            json.dump(info, f)
+        self.logger.debug("SDR repository dumped to %s (%s records)", self.dumpPath, info.recordCount)
+        return self.dumpPath
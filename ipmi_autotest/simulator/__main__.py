@@ -0,0 +1,78 @@
+import os
+import sys
+import json
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from simulator.bmc import SimulatedBMC, loadSimulatorConfig
+from simulator.lanplusServer import LanplusServer
+from simulator.fakeIpmitool import CONFIG_ENV
+from defs.functions import getLabelsDir
+
+def SimulatorParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Local BMC simulator serving a project test plan')
+
+    parser.add_argument('-p', '--project-name', type=str, default=None, help='Project whose Raw CMD sheet and labels are served')
+    parser.add_argument('-c', '--config', type=str, default=None, help='(Optional) Simulator config JSON')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Listening address of the lanplus responder')
+    parser.add_argument('--port', type=int, default=6230, help='Listening UDP port of the lanplus responder')
+    parser.add_argument('-U', '--user-name', type=str, default='admin', help='Accepted BMC user name')
+    parser.add_argument('-P', '--password', type=str, default='admin', help='Accepted BMC password')
+    parser.add_argument('--latency', type=float, default=None, help='Seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=None, help='Probability of answering with an error completion code')
+    parser.add_argument('--invalid', type=str, nargs='*', default=None, help='Commands answered with "Invalid command", e.g. "App 01h"')
+    parser.add_argument('--power-transition-delay', type=float, default=None, help='Seconds until a chassis power change takes effect')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for error injection')
+    parser.add_argument('--workers', type=int, default=16, help='Threads answering IPMI requests')
+    parser.add_argument(
+        '--write-config',
+        type=os.path.abspath,
+        default=None,
+        help=f'Write the resolved config to this path and exit, point ${CONFIG_ENV} to it to use simulator/bin/ipmitool'
+    )
+
+    return parser
+
+if __name__ == '__main__':
+    args = SimulatorParser().parse_args()
+
+    config = loadSimulatorConfig(
+        args.config,
+        project=args.project_name,
+        latency=args.latency,
+        errorRate=args.error_rate,
+        invalid=args.invalid,
+        powerTransitionDelay=args.power_transition_delay,
+        seed=args.seed
+    )
+
+    bmc = SimulatedBMC(config)
+
+    if args.write_config:
+        config.functions = bmc.resolvedFunctions()
+        config.sensors = bmc.sensors
+        config.fru = {str(fruId): image.hex() for fruId, image in bmc.fruImages.items()}
+        config.labelsDir = getLabelsDir(config.project) if config.project else None
+        config.stateFile = config.stateFile or f'{args.write_config}.state'
+        with open(args.write_config, 'w') as f:
+            json.dump(config, f, indent=4)
+        print(f"export {CONFIG_ENV}={args.write_config}")
+        print(f"export PATH={os.path.join(ROOT, 'simulator', 'bin')}:$PATH")
+        sys.exit(0)
+
+    server = LanplusServer(
+        bmc,
+        host=args.host,
+        port=args.port,
+        userName=args.user_name,
+        password=args.password,
+        workers=args.workers
+    )
+    print(f"Simulated BMC for project '{config.project}' listening on {server.address[0]}:{server.address[1]}")
+    try:
+        server.serveForever()
+    except KeyboardInterrupt:
+        server.stop()
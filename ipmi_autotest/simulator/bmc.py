@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import random
+import threading
+
+from typing import Dict, List, Tuple
+
+from defs.dotDict import DotDict
+from defs.parsers import parseNetFn, parseCmd, parseRawFunctionName
+
+COMPLETION_CODE_OK = 0x00
+COMPLETION_CODE_INVALID_COMMAND = 0xc1
+COMPLETION_CODE_UNSPECIFIED_ERROR = 0xff
+
+DEFAULT_CONFIG = {
+    "project": None,
+    "latency": 0.0,             # seconds added to every response
+    "errorRate": 0.0,           # probability of answering with errorCode instead of the expected response
+    "errorCode": "0xff",
+    "invalid": [],              # commands answered with "Invalid command", e.g. ["App 01h", "0x06 0x04"]
+    "commands": {},             # per-command overrides: {"S/E 2Dh": {"latency": 0.01, "errorRate": 0.1, "invalid": false}}
+    "powerTransitionDelay": 0.0,
+    "stateFile": None,          # persists chassis state across fake ipmitool processes
+    "functions": None,          # resolved {"0x06 0x01": "Get Device ID"} table, skips opening the workbook when present
+    "labelsDir": None,
+    "sdrReadDelay": 0.0,        # seconds `sensor list` takes to download the SDR repository when no local SDR cache (-S) is given
+    "sdrTimestamp": 0,          # most recent addition/erase timestamp reported by Get SDR Repository Info, change it to invalidate SDR caches
+    "sensors": None,            # resolved 'Sensor Info' rows served by `sensor list`, read from the workbook on first use when absent
+    "fru": None,                # resolved {"0": "<image hex>"} served by Read FRU Data, built from the 'Fru Info' sheet on first use when absent
+    "fruReadLimit": None,       # largest Read FRU Data count accepted, larger reads fail with CAh
+    "seed": None,
+}
+
+def parseCommandKey(key: str) -> Tuple[int, int]:
+    '''
+        accepts workbook notation ("App 01h") or raw notation ("0x06 0x01")
+    '''
+    netfn, cmd = key.rsplit(' ', 1)
+    if netfn.startswith('0x'):
+        return int(netfn, 16), int(cmd, 16)
+    return int(parseNetFn(netfn).value, 16), int(parseCmd(cmd), 16)
+
+def loadSimulatorConfig(path: str=None, **overrides) -> DotDict:
+    config = DotDict(DEFAULT_CONFIG)
+    if path:
+        with open(path) as f:
+            config.update(json.load(f))
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    return config
+
+class SimulatedBMC:
+    '''
+        In-memory BMC answering the NetFn/CMD pairs of a project's 'Raw CMD' sheet.
+        Responses come from the project's labels/*Labels.json, other supported commands answer with an empty response.
+        Chassis power state is emulated so behavioral tests (Chassis Control) can run against it.
+    '''
+    def __init__(self, config: DotDict) -> None:
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+
+        self.functions: Dict[Tuple[int, int], str] = {}
+        self.labels: Dict[Tuple[int, int], Dict[Tuple[int], bytes]] = {}
+        self.overrides: Dict[Tuple[int, int], DotDict] = {
+            parseCommandKey(key): DotDict(value) for key, value in (config.commands or {}).items()
+        }
+        for key in config.invalid or []:
+            self.overrides.setdefault(parseCommandKey(key), DotDict())['invalid'] = True
+
+        self.powerOn = True
+        self.powerTarget = None
+        self.powerChangeTime = 0.0
+
+        if config.functions:
+            self.functions = {parseCommandKey(key): functionName for key, functionName in config.functions.items()}
+        elif config.project:
+            self.__loadFunctions(config.project)
+        if config.labelsDir:
+            self.__loadLabels(config.labelsDir)
+        elif config.project:
+            from defs.functions import getLabelsDir
+            self.__loadLabels(getLabelsDir(config.project))
+
+    @property
+    def sensors(self) -> List[DotDict]:
+        '''
+            [{"name", "type", "nominal", "thresholds": {"LNR": ..., ...}}], first row of each sensor name
+        '''
+        if self.config.sensors is None:
+            self.config.sensors = self.__loadSensors(self.config.project) if self.config.project else []
+        return [DotDict(sensor) for sensor in self.config.sensors]
+
+    @property
+    def fruImages(self) -> Dict[int, bytes]:
+        if self.config.fru is None:
+            self.config.fru = self.__loadFru(self.config.project) if self.config.project else {}
+        return {int(fruId): bytes.fromhex(image) for fruId, image in self.config.fru.items()}
+
+    def resolvedFunctions(self) -> Dict[str, str]:
+        return {f'0x{netfn:02x} 0x{cmd:02x}': functionName for (netfn, cmd), functionName in self.functions.items()}
+
+    # openpyxl (also pulled in by defs.functions) dominates the start-up time of the fake ipmitool,
+    # so it is only imported when the config does not carry the resolved tables yet (see --write-config)
+
+    def __loadFunctions(self, projectName: str) -> None:
+        from openpyxl import load_workbook
+        from defs.functions import getInputFilePath
+
+        workBook = load_workbook(getInputFilePath(projectName), read_only=True)
+        rows = workBook['Raw CMD'].iter_rows(min_row=2, values_only=True)
+        header = next(rows)
+        functionCol, netfnCol, cmdCol = header.index('Function Name'), header.index('NetFn'), header.index('CMD')
+        for row in rows:
+            if row[netfnCol] is None:
+                continue
+            key = (int(parseNetFn(row[netfnCol]).value, 16), int(parseCmd(row[cmdCol]), 16))
+            self.functions[key] = row[functionCol]
+        workBook.close()
+
+    def __loadSensors(self, projectName: str) -> List[dict]:
+        from defs.functions import getInputFilePath
+        from testPlan import compileSensorInfo
+        from openpyxl import load_workbook
+
+        workBook = load_workbook(getInputFilePath(projectName), read_only=True)
+        try:
+            if 'Sensor Info' not in workBook.sheetnames:
+                return []
+            sensorRows, _ = compileSensorInfo(workBook['Sensor Info'])
+        finally:
+            workBook.close()
+
+        sensors = {}
+        for sensor in sensorRows:
+            sensors.setdefault(sensor.sensorName, {
+                "name": sensor.sensorName,
+                "type": sensor.sensorType,
+                "nominal": sensor.nominalReading,
+                "thresholds": sensor.thresholds
+            })
+        return list(sensors.values())
+
+    def __loadFru(self, projectName: str) -> Dict[str, str]:
+        from defs.functions import getInputFilePath
+        from testPlan import compileFruInfo
+        from openpyxl import load_workbook
+        from simulator.fruImage import buildFruImage, resolveFruValue
+
+        workBook = load_workbook(getInputFilePath(projectName), read_only=True)
+        try:
+            if 'Fru Info' not in workBook.sheetnames:
+                return {}
+            fruRows, _ = compileFruInfo(workBook['Fru Info'])
+        finally:
+            workBook.close()
+
+        devices = {}
+        for fru in fruRows:
+            devices.setdefault(fru.fruId, {})[fru.ipmiTag] = resolveFruValue(fru.expectedData, fru.ipmiTag)
+        return {str(fruId): buildFruImage(fields).hex() for fruId, fields in devices.items()}
+
+    def __loadLabels(self, labelsDir: str) -> None:
+        labelFiles = os.listdir(labelsDir) if os.path.isdir(labelsDir) else []
+        for key, functionName in self.functions.items():
+            functionName = parseRawFunctionName(functionName)
+            fileName = functionName[0].lower() + functionName[1:] + 'Labels.json'
+            if fileName not in labelFiles:
+                continue
+            with open(os.path.join(labelsDir, fileName)) as f:
+                self.labels[key] = {
+                    tuple(int(byte, 0) for byte in label['req']): bytes.fromhex(label['res'])
+                    for label in json.load(f)['data']
+                }
+
+    def __loadState(self) -> None:
+        if self.config.stateFile and os.path.exists(self.config.stateFile):
+            with open(self.config.stateFile) as f:
+                state = json.load(f)
+            self.powerOn, self.powerTarget, self.powerChangeTime = state['powerOn'], state['powerTarget'], state['powerChangeTime']
+
+    def __saveState(self) -> None:
+        if self.config.stateFile:
+            with open(self.config.stateFile, 'w') as f:
+                json.dump({"powerOn": self.powerOn, "powerTarget": self.powerTarget, "powerChangeTime": self.powerChangeTime}, f)
+
+    def isPowerOn(self) -> bool:
+        with self.lock:
+            self.__loadState()
+            if self.powerTarget is not None and time.time() >= self.powerChangeTime:
+                self.powerOn, self.powerTarget = self.powerTarget, None
+                self.__saveState()
+            return self.powerOn
+
+    def setPower(self, powerOn: bool) -> None:
+        with self.lock:
+            self.__loadState()
+            if self.config.powerTransitionDelay:
+                self.powerTarget = powerOn
+                self.powerChangeTime = time.time() + self.config.powerTransitionDelay
+            else:
+                self.powerOn, self.powerTarget = powerOn, None
+            self.__saveState()
+
+    def handleRequest(self, netfn: int, cmd: int, data: bytes) -> Tuple[int, bytes]:
+        '''
+            returns (completionCode, response data)
+        '''
+        override = self.overrides.get((netfn, cmd), DotDict())
+        latency = override.latency if override.latency is not None else self.config.latency
+        errorRate = override.errorRate if override.errorRate is not None else self.config.errorRate
+
+        if latency:
+            time.sleep(latency)
+        if override.invalid or (netfn, cmd) not in self.functions and (netfn, cmd) not in self.labels:
+            return COMPLETION_CODE_INVALID_COMMAND, b''
+        if errorRate and self.random.random() < errorRate:
+            return int(str(self.config.errorCode), 0), b''
+
+        if (netfn, cmd) == (0x00, 0x01):    # Get Chassis Status
+            return COMPLETION_CODE_OK, bytes([0x01 if self.isPowerOn() else 0x00, 0x00, 0x00])
+        if (netfn, cmd) == (0x00, 0x02):    # Chassis Control
+            if not data or data[0] > 0x05:
+                return 0xcc, b''
+            if data[0] in (0x00, 0x05):
+                self.setPower(False)
+            elif data[0] in (0x01, 0x02, 0x03):
+                self.setPower(True)
+            return COMPLETION_CODE_OK, b''
+        if (netfn, cmd) == (0x0a, 0x20):    # Get SDR Repository Info
+            timestamp = int(self.config.sdrTimestamp or 0).to_bytes(4, 'little')
+            return COMPLETION_CODE_OK, bytes([0x51]) + len(self.sensors).to_bytes(2, 'little') + b'\xff\xff' + timestamp + timestamp + bytes([0x02])
+        if (netfn, cmd) == (0x0a, 0x10):    # Get FRU Inventory Area Info
+            image = self.fruImages.get(data[0]) if data else None
+            if image is None:
+                return 0xcb, b''
+            return COMPLETION_CODE_OK, len(image).to_bytes(2, 'little') + bytes([0x00])
+        if (netfn, cmd) == (0x0a, 0x11):    # Read FRU Data
+            image = self.fruImages.get(data[0]) if len(data) == 4 else None
+            if image is None:
+                return 0xcb if data else 0xc7, b''
+            if self.config.fruReadLimit and data[3] > self.config.fruReadLimit:
+                return 0xca, b''
+            offset = int.from_bytes(data[1:3], 'little')
+            chunk = image[offset:offset + data[3]]
+            return COMPLETION_CODE_OK, bytes([len(chunk)]) + chunk
+        if (netfn, cmd) == (0x06, 0x01):    # Get Device ID
+            return COMPLETION_CODE_OK, bytes([0x20, 0x01, 0x01, 0x00, 0x02, 0xbf, 0x00, 0x00, 0x00, 0x00, 0x00])
+
+        labels = self.labels.get((netfn, cmd))
+        if labels is not None:
+            response = labels.get(tuple(data))
+            if response is None:
+                return 0xcb, b''    # Requested sensor, data, or record not found
+            return COMPLETION_CODE_OK, response
+
+        return COMPLETION_CODE_OK, b''
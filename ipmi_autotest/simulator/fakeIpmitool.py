@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import shlex
+
+from typing import List
+
+from defs.dotDict import DotDict
+from rmcp.packets import formatRawResponse, formatRawError
+from .bmc import SimulatedBMC, loadSimulatorConfig
+
+CONFIG_ENV = 'IPMI_SIMULATOR_CONFIG'
+
+OPTIONS_WITH_VALUE = ['-I', '-H', '-U', '-P', '-C', '-p', '-L', '-S', '-t', '-b', '-T', '-B', '-m', '-N', '-R', '-f', '-k', '-y', '-o', '-O', '-e', '-l', '-z']
+
+POWER_CONTROL = {
+    "off": (0x00, "Down/Off"),
+    "on": (0x01, "Up/On"),
+    "cycle": (0x02, "Cycle"),
+    "reset": (0x03, "Reset"),
+    "soft": (0x05, "Soft"),
+}
+
+SENSOR_UNITS = {"voltage": "Volts", "fan": "RPM", "temperature": "degrees C", "current": "Amps", "power": "Watts"}
+SENSOR_THRESHOLDS = ['LNR', 'LC', 'LNC', 'UNC', 'UC', 'UNR']    # column order of `ipmitool sensor list`
+
+def formatSensorValue(value: float, width: int) -> str:
+    return f'{value:<{width}.3f}' if value is not None else f'{"na":<{width}}'
+
+class FakeIpmitool:
+    '''
+        Drop-in `ipmitool` answering from a SimulatedBMC, configured through $IPMI_SIMULATOR_CONFIG.
+        Supports the subset of commands used by the framework: raw, power, chassis power, sensor list, echo and exec.
+    '''
+    def __init__(
+        self,
+        bmc: SimulatedBMC,
+        sdrCache: str=None
+    ) -> None:
+        self.bmc = bmc
+        self.sdrCache = sdrCache    # -S <file>: SDR records are read from an `sdr dump` file instead of the BMC
+
+    def run(self, argv: List[str]) -> int:
+        if not argv:
+            sys.stderr.write("No command provided!\n")
+            return 1
+
+        command, args = argv[0], argv[1:]
+        if command == 'raw':
+            return self.raw(args)
+        elif command == 'power':
+            return self.power(args)
+        elif command == 'chassis' and args[:1] == ['power']:
+            return self.power(args[1:])
+        elif command == 'echo':
+            print(' '.join(args))
+            return 0
+        elif command == 'exec':
+            return self.exec(args)
+        elif command == 'sensor' and args[:1] in (['list'], []):
+            return self.sensorList()
+        elif command == 'sdr' and args[:1] == ['dump']:
+            return self.sdrDump(args[1:])
+
+        sys.stderr.write(f"Invalid command: {command}\n")
+        return 1
+
+    def raw(self, args: List[str]) -> int:
+        if len(args) < 2:
+            sys.stderr.write("Not enough parameters given.\nRAW Commands:  raw <netfn> <cmd> [data]\n")
+            return 1
+
+        try:
+            netfn, cmd = int(args[0], 0), int(args[1], 0)
+            data = bytes(int(arg, 0) for arg in args[2:])
+        except ValueError:
+            sys.stderr.write(f"Given data \"{' '.join(args)}\" is invalid.\n")
+            return 1
+
+        completionCode, response = self.bmc.handleRequest(netfn, cmd, data)
+        if completionCode != 0x00:
+            sys.stderr.write(formatRawError(netfn, cmd, completionCode))
+            return 1
+
+        sys.stdout.write(formatRawResponse(response))
+        return 0
+
+    def power(self, args: List[str]) -> int:
+        action = args[0] if args else 'status'
+        if action == 'status':
+            print(f"Chassis Power is {'on' if self.bmc.isPowerOn() else 'off'}")
+            return 0
+        if action not in POWER_CONTROL:
+            sys.stderr.write(f"Invalid chassis power command: {action}\n")
+            return 1
+
+        data, message = POWER_CONTROL[action]
+        completionCode, _ = self.bmc.handleRequest(0x00, 0x02, bytes([data]))
+        if completionCode != 0x00:
+            sys.stderr.write(f"Unable to set Chassis Power Control to {message}\n")
+            return 1
+
+        print(f"Chassis Power Control: {message}")
+        return 0
+
+    def __readSdr(self) -> list:
+        if self.sdrCache and os.path.exists(self.sdrCache):
+            with open(self.sdrCache, 'rb') as f:
+                return [DotDict(sensor) for sensor in json.loads(f.read().decode())]
+
+        time.sleep(self.bmc.config.sdrReadDelay or 0)
+        return self.bmc.sensors
+
+    def sdrDump(self, args: List[str]) -> int:
+        if not args:
+            sys.stderr.write("Not enough parameters given.\n")
+            return 1
+
+        sensors = self.__readSdr()
+        with open(args[0], 'wb') as f:
+            f.write(json.dumps(sensors).encode())
+        print(f"Dumping Sensor Data Repository to '{args[0]}'")
+        return 0
+
+    def sensorList(self) -> int:
+        for sensor in self.__readSdr():
+            thresholds = sensor.thresholds or {}
+            if sensor.type.lower() in ('discrete', 'watchdog'):
+                fields = [f'{"0x0":<10}', f'{"discrete":<10}', f'{sensor.nominal or "0x0080":<6}', *(formatSensorValue(None, 9) for _ in SENSOR_THRESHOLDS)]
+            else:
+                reading = sensor.nominal
+                if not isinstance(reading, (int, float)):
+                    lower, upper = thresholds.get('LNC'), thresholds.get('UNC')
+                    reading = (lower + upper) / 2 if lower is not None and upper is not None else 0
+                fields = [
+                    formatSensorValue(reading, 10),
+                    f'{SENSOR_UNITS.get(sensor.type.lower(), sensor.type):<10}',
+                    f'{"ok":<6}',
+                    *(formatSensorValue(thresholds.get(abbr), 9) for abbr in SENSOR_THRESHOLDS)
+                ]
+            print(' | '.join([f'{sensor.name:<16}', *fields]))
+        return 0
+
+    def exec(self, args: List[str]) -> int:
+        if not args:
+            sys.stderr.write("Usage: exec <filename>\n")
+            return 1
+
+        rc = 0
+        with open(args[0]) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                rc = self.run(shlex.split(line))
+                sys.stdout.flush()
+        return rc
+
+def stripOptions(argv: List[str]) -> List[str]:
+    i = 0
+    while i < len(argv) and argv[i].startswith('-'):
+        i += 2 if argv[i] in OPTIONS_WITH_VALUE else 1
+    return argv[i:]
+
+def main(argv: List[str]) -> int:
+    if not os.environ.get(CONFIG_ENV):
+        sys.stderr.write(f"Could not open device: set ${CONFIG_ENV} to a simulator config file\n")
+        return 1
+
+    config = loadSimulatorConfig(os.environ[CONFIG_ENV])
+    sdrCache = None
+    for option, value in zip(argv, argv[1:]):
+        if option == '-S':
+            sdrCache = value
+    return FakeIpmitool(SimulatedBMC(config), sdrCache=sdrCache).run(stripOptions(argv))
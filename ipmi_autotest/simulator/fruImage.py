@@ -0,0 +1,58 @@
+from typing import Dict, List
+
+from fru import CHASSIS_TYPES, CHASSIS_FIELDS, BOARD_FIELDS, PRODUCT_FIELDS, FRU_TAG_ALIASES
+
+def encodeField(value: str) -> bytes:
+    raw = (value or '').encode('latin-1')[:0x3f]
+    return bytes([0xc0 | len(raw)]) + raw   # 8-bit ASCII + Latin 1
+
+def buildArea(header: bytes, fields: List[str]) -> bytes:
+    '''
+        header, type/length fields, end-of-fields marker, padded to 8 bytes with the area checksum last
+    '''
+    area = bytearray([0x01, 0x00]) + header + b''.join(encodeField(field) for field in fields) + b'\xc1'
+    area += bytes(-(len(area) + 1) % 8)
+    area[1] = (len(area) + 1) // 8
+    return bytes(area) + bytes([-sum(area) & 0xff])
+
+def getExtraFields(value: str) -> List[str]:
+    return value.split(' ') if value else []
+
+def buildFruImage(fields: Dict[str, str]) -> bytes:
+    '''
+        encodes {ipmitool tag: value} (e.g. the 'Fru Info' sheet) into a FRU image with chassis, board and product areas
+    '''
+    fields = {FRU_TAG_ALIASES.get(tag, tag): value for tag, value in fields.items()}
+
+    chassisType = fields.get('Chassis Type')
+    chassis = buildArea(
+        bytes([CHASSIS_TYPES.index(chassisType) if chassisType in CHASSIS_TYPES else 0x02]),
+        [fields.get(tag) for tag in CHASSIS_FIELDS] + getExtraFields(fields.get('Chassis Extra'))
+    )
+    board = buildArea(
+        bytes([0x00]) + (0).to_bytes(3, 'little'),     # English, manufacturing date unspecified
+        [fields.get(tag) for tag in BOARD_FIELDS] + getExtraFields(fields.get('Board Extra'))
+    )
+    product = buildArea(
+        bytes([0x00]),
+        [fields.get(tag) for tag in PRODUCT_FIELDS] + getExtraFields(fields.get('Product Extra'))
+    )
+
+    offset = 1
+    header = bytearray([0x01, 0x00])
+    for area in (chassis, board, product):
+        header.append(offset)
+        offset += len(area) // 8
+    header += bytes([0x00, 0x00])
+    header.append(-sum(header) & 0xff)
+    return bytes(header) + chassis + board + product
+
+def resolveFruValue(expectedData: str, ipmiTag: str) -> str:
+    '''
+        value served for a 'Fru Info' row: the expected data, a placeholder for '[ignored]', nothing for '[null]'
+    '''
+    if expectedData == '[null]':
+        return None
+    if expectedData == '[ignored]':
+        return f"SIM-{ipmiTag.split(' ')[-1].upper()}"
+    return expectedData
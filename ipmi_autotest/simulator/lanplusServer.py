@@ -0,0 +1,199 @@
+import os
+import socket
+import struct
+import random
+import threading
+
+from typing import Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from defs.dotDict import DotDict
+from rmcp.packets import (
+    PayloadType, SessionKeys, CIPHER_SUITES, AUTH_ALGORITHMS, ASF_RMCP_HEADER, ASF_PRESENCE_PING, AUTH_TYPE_NONE,
+    passwordKey, hmacDigest, packSessionPacket, unpackSessionPacket, packIpmiResponse, unpackIpmiRequest,
+    unpackAsfMessage, packPresencePong, packSessionlessPacket, unpackSessionlessPacket
+)
+from .bmc import SimulatedBMC
+
+MANAGED_SYSTEM_GUID = bytes.fromhex('a1b2c3d4e5f60718293a4b5c6d7e8f90')
+
+class LanplusServer:
+    '''
+        UDP RMCP+ responder in front of a SimulatedBMC, so the lanplus backend (or a real ipmitool) can run hermetically.
+        IPMI requests are answered from a thread pool so per-command latency does not serialize concurrent sessions.
+    '''
+    def __init__(
+        self,
+        bmc: SimulatedBMC,
+        host: str='127.0.0.1',
+        port: int=6230,
+        userName: str='admin',
+        password: str='admin',
+        workers: int=16
+    ) -> None:
+        self.bmc = bmc
+        self.userName = userName
+        self.password = password
+        self.sessions: Dict[int, DotDict] = {}
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.address = self.socket.getsockname()
+        self.__running = False
+        self.__thread = None
+
+    def start(self) -> 'LanplusServer':
+        self.__running = True
+        self.__thread = threading.Thread(target=self.serveForever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.__running = False
+        self.socket.close()
+        self.pool.shutdown(wait=False)
+
+    def serveForever(self) -> None:
+        self.__running = True
+        while self.__running:
+            try:
+                packet, address = self.socket.recvfrom(4096)
+            except OSError:     # socket closed by stop()
+                break
+            try:
+                self.handlePacket(packet, address)
+            except Exception:   # malformed packets are dropped, like a real BMC would
+                continue
+
+    def __send(self, packet: bytes, address: Tuple[str, int]) -> None:
+        try:
+            self.socket.sendto(packet, address)
+        except OSError:
+            pass
+
+    def handlePacket(self, packet: bytes, address: Tuple[str, int]) -> None:
+        if packet[:4] == ASF_RMCP_HEADER:
+            messageType, tag = unpackAsfMessage(packet)
+            if messageType == ASF_PRESENCE_PING:
+                self.__send(packPresencePong(tag), address)
+            return
+        if packet[4] == AUTH_TYPE_NONE:
+            self.__handleSessionless(unpackSessionlessPacket(packet), address)
+            return
+
+        sessionId, = struct.unpack('<I', packet[6:10])
+        with self.lock:
+            session = self.sessions.get(sessionId)
+        payloadType, sessionId, sequence, payload = unpackSessionPacket(packet, session.sessionKeys if session else None)
+
+        if payloadType == PayloadType.OPEN_SESSION_REQUEST:
+            self.__send(packSessionPacket(PayloadType.OPEN_SESSION_RESPONSE, self.__openSession(payload)), address)
+        elif payloadType == PayloadType.RAKP1:
+            self.__send(packSessionPacket(PayloadType.RAKP2, self.__rakp2(payload)), address)
+        elif payloadType == PayloadType.RAKP3:
+            self.__send(packSessionPacket(PayloadType.RAKP4, self.__rakp4(payload)), address)
+        elif payloadType == PayloadType.IPMI and session is not None and session.sessionKeys is not None:
+            self.pool.submit(self.__handleIpmi, session, sessionId, sequence, payload, address)
+
+    def __openSession(self, payload: bytes) -> bytes:
+        tag, privilege = payload[0], payload[1]
+        consoleSessionId, = struct.unpack('<I', payload[4:8])
+        algorithms = (payload[12], payload[20], payload[28])
+        cipherSuites = [cipherSuite for cipherSuite, suite in CIPHER_SUITES.items() if suite == algorithms]
+        if not cipherSuites:
+            return bytes([tag, 0x11, 0x00, 0x00]) + struct.pack('<I', consoleSessionId)
+
+        with self.lock:
+            managedSessionId = random.randint(1, 0xffffffff)
+            self.sessions[managedSessionId] = DotDict({
+                "consoleSessionId": consoleSessionId,
+                "cipherSuite": cipherSuites[0],
+                "sessionKeys": None
+            })
+
+        return bytes([tag, 0x00, privilege or 0x04, 0x00]) + struct.pack('<II', consoleSessionId, managedSessionId) + payload[8:32]
+
+    def __rakp2(self, payload: bytes) -> bytes:
+        tag = payload[0]
+        managedSessionId, = struct.unpack('<I', payload[4:8])
+        session = self.sessions.get(managedSessionId)
+        if session is None:
+            return bytes([tag, 0x02, 0x00, 0x00]) + b'\x00' * 4
+
+        consoleRandom, role, userNameLength = payload[8:24], payload[24], payload[27]
+        userName = payload[28:28+userNameLength]
+        if userName.decode(errors='replace') != self.userName:
+            return bytes([tag, 0x0d, 0x00, 0x00]) + struct.pack('<I', session.consoleSessionId)
+
+        managedRandom = os.urandom(16)
+        session.update({"consoleRandom": consoleRandom, "managedRandom": managedRandom, "role": role, "userName": userName})
+
+        response = bytes([tag, 0x00, 0x00, 0x00]) + struct.pack('<I', session.consoleSessionId) + managedRandom + MANAGED_SYSTEM_GUID
+        authAlgorithm = CIPHER_SUITES[session.cipherSuite][0]
+        if authAlgorithm:
+            authHash, _ = AUTH_ALGORITHMS[authAlgorithm]
+            response += hmacDigest(
+                authHash,
+                passwordKey(self.password),
+                struct.pack('<II', session.consoleSessionId, managedSessionId) + consoleRandom + managedRandom + MANAGED_SYSTEM_GUID + bytes([role, len(userName)]) + userName
+            )
+        return response
+
+    def __rakp4(self, payload: bytes) -> bytes:
+        tag = payload[0]
+        managedSessionId, = struct.unpack('<I', payload[4:8])
+        session = self.sessions.get(managedSessionId)
+        if session is None or session.consoleRandom is None:
+            return bytes([tag, 0x02, 0x00, 0x00]) + b'\x00' * 4
+
+        authAlgorithm = CIPHER_SUITES[session.cipherSuite][0]
+        keys = SessionKeys(session.cipherSuite, self.password, session.consoleRandom, session.managedRandom, session.role, session.userName.decode())
+        response = bytes([tag, 0x00, 0x00, 0x00]) + struct.pack('<I', session.consoleSessionId)
+
+        if authAlgorithm:
+            authHash, icvLength = AUTH_ALGORITHMS[authAlgorithm]
+            expected = hmacDigest(
+                authHash,
+                passwordKey(self.password),
+                session.managedRandom + struct.pack('<I', session.consoleSessionId) + bytes([session.role, len(session.userName)]) + session.userName
+            )
+            if expected != payload[8:]:
+                return bytes([tag, 0x0f, 0x00, 0x00]) + struct.pack('<I', session.consoleSessionId)
+            response += hmacDigest(authHash, keys.sik, session.consoleRandom + struct.pack('<I', managedSessionId) + MANAGED_SYSTEM_GUID)[:icvLength]
+
+        session.sessionKeys = keys
+        return response
+
+    def __handleSessionless(self, message: bytes, address: Tuple[str, int]) -> None:
+        '''
+            only Get Channel Authentication Capabilities is allowed outside of a session
+        '''
+        netfn, cmd, rqSeq, data = unpackIpmiRequest(message)
+        if (netfn, cmd) != (0x06, 0x38):
+            return
+        # channel 1, IPMI v2 extended capabilities, non-null user names, IPMI v2.0 supported
+        response = bytes([0x01, 0x80, 0x04, 0x02, 0x00, 0x00, 0x00, 0x00])
+        self.__send(packSessionlessPacket(packIpmiResponse(netfn, cmd, rqSeq, 0x00, response)), address)
+
+    def __handleIpmi(self, session: DotDict, managedSessionId: int, sequence: int, payload: bytes, address: Tuple[str, int]) -> None:
+        netfn, cmd, rqSeq, data = unpackIpmiRequest(payload)
+
+        if (netfn, cmd) == (0x06, 0x3b):        # Set Session Privilege Level
+            completionCode, response = 0x00, data[:1] or bytes([0x04])
+        elif (netfn, cmd) == (0x06, 0x3c):      # Close Session
+            if len(data) != 4:
+                completionCode, response = 0xc7, b''     # Request data length invalid
+            else:
+                closedSessionId, = struct.unpack('<I', data)
+                with self.lock:
+                    closed = self.sessions.pop(closedSessionId, None)
+                completionCode, response = (0x00 if closed is not None else 0x87), b''     # 0x87: invalid session ID
+        else:
+            completionCode, response = self.bmc.handleRequest(netfn, cmd, data)
+
+        self.__send(
+            packSessionPacket(PayloadType.IPMI, packIpmiResponse(netfn, cmd, rqSeq, completionCode, response), session.consoleSessionId, sequence, session.sessionKeys),
+            address
+        )
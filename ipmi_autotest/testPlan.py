@@ -0,0 +1,218 @@
+import os
+import pickle
+import hashlib
+
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.worksheet.worksheet import Worksheet
+
+from defs.globalVars import CACHE_DIR, SENSOR_THRESHOLD
+from defs.enums import VerificationType
+from defs.parsers import parseNetFn, parseCmd, parseVerificationType, parseRawFunctionName
+
+TEST_PLAN_VERSION = 4   # bump when the layout below changes, so stale caches are ignored
+
+RAW_CMD_HEADER_ROW = 2
+SENSOR_INFO_HEADER_ROW = 2
+FRU_INFO_HEADER_ROW = 1
+FRU_OUTPUT_COLUMNS = ('Response', 'Result (P: pass/F: fail)', 'Pass Level (A: all match, L: length match, I: ignored)')
+
+class RawCommand(NamedTuple):
+    rowNum: int
+    functionName: str           # as written in the workbook, e.g. 'Get Device ID'
+    testName: str               # parseRawFunctionName(functionName), e.g. 'GetDeviceId'
+    netfn: str                  # resolved, e.g. '0x06'
+    cmd: str                    # resolved, e.g. '0x01'
+    numData: int
+    testType: str               # AutoTestType value
+    needVerify: bool
+    verificationType: VerificationType
+
+class SensorRow(NamedTuple):
+    rowNum: int
+    sensorName: str
+    sensorType: str
+    nominalReading: str
+    thresholds: Dict[str, float]    # expected {'LNR': ..., 'UNR': ...}, None when 'n/a'
+
+class FruRow(NamedTuple):
+    rowNum: int
+    fruId: int                  # 'FRU ID' column, 0 (builtin FRU) when the sheet has none
+    ipmiTag: str                # `ipmitool fru` tag, e.g. 'Board Part Number'
+    expectedData: str           # '[ignored]', '[null]' or the expected value
+
+class SheetLayout(NamedTuple):
+    columnWidths: List[Tuple[int, int, float]]     # (first column, last column, width)
+    rowHeights: Dict[int, float]
+    mergedCells: List[str]
+    freezePanes: str
+
+class TestPlan(NamedTuple):
+    '''
+        Compiled form of a project workbook: the 'Raw CMD' rows with NetFn/CMD resolved and the sheet's column numbers,
+        so the workbook is only parsed once per content hash (see loadTestPlan).
+        Sheet layouts are kept for the streamed result workbook (see resultWriter), read-only worksheets do not expose them.
+    '''
+    workbookHash: str
+    rawCommandColumns: Dict[str, int]     # header -> 1-based column number of the 'Raw CMD' sheet
+    rawCommands: List[RawCommand]
+    layouts: Dict[str, SheetLayout]
+    sensors: List[SensorRow]              # 'Sensor Info' rows
+    sensorColumns: Dict[str, int]         # output columns of the 'Sensor Info' sheet: threshold abbreviations, 'Error Response', 'Result (P: pass/F: fail)'
+    frus: List[FruRow]                    # 'Fru Info' rows
+    fruColumns: Dict[str, int]            # output columns of the 'Fru Info' sheet: FRU_OUTPUT_COLUMNS
+    labelFiles: Dict[str, str] = {}       # testName -> path of its labels json, indexed when the plan is loaded
+
+def getWorkbookHash(inputFilePath: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(inputFilePath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def getLabelFiles(labelsDir: str) -> Dict[str, str]:
+    '''
+        indexes <labelsDir>/<testName in camelCase>Labels.json by testName
+    '''
+    labelFiles = {}
+    if not os.path.isdir(labelsDir):
+        return labelFiles
+
+    for fileName in os.listdir(labelsDir):
+        if fileName.endswith('Labels.json'):
+            testName = fileName[:-len('Labels.json')]
+            labelFiles[testName[0].upper() + testName[1:]] = os.path.join(labelsDir, fileName)
+    return labelFiles
+
+def getSheetLayout(workSheet: Worksheet) -> SheetLayout:
+    return SheetLayout(
+        columnWidths=[
+            (dimension.min, dimension.max or dimension.min, dimension.width)
+            for dimension in workSheet.column_dimensions.values() if dimension.width and dimension.min
+        ],
+        rowHeights={rowNum: dimension.height for rowNum, dimension in workSheet.row_dimensions.items() if dimension.height},
+        mergedCells=[str(cellRange) for cellRange in workSheet.merged_cells.ranges],
+        freezePanes=workSheet.freeze_panes
+    )
+
+def compileTestPlan(inputFilePath: str, workbookHash: str=None) -> TestPlan:
+    workBook = load_workbook(inputFilePath, data_only=True)    # not read-only, merged cells and dimensions are needed for the layouts
+    try:
+        rows = workBook['Raw CMD'].iter_rows(min_row=RAW_CMD_HEADER_ROW, values_only=True)
+        header = next(rows)
+        columns = {label: colIdx + 1 for colIdx, label in enumerate(header) if label is not None}
+
+        col = lambda label: columns[label] - 1
+        rawCommands = []
+        for rowNum, row in enumerate(rows, start=RAW_CMD_HEADER_ROW + 1):
+            row = row + (None,) * (len(header) - len(row))
+            if row[col('NetFn')] is None:   # section title rows
+                continue
+
+            functionName = row[col('Function Name')]
+            numData = row[col('Request Length')]
+            verificationType = row[col('Verification Type (A: accuracy/B: behavior)')]
+            rawCommands.append(RawCommand(
+                rowNum=rowNum,
+                functionName=functionName,
+                testName=parseRawFunctionName(functionName),
+                netfn=parseNetFn(row[col('NetFn')]).value,
+                cmd=parseCmd(row[col('CMD')]),
+                numData=int(numData) if numData is not None else 0,
+                testType=row[col('Test Type (A: availability test/F: functional test)')],
+                needVerify=row[col('Need Verify (Y: yes/N: no)')] == 'Y',
+                verificationType=parseVerificationType(verificationType) if verificationType is not None else None
+            ))
+        layouts = {workSheet.title: getSheetLayout(workSheet) for workSheet in workBook.worksheets}
+        sensors, sensorColumns = compileSensorInfo(workBook['Sensor Info']) if 'Sensor Info' in workBook.sheetnames else ([], {})
+        frus, fruColumns = compileFruInfo(workBook['Fru Info']) if 'Fru Info' in workBook.sheetnames else ([], {})
+    finally:
+        workBook.close()
+
+    return TestPlan(workbookHash or getWorkbookHash(inputFilePath), columns, rawCommands, layouts, sensors, sensorColumns, frus, fruColumns)
+
+def parseThreshold(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):     # 'n/a', empty
+        return None
+
+def compileSensorInfo(workSheet: Worksheet) -> Tuple[List[SensorRow], Dict[str, int]]:
+    '''
+        the sheet has each threshold column twice: expected values, then the 'Output' written by the sensor test
+    '''
+    rows = workSheet.iter_rows(min_row=SENSOR_INFO_HEADER_ROW, values_only=True)
+    header = next(rows)
+    columns = {}
+    for colIdx, label in enumerate(header):
+        if label is not None:
+            columns.setdefault(label, []).append(colIdx)
+
+    sensors = []
+    for rowNum, row in enumerate(rows, start=SENSOR_INFO_HEADER_ROW + 1):
+        row = row + (None,) * (len(header) - len(row))
+        if row[columns['Sensor Name'][0]] is None:
+            continue
+        sensors.append(SensorRow(
+            rowNum=rowNum,
+            sensorName=str(row[columns['Sensor Name'][0]]).strip(),
+            sensorType=str(row[columns['Sensor Type'][0]]).strip(),
+            nominalReading=row[columns['Nominal Reading'][0]],
+            thresholds={abbr: parseThreshold(row[columns[abbr][0]]) for abbr in SENSOR_THRESHOLD.values()}
+        ))
+
+    sensorColumns = {abbr: columns[abbr][-1] + 1 for abbr in SENSOR_THRESHOLD.values()}
+    sensorColumns.update({label: columns[label][0] + 1 for label in ('Error Response', 'Result (P: pass/F: fail)')})
+    return sensors, sensorColumns
+
+def compileFruInfo(workSheet: Worksheet) -> Tuple[List[FruRow], Dict[str, int]]:
+    rows = workSheet.iter_rows(min_row=FRU_INFO_HEADER_ROW, values_only=True)
+    header = next(rows)
+    columns = {label: colIdx for colIdx, label in enumerate(header) if label is not None}
+
+    frus = []
+    for rowNum, row in enumerate(rows, start=FRU_INFO_HEADER_ROW + 1):
+        row = row + (None,) * (len(header) - len(row))
+        if row[columns['IPMI Tag']] is None:
+            continue
+        fruId = row[columns['FRU ID']] if 'FRU ID' in columns else None
+        expectedData = row[columns['Expected Data']]
+        frus.append(FruRow(
+            rowNum=rowNum,
+            fruId=int(str(fruId), 0) if fruId is not None else 0,
+            ipmiTag=str(row[columns['IPMI Tag']]).strip(),
+            expectedData=str(expectedData).strip() if expectedData is not None else '[null]'
+        ))
+
+    return frus, {label: columns[label] + 1 for label in FRU_OUTPUT_COLUMNS}
+
+def loadTestPlan(
+    inputFilePath: str,
+    labelsDir: str,
+    cacheDir: str=CACHE_DIR
+) -> TestPlan:
+    '''
+        returns the compiled test plan of the workbook, from <cacheDir>/testPlan_<sha256>.pickle when the workbook content is unchanged
+    '''
+    workbookHash = getWorkbookHash(inputFilePath)
+    cachePath = os.path.join(cacheDir, f'testPlan_v{TEST_PLAN_VERSION}_{workbookHash}.pickle')
+
+    testPlan = None
+    if os.path.exists(cachePath):
+        try:
+            with open(cachePath, 'rb') as f:
+                testPlan = pickle.load(f)
+        except Exception:   # truncated or incompatible cache, compile again
+            testPlan = None
+
+    if testPlan is None:
+        testPlan = compileTestPlan(inputFilePath, workbookHash)
+        os.makedirs(cacheDir, exist_ok=True)
+        tmpPath = f'{cachePath}.{os.getpid()}.tmp'
+        with open(tmpPath, 'wb') as f:
+            pickle.dump(testPlan, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpPath, cachePath)  # atomic, fleet workers may race on the same cache
+
+    # label files can change without the workbook changing, so they are indexed on every load
+    return testPlan._replace(labelFiles=getLabelFiles(labelsDir))
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+
+import pytest
+
+# the package runs from ipmi_autotest/ and imports its modules bare (see __main__.py)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+FAKE_IPMITOOL = '''\
+#!{python}
+# answers `ipmitool [options] <command>` and `ipmitool [options] exec <script>` from FAKE_IPMITOOL_RESPONSES:
+# {{"raw 0x06 0x01": {{"stdout": " 20 01\\n", "stderr": "", "exit": false}}}}, other commands answer " 00"
+import os, sys, json
+
+responses = json.load(open(os.environ['FAKE_IPMITOOL_RESPONSES']))
+with open(os.environ['FAKE_IPMITOOL_LOG'], 'a') as log:
+    log.write(' '.join(sys.argv[1:]) + '\\n')
+
+def run(line):
+    words = line.split()
+    if not words:
+        return
+    if words[0] == 'echo':
+        sys.stdout.write(' '.join(words[1:]) + '\\n')
+        sys.stdout.flush()
+        return
+    response = responses.get(' '.join(words), {{"stdout": " 00\\n"}})
+    sys.stdout.write(response.get('stdout', ''))
+    sys.stdout.flush()
+    sys.stderr.write(response.get('stderr', ''))
+    sys.stderr.flush()
+    if response.get('exit'):
+        sys.exit(1)
+
+args = sys.argv[1:]
+if 'exec' in args:
+    script = open(args[args.index('exec') + 1])
+    for line in iter(script.readline, ''):
+        run(line)
+else:
+    run(' '.join(args))
+'''
+
+class FakeIpmitool:
+    '''
+        an `ipmitool` first on PATH answering from `responses`, `calls` lists the argv of every process started
+    '''
+    def __init__(self, path, monkeypatch) -> None:
+        self.responsesPath = path / 'responses.json'
+        self.logPath = path / 'calls.log'
+        self.logPath.write_text('')
+        self.respond({})
+
+        executable = path / 'ipmitool'
+        executable.write_text(FAKE_IPMITOOL.format(python=sys.executable))
+        executable.chmod(0o755)
+        monkeypatch.setenv('PATH', f"{path}{os.pathsep}{os.environ['PATH']}")
+        monkeypatch.setenv('FAKE_IPMITOOL_RESPONSES', str(self.responsesPath))
+        monkeypatch.setenv('FAKE_IPMITOOL_LOG', str(self.logPath))
+
+    def respond(self, responses: dict) -> None:
+        self.responsesPath.write_text(json.dumps(responses))
+
+    @property
+    def calls(self) -> list:
+        return self.logPath.read_text().splitlines()
+
+@pytest.fixture
+def fakeIpmitool(tmp_path, monkeypatch) -> FakeIpmitool:
+    directory = tmp_path / 'fakeIpmitool'
+    directory.mkdir()
+    return FakeIpmitool(directory, monkeypatch)
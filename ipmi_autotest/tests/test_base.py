@@ -0,0 +1,73 @@
+import time
+import logging
+
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import base
+from defs.enums import Result, VerificationType
+
+class PlainTestCase(base.TestCase):
+    pass
+
+def getTestRoutine(sent: list) -> SimpleNamespace:
+    def rawCommandBatch(requests):
+        sent.extend(requests)
+        return [(' 00', '') for _ in requests]
+
+    return SimpleNamespace(
+        logger=logging.getLogger('test'),
+        _IPMIAutoTest__generalCommand=lambda *args: ('', ''),
+        _IPMIAutoTest__rawCommand=lambda *args: ('', ''),
+        _IPMIAutoTest__rawCommandBatch=rawCommandBatch,
+        _IPMIAutoTest__deadline=lambda at: nullcontext()
+    )
+
+def testRowWithoutVerificationPasses():
+    sent = []
+    testCase = PlainTestCase(getTestRoutine(sent), '0x06', '0x01', 0, needVerify=False, verificationType=VerificationType.ACCURACY)
+
+    assert testCase.verificationType == VerificationType.ACCURACY
+    assert testCase.test() == (Result.PASS, None)
+    assert sent == []
+
+def testRowWithoutVerificationTypePasses():
+    testCase = PlainTestCase(getTestRoutine([]), '0x06', '0x01', 0)
+
+    assert testCase.verificationType is None
+    assert testCase.test() == (Result.PASS, None)
+
+def testWaitForPollsUnderTheDeadline():
+    deadlines = []
+    testRoutine = getTestRoutine([])
+    testRoutine._IPMIAutoTest__deadline = lambda at: deadlines.append(at) or nullcontext()
+    testCase = PlainTestCase(testRoutine, '0x06', '0x01', 0)
+    polls = iter([False, False, True])
+
+    start = time.monotonic()
+    met, elapsed = testCase.waitFor(lambda: next(polls), timeout=5, interval=0.01)
+    assert met
+    assert elapsed < 5
+    assert len(deadlines) == 3 and len(set(deadlines)) == 1
+    assert start + 5 <= deadlines[0] <= time.monotonic() + 5
+
+def testWaitForGivesUpAtTheDeadline():
+    testCase = PlainTestCase(getTestRoutine([]), '0x06', '0x01', 0)
+
+    def predicate():
+        raise Exception('BMC busy')
+
+    met, elapsed = testCase.waitFor(predicate, timeout=0.1, interval=0.02)
+    assert not met
+    assert 0.1 <= elapsed < 0.5
+
+def testWaitForLogsPredicateErrorsLazily(caplog):
+    testCase = PlainTestCase(getTestRoutine([]), '0x06', '0x01', 0)
+
+    def predicate():
+        raise Exception('BMC busy')
+
+    with caplog.at_level(logging.DEBUG, logger='test'):
+        testCase.waitFor(predicate, timeout=0.01)
+    record = caplog.records[0]
+    assert record.args and record.getMessage() == "\twaitFor: predicate raised BMC busy"
@@ -0,0 +1,31 @@
+import importlib
+
+from defs.dotDict import DotDict
+
+benchmarks = importlib.import_module('benchmarks.__main__')
+
+def getResult(seconds: float, relative: float, peakMiB: float=None) -> DotDict:
+    return DotDict({"seconds": seconds, "relative": relative, "calls": 1, "peakMiB": peakMiB})
+
+def testBaselineIsScaledToTheMachine():
+    baseline = {"runTest": {"seconds": 0.2, "relative": 2.0, "calls": 1, "peakMiB": 4.0}}
+
+    # twice as slow a machine: twice the seconds for the same relative time
+    assert benchmarks.getRegressions({"runTest": getResult(0.4, 2.1, 4.0)}, baseline, 0.5, 0.2) == []
+    assert benchmarks.getRegressions({"runTest": getResult(0.4, 4.0, 4.0)}, baseline, 0.5, 0.1) == ["runTest: 0.4000 s, baseline 0.2000 s (scaled to this machine)"]
+
+def testMemoryRegressionNeedsTolerance():
+    baseline = {"runTest": {"seconds": 0.2, "relative": 2.0, "calls": 1, "peakMiB": 4.0}}
+
+    assert benchmarks.getRegressions({"runTest": getResult(0.2, 2.0, 5.5)}, baseline, 0.5, 0.1) == []
+    assert benchmarks.getRegressions({"runTest": getResult(0.2, 2.0, 6.5)}, baseline, 0.5, 0.1) == ["runTest: peak 6.5 MiB, baseline 4.0 MiB"]
+
+def testBaselineWithoutCalibrationComparesSeconds():
+    baseline = {"runTest": {"seconds": 0.2, "calls": 1, "peakMiB": None}}
+
+    assert benchmarks.getRegressions({"runTest": getResult(0.4, 2.0)}, baseline, 0.5, 0.1) == ["runTest: 0.4000 s, baseline 0.2000 s (scaled to this machine)"]
+
+def testNoiseFloor():
+    baseline = {"label loading": {"seconds": 0.0001, "relative": 0.001, "calls": 1, "peakMiB": None}}
+
+    assert benchmarks.getRegressions({"label loading": getResult(0.0003, 0.003)}, baseline, 0.5, 0.1) == []
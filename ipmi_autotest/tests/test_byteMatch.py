@@ -0,0 +1,94 @@
+import json
+
+import numpy as np
+
+from byteMatch import matchResponses, parseHexBytes, toByteMatrix
+from labelStore import LabelStore, Labels
+
+def match(labels, responses, masks=None):
+    labels = Labels(labels, masks)
+    return labels.match(responses)
+
+def testParseHexBytes():
+    assert parseHexBytes('00 20 ff') == b'\x00\x20\xff'
+    assert parseHexBytes('Unable to send RAW command') is None
+    assert parseHexBytes(None) is None
+
+def testToByteMatrix():
+    matrix, lengths = toByteMatrix([b'\x01\x02', None, b'\x03'], fill=0xff)
+
+    assert matrix.tolist() == [[1, 2], [0xff, 0xff], [3, 0xff]]
+    assert lengths.tolist() == [2, -1, 1]
+
+def testExactMatch():
+    byteMatch = match({('0x01',): '00 20', ('0x02',): '01'}, {('0x01',): '00 20', ('0x02',): '01'})
+
+    assert byteMatch.rowMatch.tolist() == [True, True]
+    assert byteMatch.accuracy == 100
+    assert byteMatch.mismatchedBytes() == []
+
+def testMaskedBitsAreIgnored():
+    labels = {('0x01',): '00 20 c5', ('0x02',): '00 20 c5'}
+    masks = {('0x01',): '00 ff 3f'}     # byte 0 ignored, the two high bits of byte 2 ignored
+
+    byteMatch = match(labels, {('0x01',): '7f 20 05', ('0x02',): '7f 20 05'}, masks)
+    assert byteMatch.rowMatch.tolist() == [True, False]
+    assert byteMatch.mismatchedBytes() == [0, 2]
+
+def testBytesPastTheMaskAreCompared():
+    byteMatch = match({('0x01',): '00 20 c5'}, {('0x01',): '11 20 c4'}, {('0x01',): '00'})
+
+    assert not byteMatch.rowMatch[0]
+    assert byteMatch.mismatchedBytes() == [2]
+
+def testLengthMismatchesAndErrorsNeverMatch():
+    labels = {('0x01',): '00 20', ('0x02',): '00 20', ('0x03',): '00 20'}
+    responses = {('0x01',): '00', ('0x02',): '00 20 00', ('0x03',): 'Unable to send RAW command'}
+
+    byteMatch = match(labels, responses, {('0x02',): '00 00'})
+    assert byteMatch.rowMatch.tolist() == [False, False, False]
+    assert byteMatch.mismatchedBytes() == [1, 2]    # the error is compared as text, not byte by byte
+
+def testLabelExpectingAnErrorMatchesTheErrorText():
+    error = 'Unable to send RAW command (channel=0x0 netfn=0x4 lun=0x0 cmd=0x2d rsp=0xcb): Requested sensor, data, or record not found'
+    labels = {('0x01',): '00 20', ('0x02',): error}
+
+    byteMatch = match(labels, {('0x01',): '00 20', ('0x02',): error + '\n'})
+    assert byteMatch.rowMatch.tolist() == [True, True]
+    assert byteMatch.accuracy == 100
+
+    byteMatch = match(labels, {('0x01',): '00 20', ('0x02',): '00 20'})
+    assert byteMatch.rowMatch.tolist() == [True, False]
+    assert byteMatch.accuracy == 66
+
+    byteMatch = match(labels, {('0x01',): '00 20'})     # untested
+    assert byteMatch.rowMatch.tolist() == [True, False]
+
+def testAccuracyIsBelow100WhenAnyResponseMismatches():
+    labels = {(f'0x{i:02x}',): ' '.join(['00'] * 100) for i in range(10)}
+    responses = dict(labels)
+    responses[('0x00',)] = ' '.join(['00'] * 99 + ['01'])
+
+    assert match(labels, responses).accuracy == 99
+
+def testMatchResponsesWiderThanLabels():
+    expected, lengths = toByteMatrix([b'\x01'])
+    mask = np.full(expected.shape, 0xff, dtype=np.uint8)
+
+    byteMatch = matchResponses(expected, mask, lengths, [b'\x01\x02\x03'])
+    assert byteMatch.compared.shape == (1, 3)
+    assert byteMatch.mismatchedBytes() == [1, 2]
+
+def testLabelStoreAppliesFileAndLabelMasks(tmp_path):
+    path = tmp_path / 'getSensorReadingLabels.json'
+    path.write_text(json.dumps({
+        "mask": "00 ff",
+        "data": [
+            {"req": ["0x01"], "res": "10 C0"},
+            {"req": ["0x02"], "res": "10 c0", "mask": "ff 00"},
+        ]
+    }))
+
+    labels = LabelStore({'GetSensorReading': str(path)}).get('GetSensorReading')
+    byteMatch = labels.match({('0x01',): '55 c0', ('0x02',): '10 55'})
+    assert byteMatch.rowMatch.tolist() == [True, True]
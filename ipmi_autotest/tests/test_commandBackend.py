@@ -0,0 +1,76 @@
+import pytest
+
+from backends import commandBackend
+from backends.commandBackend import BATCH_MARKER, SubprocessBackend
+from backends.shellBackend import ShellBackend
+from defs.dotDict import DotDict
+
+ERROR = "Unable to send RAW command (channel=0x0 netfn=0x6 lun=0x0 cmd=0x2 rsp=0xc1): Invalid command\n"
+LONG_RESPONSE = " 00 01 02 03 04 05 06 07 08 09 0a 0b 0c 0d 0e 0f\n 10 11 12\n"
+REQUESTS = [('0x06', '0x01'), ('0x06', '0x02'), ('0x06', '0x03')]
+
+class FixedUuid:
+    hex = '0123456789abcdef'
+
+def getBackend(backendClass, timeout: float=None):
+    backend = backendClass(DotDict({}))
+    backend.setTimeouts(timeout)
+    return backend
+
+@pytest.fixture(params=[None, 30], ids=['noTimeout', 'timeout'])
+def timeout(request):
+    return request.param     # with a timeout the batch output is read by __readBatchOutput
+
+def testBatchKeepsMultiLineResponses(fakeIpmitool, timeout):
+    fakeIpmitool.respond({"raw 0x06 0x01": {"stdout": LONG_RESPONSE}})
+
+    responses = getBackend(SubprocessBackend, timeout).rawCommandBatch(REQUESTS)
+    assert responses == [(LONG_RESPONSE, ""), (" 00\n", ""), (" 00\n", "")]
+    assert len(fakeIpmitool.calls) == 1     # one `ipmitool exec` for the whole batch
+
+def testBatchErrorInTheMiddle(fakeIpmitool, timeout):
+    fakeIpmitool.respond({"raw 0x06 0x02": {"stderr": ERROR}})
+
+    responses = getBackend(SubprocessBackend, timeout).rawCommandBatch(REQUESTS)
+    assert responses == [(" 00\n", ""), ("", ERROR), (" 00\n", "")]
+    assert len(fakeIpmitool.calls) == 1
+
+def testBatchResendsRequestsAfterAMissingMarker(fakeIpmitool, timeout):
+    # ipmitool exits in the middle of the script: the request it stopped at and the ones after it are resent one by one
+    fakeIpmitool.respond({"raw 0x06 0x02": {"stderr": ERROR, "exit": True}})
+
+    responses = getBackend(SubprocessBackend, timeout).rawCommandBatch(REQUESTS)
+    assert responses == [(" 00\n", ""), ("", ERROR), (" 00\n", "")]
+    assert fakeIpmitool.calls[1:] == ['raw 0x06 0x02', 'raw 0x06 0x03']
+
+def testBatchIgnoresExtraMarkers(fakeIpmitool, monkeypatch, timeout):
+    monkeypatch.setattr(commandBackend.uuid, 'uuid4', lambda: FixedUuid)
+    marker = f'{BATCH_MARKER}{FixedUuid.hex[:8]}_'
+    # marker lines out of sequence (a repeated or unknown index) are output of the request printing them
+    fakeIpmitool.respond({"raw 0x06 0x01": {"stdout": f" 01\n{marker}0\n{marker}7\n 02\n"}})
+
+    responses = getBackend(SubprocessBackend, timeout).rawCommandBatch(REQUESTS)
+    assert responses == [(" 01\n 02\n", f"{marker}0\n{marker}7\n"), (" 00\n", ""), (" 00\n", "")]
+    assert len(fakeIpmitool.calls) == 1
+
+def testShellSeparatesMultiLineResponsesAndErrors(fakeIpmitool, timeout):
+    fakeIpmitool.respond({"raw 0x06 0x01": {"stdout": LONG_RESPONSE}, "raw 0x06 0x02": {"stderr": ERROR}})
+
+    with getBackend(ShellBackend, timeout) as backend:
+        assert [backend.rawCommand(*request) for request in REQUESTS] == [(LONG_RESPONSE, ""), ("", ERROR), (" 00\n", "")]
+    assert fakeIpmitool.calls == ['exec /dev/stdin']      # one process for every command
+
+def testShellRestartsAfterAMissingMarker(fakeIpmitool, timeout):
+    fakeIpmitool.respond({"raw 0x06 0x02": {"stderr": ERROR, "exit": True}})
+
+    with getBackend(ShellBackend, timeout) as backend:
+        assert [backend.rawCommand(*request) for request in REQUESTS] == [(" 00\n", ""), ("", ERROR), (" 00\n", "")]
+    assert fakeIpmitool.calls == ['exec /dev/stdin', 'exec /dev/stdin']
+
+def testShellIgnoresMarkersOfOtherCommands(fakeIpmitool, timeout):
+    stdout = f" 01\n{ShellBackend.MARKER}11\n{ShellBackend.MARKER}2\n 02\n"
+    fakeIpmitool.respond({"raw 0x06 0x01": {"stdout": stdout}})
+
+    with getBackend(ShellBackend, timeout) as backend:
+        assert backend.rawCommand('0x06', '0x01') == (stdout, "")
+        assert backend.rawCommand('0x06', '0x02') == (" 00\n", "")
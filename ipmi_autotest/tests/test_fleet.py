@@ -0,0 +1,61 @@
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import fleet
+
+from defs.dotDict import DotDict
+
+def getProjectConfig(ip: str, port: int=None) -> DotDict:
+    return DotDict({"projectName": "example", "ip": ip, "port": port})
+
+def testHostsBehindOneIpGetTheirOwnDirectory():
+    assert fleet.getHostDirName(getProjectConfig('10.0.0.1', 623)) == '10.0.0.1_623'
+    assert fleet.getHostDirName(getProjectConfig('10.0.0.1')) == '10.0.0.1_623'
+    assert fleet.getHostDirName(getProjectConfig('10.0.0.1', 6230)) != fleet.getHostDirName(getProjectConfig('10.0.0.1', 6231))
+    assert fleet.getHostDirName(getProjectConfig('fe80::1', 623)) == 'fe80--1_623'
+
+def testSummariesOfHostsBehindOneIpAreKeptApart(monkeypatch):
+    def runHost(projectConfig, options):
+        return DotDict({"host": fleet.getHostName(projectConfig), "status": "done", "error": None, "outputPath": None,
+                        "passed": projectConfig.port, "failed": 0, "unavailable": 0})
+
+    saved = []
+    monkeypatch.setattr(fleet, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(fleet, 'runHost', runHost)
+    monkeypatch.setattr(fleet, 'saveFleetSummary', lambda summaries, outputDir: saved.extend(summaries))
+
+    projectConfigs = [getProjectConfig('10.0.0.1', 6230), getProjectConfig('10.0.0.1', 6231), getProjectConfig('10.0.0.2')]
+    fleet.runFleet(projectConfigs, DotDict({"projectName": "example", "outputDir": "unused"}), parallel=2)
+
+    assert [summary.host for summary in saved] == ['10.0.0.1_6230', '10.0.0.1_6231', '10.0.0.2_623']
+    assert [summary.passed for summary in saved] == [6230, 6231, None]
+
+def sleepyHost(projectConfig, options):
+    with open(os.path.join(options.outputDir, f'{os.getpid()}.pid'), 'w'):
+        pass
+    time.sleep(60)
+
+def testInterruptTerminatesTheWorkers(monkeypatch, tmp_path):
+    def interrupted(futures):
+        while len(os.listdir(tmp_path)) < 2:    # both workers are running a host
+            time.sleep(0.05)
+        raise SystemExit(130)       # exit_gracefully
+
+    monkeypatch.setattr(fleet, 'runHost', sleepyHost)
+    monkeypatch.setattr(fleet, 'as_completed', interrupted)
+
+    projectConfigs = [getProjectConfig('10.0.0.1', 6230 + i) for i in range(4)]
+    start = time.monotonic()
+    with pytest.raises(SystemExit):
+        fleet.runFleet(projectConfigs, DotDict({"projectName": "example", "outputDir": str(tmp_path)}), parallel=2)
+
+    assert time.monotonic() - start < 30
+    pids = [int(name.split('.')[0]) for name in os.listdir(tmp_path)]
+    assert len(pids) == 2       # the other hosts were cancelled
+    for pid in pids:
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
@@ -0,0 +1,97 @@
+import pytest
+
+from fru import FruReader, decodeTypeLength, parseFruData, parseTypeLengthFields
+from simulator.fruImage import buildFruImage
+
+FIELDS = {
+    'Chassis Type': 'Rack Mount Chassis',
+    'Chassis Part Number': 'CH-01',
+    'Chassis Serial': 'CS123',
+    'Board Mfg': 'Adlink Technology',
+    'Board Product': 'Tianfu',
+    'Board Serial': 'BS456',
+    'Board Part Number': '50200-0210',
+    'Product Manufacturer': 'AutoX',
+    'Product Name': 'AutoX XCU',
+    'Product Version': 'V1.0',
+    'Product Serial': 'PS789',
+    'Product Extra': 'CPU_SPR DIMM_DDR5',
+}
+
+def testDecodeTypeLength():
+    assert decodeTypeLength(0b00, b'\x12\xab') == '12ab'
+    assert decodeTypeLength(0b01, bytes([0x12, 0xa3])) == '12 3'    # BCD plus
+    assert decodeTypeLength(0b10, bytes([0x29, 0xdc, 0xa6])) == 'IPMI'    # 6-bit ASCII
+    assert decodeTypeLength(0b11, b'SN 01\x00\x00') == 'SN 01'
+
+def testParseTypeLengthFields():
+    area = bytes([0xc2]) + b'AB' + bytes([0xc0, 0x82, 0x29, 0xdc, 0xc1, 0xc3]) + b'XYZ'
+    assert parseTypeLengthFields(area, 0) == ['AB', '', 'IP']
+
+def testParseFruDataRoundTrip():
+    fruInfo = parseFruData(buildFruImage(FIELDS))
+
+    assert fruInfo['Chassis Type'] == 'Rack Mount Chassis'
+    assert fruInfo['Board Mfg Date'] == 'Unspecified'
+    assert {tag: fruInfo[tag] for tag in FIELDS} == FIELDS
+    assert 'Product Asset Tag' not in fruInfo      # empty fields are not printed
+
+def testParseFruDataRejectsBadHeader():
+    image = bytearray(buildFruImage(FIELDS))
+    with pytest.raises(Exception, match='format version'):
+        parseFruData(b'\x02' + bytes(image[1:]))
+
+    image[1] ^= 0x01
+    with pytest.raises(Exception, match='checksum'):
+        parseFruData(bytes(image))
+
+def testParseFruDataWarnsOnAreaChecksum(caplog):
+    image = bytearray(buildFruImage(FIELDS))
+    image[image[3] * 8 + 8] ^= 0x01     # a byte of the board area
+
+    parseFruData(bytes(image))
+    assert 'board area checksum mismatch' in caplog.text
+
+class FakeFru:
+    '''
+        answers Get FRU Inventory Area Info and Read FRU Data from an image, rejecting reads over `maxRead` bytes
+    '''
+    def __init__(self, image: bytes, maxRead: int=255) -> None:
+        self.image = image
+        self.maxRead = maxRead
+        self.batches = []
+
+    def rawCommand(self, netfn, cmd, *data):
+        size = len(self.image)
+        return ' ' + ' '.join(f'{byte:02x}' for byte in [size & 0xff, size >> 8, 0x00]) + '\n', ''
+
+    def rawCommandBatch(self, requests):
+        self.batches.append(requests)
+        responses = []
+        for _, _, _, offsetLow, offsetHigh, count in requests:
+            offset, count = int(offsetLow, 16) | int(offsetHigh, 16) << 8, int(count, 16)
+            if count > self.maxRead:
+                responses.append(('', 'Unable to send RAW command (channel=0x0 netfn=0xa lun=0x0 cmd=0x11 rsp=0xca): Cannot return number of requested data bytes\n'))
+                continue
+            chunk = self.image[offset:offset + count]
+            responses.append((' ' + ' '.join(f'{byte:02x}' for byte in bytes([len(chunk)]) + chunk) + '\n', ''))
+        return responses
+
+def testReadImageHalvesRejectedChunks():
+    image = buildFruImage(FIELDS)
+    fakeFru = FakeFru(image, maxRead=32)
+    reader = FruReader()
+
+    assert reader.readImage(0, fakeFru.rawCommand, fakeFru.rawCommandBatch) == image
+    assert reader.chunkSize == 32
+    assert len(fakeFru.batches) == 3
+
+def testReadDecodesTheCurrentImage():
+    fakeFru = FakeFru(buildFruImage(FIELDS))
+    reader = FruReader()
+    fru = reader.read(0, fakeFru.rawCommand, fakeFru.rawCommandBatch)
+    assert fru.fields['Board Serial'] == 'BS456'
+    assert fru.size == len(fakeFru.image)
+
+    fakeFru.image = buildFruImage({**FIELDS, 'Board Serial': 'BS457'})
+    assert reader.read(0, fakeFru.rawCommand, fakeFru.rawCommandBatch).fields['Board Serial'] == 'BS457'
@@ -0,0 +1,74 @@
+import json
+
+from defs.enums import Result
+from journal import RunJournal
+
+def getJournal(tmp_path, resume: bool=False, workbookHash: str='hash', host: str='10.0.0.1') -> RunJournal:
+    return RunJournal(str(tmp_path / 'run' / 'example_IB.journal.jsonl'), workbookHash, host, resume=resume)
+
+def writeRun(tmp_path) -> None:
+    journal = getJournal(tmp_path)
+    journal.recordAvailability([12, 13], [(" 00\n", ""), ("", "Unable to send RAW command (channel=0x0 netfn=0x6 lun=0x0 cmd=0x2 rsp=0xc1): Invalid command\n")])
+    journal.recordFunction(12, (Result.PASS, None))
+    journal.recordFunction(14, (85, "1/4 responses mismatch at bytes [2]"))
+    journal.close()
+
+def testResumeReplaysFinishedRows(tmp_path):
+    writeRun(tmp_path)
+    journal = getJournal(tmp_path, resume=True)
+
+    assert journal.availability == {
+        12: (" 00\n", ""),
+        13: ("", "Unable to send RAW command (channel=0x0 netfn=0x6 lun=0x0 cmd=0x2 rsp=0xc1): Invalid command\n"),
+    }
+    assert journal.function == {12: (Result.PASS, None), 14: (85, "1/4 responses mismatch at bytes [2]")}
+    journal.close()
+
+def testResumeAppendsToTheJournal(tmp_path):
+    writeRun(tmp_path)
+    journal = getJournal(tmp_path, resume=True)
+    journal.recordFunction(15, (Result.FAIL, "power on timed out"))
+    journal.close()
+
+    journal = getJournal(tmp_path, resume=True)
+    assert journal.function[15] == (Result.FAIL, "power on timed out")
+    assert len(journal.function) == 3
+    journal.close()
+
+def testTruncatedLastLineIsIgnored(tmp_path):
+    writeRun(tmp_path)
+    path = tmp_path / 'run' / 'example_IB.journal.jsonl'
+    with open(path, 'a') as f:
+        f.write('{"phase": "function", "row": 16, "res')
+
+    journal = getJournal(tmp_path, resume=True)
+    assert 16 not in journal.function
+    journal.recordFunction(16, (Result.PASS, None))
+    journal.close()
+
+    lines = path.read_text().split('\n')
+    assert json.loads(lines[-2]) == {"phase": "function", "row": 16, "result": "P", "info": None}
+    assert getJournal(tmp_path, resume=True).function[16] == (Result.PASS, None)
+
+def testJournalOfAnotherWorkbookOrHostIsNotResumed(tmp_path):
+    writeRun(tmp_path)
+
+    assert getJournal(tmp_path, resume=True, workbookHash='other').function == {}
+    writeRun(tmp_path)
+    assert getJournal(tmp_path, resume=True, host='10.0.0.2').availability == {}
+
+def testWithoutResumeTheJournalStartsOver(tmp_path):
+    writeRun(tmp_path)
+    getJournal(tmp_path).close()
+
+    assert getJournal(tmp_path, resume=True).function == {}
+
+def testArchive(tmp_path):
+    writeRun(tmp_path)
+    journal = getJournal(tmp_path, resume=True)
+    outputPath = tmp_path / 'output'
+    outputPath.mkdir()
+    journal.archive(str(outputPath))
+
+    assert (outputPath / 'example_IB.journal.jsonl').exists()
+    assert not (tmp_path / 'run' / 'example_IB.journal.jsonl').exists()
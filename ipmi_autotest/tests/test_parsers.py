@@ -0,0 +1,62 @@
+import pytest
+
+from defs.parsers import parseInventory, parseSensorInfo, parseSensorList, SENSOR_LIST_COLUMNS
+
+def testParseInventory(tmp_path):
+    inventory = tmp_path / 'rack.txt'
+    inventory.write_text(
+        "# <ip>[,<user name>,<password>[,<cypher suite>[,<port>]]]\n"
+        "10.0.0.11\n"
+        "\n"
+        "10.0.0.12, root , secret\n"
+        "10.0.0.12,,,3,6230\n"
+    )
+
+    hosts = parseInventory(str(inventory))
+    assert [dict(host) for host in hosts] == [
+        {"ip": "10.0.0.11", "userName": None, "password": None, "cypherSuite": None, "port": None},
+        {"ip": "10.0.0.12", "userName": "root", "password": "secret", "cypherSuite": None, "port": None},
+        {"ip": "10.0.0.12", "userName": None, "password": None, "cypherSuite": 3, "port": 6230},
+    ]
+
+def testParseInventoryRejectsExtraFields(tmp_path):
+    inventory = tmp_path / 'rack.txt'
+    inventory.write_text("10.0.0.11,a,b,17,623,extra\n")
+
+    with pytest.raises(Exception, match='line 1'):
+        parseInventory(str(inventory))
+
+SENSOR_LIST = (
+    "P12V_MOD         | 12.000     | Volts      | ok    | 10.200    | 10.800    | 11.400    | 12.600    | 13.200    | 13.800    \r\n"
+    "BMC_FAN_0        | na         |            | na    | na        | na        | na        | na        | na        | na        \n"
+    "Locating 'sensor' entries\n"
+    "P12V_MOD         | 11.000     | Volts      | ok    | na        | na        | na        | na        | na        | na        \n"
+)
+
+SENSOR_GET = (
+    "Locating sensor record...\n"
+    "Sensor ID              : P12V_MOD (0x31)\n"
+    " Entity ID             : 7.1 (System Board)\n"
+    " Sensor Reading        : 12 (+/- 0) Volts\n"
+    " Timestamp             : 10/18/2026 09:00:00\n"
+)
+
+def testParseSensorList():
+    sensors = parseSensorList(SENSOR_LIST)
+
+    assert list(sensors.index) == ['P12V_MOD', 'BMC_FAN_0']
+    assert list(sensors.columns) == SENSOR_LIST_COLUMNS[1:]
+    assert sensors.loc['P12V_MOD', 'Sensor Reading'] == '12.000'
+    assert sensors.loc['P12V_MOD', 'Upper Non-Recoverable'] == '13.800'
+    assert sensors.loc['BMC_FAN_0', 'Units'] == ''
+
+def testParseSensorListWithoutSensors():
+    assert parseSensorList("Locating 'sensor' entries\n").empty
+
+def testParseSensorInfo():
+    sensorInfo = parseSensorInfo(SENSOR_GET)
+
+    assert sensorInfo['Sensor ID'] == 'P12V_MOD (0x31)'
+    assert sensorInfo['Sensor Reading'] == '12 (+/- 0) Volts'
+    assert sensorInfo['Timestamp'] == '10/18/2026 09:00:00'
+    assert 'Locating sensor record...' not in sensorInfo
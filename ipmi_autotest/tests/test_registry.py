@@ -0,0 +1,112 @@
+import itertools
+import textwrap
+
+import projects
+from defs.enums import AutoTestType, VerificationType
+import registry as registryModule
+from testPlan import RawCommand
+
+HEADER = '''
+from typing import Tuple
+
+from base import TestCase
+from defs.enums import Resource, Result
+'''
+
+projectIds = itertools.count()
+
+def makeRegistry(tmp_path, monkeypatch, files: dict) -> registryModule.TestCaseRegistry:
+    '''
+        writes {fileName: source} as projects/<new project>/raw/ and discovers it
+    '''
+    projectName = f'registryTest{next(projectIds)}'
+    rawDir = tmp_path / projectName / 'raw'
+    rawDir.mkdir(parents=True)
+    (tmp_path / projectName / '__init__.py').write_text('')
+    for fileName, source in files.items():
+        (rawDir / fileName).write_text(HEADER + textwrap.dedent(source))
+
+    monkeypatch.setattr(projects, '__path__', [*projects.__path__, str(tmp_path)])
+    return registryModule.TestCaseRegistry(projectName, str(rawDir))
+
+def row(functionName: str, verificationType=VerificationType.ACCURACY, testType=AutoTestType.FUNCTIONAL, rowNum: int=1) -> RawCommand:
+    testName = functionName.replace(' ', '')
+    return RawCommand(rowNum, functionName, testName, '0x06', '0x01', 0, testType.value, True, verificationType)
+
+def testGetRegistryKey():
+    assert registryModule.getRegistryKey('Get Device ID') == registryModule.getRegistryKey('GetDeviceId') == registryModule.getRegistryKey('TestGetDeviceID') == 'getdeviceid'
+
+def testBindMapsCommandsToTestCases(tmp_path, monkeypatch):
+    registry = makeRegistry(tmp_path, monkeypatch, {'testGetDeviceId.py': '''
+        class TestGetDeviceId(TestCase):
+            resources = ()
+    '''})
+
+    assert registry.errors == []
+    assert registry.bind([row('Get Device ID'), row('Anything', testType=AutoTestType.AVAILABILITY)]) == []
+    assert registry.getByCommand('0X06', '0x01').__name__ == 'TestGetDeviceId'
+
+def testBehaviorRowWithoutImplementation(tmp_path, monkeypatch):
+    registry = makeRegistry(tmp_path, monkeypatch, {'testChassisControl.py': '''
+        class TestChassisControl(TestCase):
+            pass
+    '''})
+
+    problems = registry.bind([row('Chassis Control', VerificationType.BEHAVIOR, rowNum=7)])
+    assert problems == ["Row 7 Chassis Control: TestChassisControl does not implement behavioralVerification()"]
+    assert registry.getByCommand('0x06', '0x01') is None
+
+def testBehaviorRowWithImplementation(tmp_path, monkeypatch):
+    registry = makeRegistry(tmp_path, monkeypatch, {'testChassisControl.py': '''
+        class TestChassisControl(TestCase):
+            def behavioralVerification(self) -> Tuple[Result, str]:
+                return Result.PASS, None
+    '''})
+
+    assert registry.bind([row('Chassis Control', VerificationType.BEHAVIOR)]) == []
+
+def testRowWithoutTestCase(tmp_path, monkeypatch):
+    registry = makeRegistry(tmp_path, monkeypatch, {})
+
+    problems = registry.bind([row('Get Device ID', rowNum=3)])
+    assert len(problems) == 1
+    assert problems[0].startswith("Row 3 Get Device ID: no test case, please implement TestGetDeviceID in ")
+
+def testInvalidTestCasesAreReported(tmp_path, monkeypatch):
+    registry = makeRegistry(tmp_path, monkeypatch, {
+        'testBroken.py': 'raise RuntimeError("boom")\n',
+        'testEmpty.py': 'x = 1\n',
+        'testNaming.py': '''
+            class GetNaming(TestCase):
+                pass
+        ''',
+        'testInit.py': '''
+            class TestInit(TestCase):
+                def __init__(self, testRoutine, netfn, cmd) -> None:
+                    pass
+        ''',
+        'testResources.py': '''
+            class TestResources(TestCase):
+                resources = [Resource.POWER_STATE]
+        ''',
+        'testDuplicateA.py': '''
+            class TestDuplicate(TestCase):
+                pass
+        ''',
+        'testDuplicateB.py': '''
+            class TestDuplicate(TestCase):
+                pass
+        ''',
+        '__testXXXTemplate.py': 'raise RuntimeError("templates are not imported")\n',
+    })
+
+    assert registry.errors == [
+        "testBroken.py: cannot be imported, RuntimeError: boom",
+        "testDuplicateB.py: TestDuplicate duplicates TestDuplicate",
+        "testEmpty.py: no TestCase subclass defined",
+        "testInit.py: TestInit __init__ does not accept numData, needVerify, labels, verificationType",
+        "testNaming.py: GetNaming should be named Test<Function Name>",
+        "testResources.py: TestResources resources should be a tuple of Resource",
+    ]
+    assert list(registry.testCases) == ['duplicate']
+    assert registry.bind([]) == registry.errors     # loading errors stop the run too
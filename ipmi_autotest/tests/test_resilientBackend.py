@@ -0,0 +1,182 @@
+import time
+
+import pytest
+
+from backends import ResilientBackend, CircuitBreaker
+from backends.commandBackend import CommandBackend, NOT_SENT_ERROR, formatTimeoutError
+from backends.resilientBackend import CIRCUIT_OPEN_ERROR, RETRY_BACKOFF, RETRY_MAX_BACKOFF, getOutcome
+from defs.dotDict import DotDict
+from defs.enums import AttemptOutcome, BreakerMode
+from responseCache import ResponseCache
+from testPlan import RawCommand
+
+TIMEOUT = ("", formatTimeoutError(1))
+ANSWER = (" 00", "")
+
+class ScriptedBackend(CommandBackend):
+    '''
+        answers every command with the next response of `script`, then with ANSWER
+    '''
+    def __init__(self, script=()) -> None:
+        super().__init__(DotDict({"ip": "127.0.0.1"}))
+        self.script = list(script)
+        self.sent = []
+
+    def generalCommand(self, cmdType="", *args):
+        self.sent.append((cmdType, *args))
+        return self.script.pop(0) if self.script else ANSWER
+
+def getRawCommand(functionName: str, netfn: str, cmd: str) -> RawCommand:
+    return RawCommand(0, functionName, functionName.replace(' ', ''), netfn, cmd, 0, 'Functional', False, None)
+
+@pytest.fixture(autouse=True)
+def noBackoff(monkeypatch):
+    monkeypatch.setattr('backends.resilientBackend.time.sleep', lambda seconds: None)
+
+@pytest.fixture
+def isIdempotent():
+    cache = ResponseCache('127.0.0.1', [getRawCommand('Get Device ID', '0x06', '0x01'), getRawCommand('Set Power Restore Policy', '0x00', '0x06')])
+    return cache.isIdempotentCommand
+
+def getBackend(script, isIdempotent=None, retries=2, threshold=0):
+    reports = []
+    backend = ResilientBackend(
+        ScriptedBackend(script),
+        CircuitBreaker(threshold, cooldown=30),
+        retries=retries,
+        onAttempts=lambda cmdType, args, attempts: reports.append((cmdType, args, attempts)),
+        isIdempotent=isIdempotent
+    )
+    return backend, reports
+
+def testGetOutcome():
+    assert getOutcome(ANSWER) == AttemptOutcome.OK
+    assert getOutcome(TIMEOUT) == AttemptOutcome.TIMEOUT
+    assert getOutcome(("", f"{NOT_SENT_ERROR}\n")) == AttemptOutcome.NOT_SENT
+    assert getOutcome(("", "Unable to send RAW command (channel=0x0 netfn=0x6 lun=0x0 cmd=0x1 rsp=0xc0): Node busy\n")) == AttemptOutcome.TRANSIENT
+    assert getOutcome(("", "Unable to send RAW command (channel=0x0 netfn=0x6 lun=0x0 cmd=0x1 rsp=0xc1): Invalid command\n")) == AttemptOutcome.ERROR
+    assert getOutcome(("", "Unable to send RAW command (channel=0x0 netfn=0x6 lun=0x0 cmd=0x1)\n")) == AttemptOutcome.TRANSIENT
+
+def testIdempotentCommandIsRetried(isIdempotent):
+    backend, reports = getBackend([TIMEOUT, TIMEOUT], isIdempotent)
+
+    assert backend.rawCommand('0x06', '0x01') == ANSWER
+    assert len(backend.inner.sent) == 3
+    [(_, _, attempts)] = reports
+    assert [attempt.outcome for attempt in attempts] == ['timeout', 'timeout', 'ok']
+
+def testRetriesAreBounded(isIdempotent):
+    backend, reports = getBackend([TIMEOUT] * 5, isIdempotent, retries=2)
+
+    assert backend.rawCommand('0x06', '0x01') == TIMEOUT
+    assert len(backend.inner.sent) == 3
+
+def testNonIdempotentCommandIsSentOnce(isIdempotent):
+    backend, reports = getBackend([TIMEOUT], isIdempotent)
+
+    assert backend.rawCommand('0x00', '0x06', '0x01') == TIMEOUT
+    assert backend.generalCommand('chassis', 'power', 'cycle') == ANSWER
+    assert backend.inner.sent == [('raw', '0x00', '0x06', '0x01'), ('chassis', 'power', 'cycle')]
+    [(_, _, attempts)] = reports
+    assert [attempt.outcome for attempt in attempts] == ['timeout']
+
+def testReadOnlySubcommandIsRetried(isIdempotent):
+    backend, _ = getBackend([TIMEOUT], isIdempotent)
+
+    assert backend.generalCommand('sdr', 'list') == ANSWER
+    assert len(backend.inner.sent) == 2
+
+def testCommandsAreNotRetriedWithoutClassification():
+    backend, _ = getBackend([TIMEOUT])
+
+    assert backend.rawCommand('0x06', '0x01') == TIMEOUT
+    assert len(backend.inner.sent) == 1
+
+def testBatchRetriesOnlyIdempotentRequests(isIdempotent):
+    backend, _ = getBackend([TIMEOUT, TIMEOUT], isIdempotent)
+
+    responses = backend.rawCommandBatch([('0x06', '0x01'), ('0x00', '0x06', '0x01')])
+    assert responses == [ANSWER, TIMEOUT]
+    assert backend.inner.sent == [('raw', '0x06', '0x01'), ('raw', '0x00', '0x06', '0x01'), ('raw', '0x06', '0x01')]
+
+def testNotSentRequestsAreResent(isIdempotent):
+    backend, _ = getBackend([ANSWER, ("", f"{NOT_SENT_ERROR}\n")], isIdempotent)
+
+    responses = backend.rawCommandBatch([('0x06', '0x01'), ('0x00', '0x06', '0x01')])
+    assert responses == [ANSWER, ANSWER]
+    assert backend.inner.sent[-1] == ('raw', '0x00', '0x06', '0x01')
+
+def testNonIdempotentTimeoutsOpenTheBreaker(isIdempotent):
+    backend, _ = getBackend([TIMEOUT, TIMEOUT], isIdempotent, threshold=2)
+
+    backend.rawCommand('0x00', '0x06', '0x01')
+    backend.rawCommand('0x00', '0x06', '0x01')
+    assert backend.breaker.isOpen
+    assert backend.rawCommand('0x06', '0x01') == ("", f"{CIRCUIT_OPEN_ERROR}\n")
+    assert len(backend.inner.sent) == 2
+
+def testBackoffIsBoundedFullJitter(monkeypatch):
+    backend, _ = getBackend([])
+    monkeypatch.setattr('backends.resilientBackend.random.uniform', lambda low, high: (low, high))
+
+    assert backend._ResilientBackend__getBackoff(1) == (0, RETRY_BACKOFF)
+    assert backend._ResilientBackend__getBackoff(3) == (0, RETRY_BACKOFF * 4)
+    assert backend._ResilientBackend__getBackoff(20) == (0, RETRY_MAX_BACKOFF)
+
+def testBreakerOpensAfterThresholdAndClosesOnAnswer():
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(2):
+        breaker.record(AttemptOutcome.TIMEOUT)
+    breaker.record(AttemptOutcome.ERROR)
+    breaker.record(AttemptOutcome.TIMEOUT)
+    assert not breaker.isOpen
+
+    breaker.record(AttemptOutcome.TRANSIENT)
+    breaker.record(AttemptOutcome.TIMEOUT)
+    assert breaker.isOpen
+    assert not breaker.allow(lambda: AttemptOutcome.OK)     # cooling down
+
+    breaker.openedAt -= 30
+    assert not breaker.allow(lambda: AttemptOutcome.TIMEOUT)
+    assert breaker.isOpen
+    breaker.openedAt -= 30
+    assert breaker.allow(lambda: AttemptOutcome.OK)
+    assert not breaker.isOpen
+
+def testPausedBreakerWaitsForTheProbe():
+    breaker = CircuitBreaker(threshold=1, cooldown=5, mode=BreakerMode.PAUSE)
+    breaker.record(AttemptOutcome.TIMEOUT)
+    probes = [AttemptOutcome.TIMEOUT, AttemptOutcome.OK]
+
+    assert breaker.allow(lambda: probes.pop(0))
+    assert not probes
+    assert breaker.pausedSeconds > 0
+
+def testCommandsUnderADeadlineAreSentOnceWithTheRemainingTime(isIdempotent):
+    backend, _ = getBackend([TIMEOUT, TIMEOUT], isIdempotent)
+    backend.setTimeouts(30, {'sdr': 120})
+
+    with backend.deadline(time.monotonic() + 2):
+        assert backend.inner.getTimeout('raw', ('0x06', '0x01')) <= 2
+        assert backend.inner.getTimeout('sdr', ('list',)) <= 2
+        assert backend.rawCommand('0x06', '0x01') == TIMEOUT
+        assert backend.rawCommandBatch([('0x06', '0x01')]) == [TIMEOUT]
+    assert len(backend.inner.sent) == 2
+
+    assert backend.inner.getTimeout('raw', ('0x06', '0x01')) == 30
+    assert backend.rawCommand('0x06', '0x01') == ANSWER
+
+def testExpiredDeadlineLeavesNoTime():
+    backend, _ = getBackend([])
+
+    with backend.deadline(time.monotonic() - 1):
+        assert backend.inner.getTimeout('raw', ('0x06', '0x01')) == 0
+
+def testPausedBreakerFailsFastUnderADeadline():
+    backend, _ = getBackend([TIMEOUT], threshold=1)
+    backend.breaker.mode = BreakerMode.PAUSE
+    backend.rawCommand('0x06', '0x01')
+
+    with backend.deadline(time.monotonic() + 1):
+        assert backend.rawCommand('0x06', '0x01') == ("", f"{CIRCUIT_OPEN_ERROR}\n")
+    assert backend.breaker.pausedSeconds == 0
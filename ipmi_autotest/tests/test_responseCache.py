@@ -0,0 +1,105 @@
+from responseCache import ResponseCache, getSubcommandVerb, parseByte
+from testPlan import RawCommand
+
+def getRawCommand(functionName: str, netfn: str, cmd: str) -> RawCommand:
+    return RawCommand(0, functionName, functionName.replace(' ', ''), netfn, cmd, 0, 'Functional', False, None)
+
+RAW_COMMANDS = [
+    getRawCommand('Get Device ID', '0x06', '0x01'),
+    getRawCommand('Get SEL Time', '0x0a', '0x48'),
+    getRawCommand('Reserve SEL', '0x0a', '0x42'),
+    getRawCommand('Set Power Restore Policy', '0x00', '0x06'),
+]
+ANSWER = (" 20 01\n", "")
+
+def getCache(enabled: bool=True) -> ResponseCache:
+    return ResponseCache('10.0.0.1', RAW_COMMANDS, enabled=enabled)
+
+def testParseByte():
+    assert parseByte('0x0a') == parseByte('10') == parseByte('0x0A') == 10
+    assert parseByte('zz') == 'zz'
+
+def testIdempotentCommands():
+    cache = getCache()
+
+    assert cache.isIdempotent(('0x06', '0x01'))
+    assert cache.isIdempotent(('6', '1', '0x00'))
+    assert cache.isIdempotent(('0x0a', '0x11', '0x00', '0x00', '0x00', '0x10'))     # Read FRU Data is a read without 'Get'
+    assert not cache.isIdempotent(('0x0a', '0x48'))      # the SEL clock moves
+    assert not cache.isIdempotent(('0x0a', '0x42'))
+    assert not cache.isIdempotent(('0x00', '0x06', '0x01'))
+    assert not cache.isIdempotent(('0x06',))
+
+def testIdempotentGeneralCommands():
+    cache = getCache()
+
+    assert cache.isIdempotentCommand('raw', ('0x06', '0x01'))
+    assert cache.isIdempotentCommand('sdr', ('list',))
+    assert cache.isIdempotentCommand('power', ('status',))
+    assert not cache.isIdempotentCommand('power', ('cycle',))
+    assert not cache.isIdempotentCommand('sel', ('clear',))
+    assert cache.isIdempotentCommand('chassis', ('status',))
+    assert cache.isIdempotentCommand('chassis', ('power', 'status'))
+    assert cache.isIdempotentCommand('mc', ('watchdog', 'get'))
+    assert not cache.isIdempotentCommand('chassis', ('power', 'cycle'))
+    assert not cache.isIdempotentCommand('user', ('set', 'name', '2', 'info'))     # read-only words past the action do not count
+    assert not cache.isIdempotentCommand('sel', ('clear', 'list'))
+    assert not cache.isIdempotentCommand('fru', ())
+
+def testGetSubcommandVerb():
+    assert getSubcommandVerb('sdr', ('dump', '/tmp/sdr.bin')) == 'dump'
+    assert getSubcommandVerb('Chassis', ('Power', 'Status')) == 'status'
+    assert getSubcommandVerb('chassis', ('power',)) is None
+    assert getSubcommandVerb('fru', ()) is None
+
+def testSideEffectingGetCommandsAreNotCached():
+    cache = ResponseCache('10.0.0.1', [getRawCommand('Get Message', '0x06', '0x33'), getRawCommand('Get Device ID', '0x06', '0x01')])
+
+    assert not cache.isIdempotent(('0x06', '0x33'))
+    assert cache.isIdempotent(('0x06', '0x01'))
+
+def testHitsAreKeyedByNormalizedRequest():
+    cache = getCache()
+    cache.put(('0x06', '0x01'), ANSWER)
+
+    assert cache.get(('6', '1')) == ANSWER
+    assert cache.get(('0x06', '0x01', '0x00')) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def testOnlyAnsweredResponsesAreCached():
+    cache = getCache()
+    cache.put(('0x06', '0x01', '0x01'), ("", "Unable to send RAW command (channel=0x0 netfn=0x6 lun=0x0 cmd=0x1 rsp=0xc9): Parameter out of range\n"))
+    cache.put(('0x06', '0x01', '0x02'), ("", "Unable to send RAW command (channel=0x0 netfn=0x6 lun=0x0 cmd=0x1)\n"))
+
+    assert cache.get(('0x06', '0x01', '0x01')) is not None
+    assert cache.get(('0x06', '0x01', '0x02')) is None
+
+def testStateChangingCommandsInvalidate():
+    cache = getCache()
+    cache.put(('0x06', '0x01'), ANSWER)
+    cache.put(('0x00', '0x06', '0x01'), ("", "Unable to send RAW command (channel=0x0 netfn=0x0 lun=0x0 cmd=0x6 rsp=0xcc): Invalid data field in request\n"))
+    assert cache.get(('0x06', '0x01')) == ANSWER     # rejected, nothing changed
+
+    cache.put(('0x00', '0x06', '0x01'), (" 07\n", ""))
+    assert cache.get(('0x06', '0x01')) is None
+
+    cache.put(('0x06', '0x01'), ANSWER)
+    cache.invalidateGeneralCommand('sdr', ('list',))
+    assert cache.get(('0x06', '0x01')) == ANSWER
+    cache.invalidateGeneralCommand('chassis', ('power', 'cycle'))
+    assert cache.get(('0x06', '0x01')) is None
+
+def testGetMisses():
+    cache = getCache()
+    cache.put(('0x06', '0x01'), ANSWER)
+
+    responses, misses = cache.getMisses([('0x06', '0x01'), ('0x0a', '0x48'), ('0x06', '0x01', '0x00')])
+    assert responses == [ANSWER, None, None]
+    assert misses == [1, 2]
+
+def testDisabledCacheStoresNothing():
+    cache = getCache(enabled=False)
+    cache.put(('0x06', '0x01'), ANSWER)
+
+    assert cache.get(('0x06', '0x01')) is None
+    assert cache.isIdempotent(('0x06', '0x01'))     # still used to decide what is safe to retry
@@ -0,0 +1,53 @@
+import sqlite3
+
+from defs.dotDict import DotDict
+from resultsStore import ResultsStore, getRegressions
+
+def getProjectConfig(firmware: str) -> DotDict:
+    return DotDict({"projectName": "example", "ip": "10.0.0.1", "hardwareVersion": "A", "softwareVersion": firmware, "tester": "qa"})
+
+def row(rowNum: int, functionName: str, netfn: str, cmd: str, availability: str='A', result: str='P') -> tuple:
+    return (rowNum, functionName, netfn, cmd, availability, None, result, 'A', None)
+
+def testRequestsAreStoredWithTheVerdictOfTheirTestCase(tmp_path):
+    store = ResultsStore(str(tmp_path / 'results.db'))
+    store.recordRequests([('0x06', '0x01'), ('0x06', '0x01', '0x00')], [(' 20 01\n', ''), ('', 'Invalid data field\n')], 0.04)
+    store.recordRequests([('0x06', '0x01')], [(' 20 01\n', '')], 0, cached=True)
+    store.recordRequests([('0x0A', '0x20')], [(' 51 00\n', '')], 0.01)     # SDR repository info, no 'Raw CMD' row
+    runId = store.saveRun(getProjectConfig('1.0'), 'OOB', [
+        row(2, 'Get Device ID', '0x06', '0x01'),
+        row(3, 'Cold Reset', '0x06', '0x02', result='F'),
+    ])
+
+    connection = sqlite3.connect(store.path)
+    entries = connection.execute(
+        'SELECT netfn, cmd, seq, row_num, data, error, latency_ms, averaged, cached, result FROM results WHERE run_id = ? ORDER BY netfn, cmd, seq',
+        (runId,)
+    ).fetchall()
+    connection.close()
+    assert entries == [
+        ('0x06', '0x01', 0, 2, '', None, 20, 1, 0, 'P'),
+        ('0x06', '0x01', 1, 2, '0x00', 'Invalid data field', 20, 1, 0, 'P'),
+        ('0x06', '0x01', 2, 2, '', None, 0, 0, 1, 'P'),
+        ('0x06', '0x02', 0, 3, None, None, None, 0, 0, 'F'),
+        ('0x0a', '0x20', 0, None, '', None, 10, 0, 0, None),
+    ]
+
+def testRegressionsMatchTestCasesByCommand(tmp_path):
+    path = str(tmp_path / 'results.db')
+    before = ResultsStore(path)
+    before.recordRequests([('0x06', '0x01')], [(' 20 01\n', '')], 0.01)
+    before.saveRun(getProjectConfig('1.0'), 'OOB', [row(2, 'Get Device ID', '0x06', '0x01'), row(3, 'Get Self Test Results', '0x06', '0x04')])
+
+    after = ResultsStore(path)
+    after.recordRequests([('0x06', '0x01')], [('', 'Timeout\n')], 0.03)
+    # a row was inserted in the test plan, the test cases moved down
+    after.saveRun(getProjectConfig('1.1'), 'OOB', [
+        row(2, 'Get Device GUID', '0x06', '0x08'),
+        row(3, 'Get Device ID', '0x06', '0x01', availability='U', result='F'),
+        row(4, 'Get Self Test Results', '0x06', '0x04'),
+    ])
+
+    regression, = getRegressions(path, 'example', '1.0', '1.1')
+    assert (regression.functionName, regression.availabilityBefore, regression.availabilityAfter) == ('Get Device ID', 'A', 'U')
+    assert (regression.latencyMsBefore, regression.latencyMsAfter) == (10, 30)
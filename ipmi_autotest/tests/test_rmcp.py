@@ -0,0 +1,115 @@
+import struct
+
+import pytest
+
+from rmcp import aes
+from rmcp.packets import (
+    PayloadType, SessionKeys, RMCP_HEADER, PAYLOAD_AUTHENTICATED, PAYLOAD_ENCRYPTED,
+    packSessionPacket, unpackSessionPacket, packIpmiRequest, unpackIpmiRequest, packIpmiResponse, unpackIpmiResponse
+)
+from rmcp.session import LanplusSession
+from simulator.bmc import SimulatedBMC, loadSimulatorConfig
+from simulator.lanplusServer import LanplusServer
+
+# FIPS-197 appendix C.1 and NIST SP 800-38A F.2.1 (CBC-AES128.Encrypt)
+AES_KEY = bytes.fromhex('000102030405060708090a0b0c0d0e0f')
+CBC_KEY = bytes.fromhex('2b7e151628aed2a6abf7158809cf4f3c')
+CBC_IV = bytes.fromhex('000102030405060708090a0b0c0d0e0f')
+CBC_PLAIN = bytes.fromhex('6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51')
+CBC_CIPHER = bytes.fromhex('7649abac8119b246cee98e9b12e9197d5086cb9b507219ee95db113a917678b2')
+
+def getKeys(cipherSuite: int=17) -> SessionKeys:
+    return SessionKeys(cipherSuite, 'admin', bytes(range(16)), bytes(range(16, 32)), 0x14, 'admin')
+
+def testAesBlock():
+    roundKeys = aes.expandKey(AES_KEY)
+    cipher = aes.encryptBlock(roundKeys, bytes.fromhex('00112233445566778899aabbccddeeff'))
+
+    assert cipher == bytes.fromhex('69c4e0d86a7b0430d8cdb78070b4c55a')
+    assert aes.decryptBlock(roundKeys, cipher) == bytes.fromhex('00112233445566778899aabbccddeeff')
+
+def testAesCbc():
+    assert aes.encryptCbc(CBC_KEY, CBC_IV, CBC_PLAIN) == CBC_CIPHER
+    assert aes.decryptCbc(CBC_KEY, CBC_IV, CBC_CIPHER) == CBC_PLAIN
+
+def testAesRejectsOtherKeySizes():
+    with pytest.raises(Exception, match='16 bytes'):
+        aes.expandKey(bytes(24))
+
+@pytest.mark.parametrize('payload', [b'', b'\x01', bytes(15), bytes(16), bytes(range(40))])
+def testEncryptedPacketRoundTrip(payload):
+    keys = getKeys(17)
+    packet = packSessionPacket(PayloadType.IPMI, payload, 0x1234, 7, keys)
+
+    assert packet[5] == PayloadType.IPMI | PAYLOAD_ENCRYPTED | PAYLOAD_AUTHENTICATED
+    assert unpackSessionPacket(packet, keys) == (PayloadType.IPMI, 0x1234, 7, payload)
+
+@pytest.mark.parametrize('cipherSuite', [2, 3, 16, 17])
+def testTamperedPacketFailsIntegrityCheck(cipherSuite):
+    keys = getKeys(cipherSuite)
+    packet = bytearray(packSessionPacket(PayloadType.IPMI, b'\x20\x18', 1, 1, keys))
+    packet[17] ^= 0x01
+
+    with pytest.raises(Exception, match='integrity check failed'):
+        unpackSessionPacket(bytes(packet), keys)
+
+def testPacketAuthenticatedWithOtherKeysIsRejected():
+    packet = packSessionPacket(PayloadType.IPMI, b'\x20\x18', 1, 1, getKeys(17))
+    otherKeys = SessionKeys(17, 'other', bytes(range(16)), bytes(range(16, 32)), 0x14, 'admin')
+
+    with pytest.raises(Exception, match='integrity check failed'):
+        unpackSessionPacket(packet, otherKeys)
+
+@pytest.mark.parametrize('cipherSuite', [2, 3, 17])
+def testInSessionPacketWithoutFlagsIsRejected(cipherSuite):
+    forged = packSessionPacket(PayloadType.IPMI, packIpmiResponse(0x06, 0x01, 1, 0x00, b'\x20'), 1, 1)
+
+    with pytest.raises(Exception, match='Unauthenticated'):
+        unpackSessionPacket(forged, getKeys(cipherSuite))
+
+def testInSessionPacketWithoutEncryptionIsRejected():
+    keys = getKeys(17)
+    body = bytes([0x06, PayloadType.IPMI | PAYLOAD_AUTHENTICATED]) + struct.pack('<IIH', 1, 1, 2) + b'\x20\x18'
+    body += b'\xff' * 2 + bytes([2, 0x07])
+    forged = RMCP_HEADER + body + keys.authCode(body)
+
+    with pytest.raises(Exception, match='Unencrypted'):
+        unpackSessionPacket(forged, keys)
+
+def testSessionWithoutIntegrityAcceptsPlainPackets():
+    packet = packSessionPacket(PayloadType.IPMI, b'\x20\x18', 1, 1, getKeys(1))
+
+    assert packet[5] == PayloadType.IPMI
+    assert unpackSessionPacket(packet, getKeys(1)) == (PayloadType.IPMI, 1, 1, b'\x20\x18')
+
+def testIpmiMessages():
+    request = packIpmiRequest(0x06, 0x01, b'\x01\x02', 5)
+    assert unpackIpmiRequest(request) == (0x06, 0x01, 5, b'\x01\x02')
+
+    response = packIpmiResponse(0x06, 0x01, 5, 0xc1, b'\x20')
+    assert unpackIpmiResponse(response) == (0x07, 0x01, 5, 0xc1, b'\x20')
+    with pytest.raises(Exception, match='checksum'):
+        unpackIpmiResponse(response[:-1] + bytes([response[-1] ^ 0xff]))
+
+@pytest.fixture
+def lanplusServer():
+    server = LanplusServer(SimulatedBMC(loadSimulatorConfig(project='example')), port=0).start()
+    yield server
+    server.stop()
+
+@pytest.mark.parametrize('cipherSuite', [3, 17])
+def testRakpHandshake(lanplusServer, cipherSuite):
+    session = LanplusSession('127.0.0.1', lanplusServer.address[1], 'admin', 'admin', cipherSuite, timeout=2, retries=0)
+    try:
+        completionCode, data = session.sendRaw(0x06, 0x01)
+        assert completionCode == 0x00
+        assert data
+    finally:
+        session.close()
+
+def testRakpRejectsWrongPassword(lanplusServer):
+    session = LanplusSession('127.0.0.1', lanplusServer.address[1], 'admin', 'wrong', 17, timeout=0.5, retries=0)
+
+    with pytest.raises(Exception, match='RAKP 2 HMAC is invalid'):
+        session.open()
+    assert not session.isOpen
@@ -0,0 +1,75 @@
+import time
+import threading
+
+from defs.enums import Result, Resource
+import scheduler
+
+class FakeTestCase:
+    '''
+        records which tests were running while it ran
+    '''
+    running = set()
+    lock = threading.Lock()
+
+    def __init__(self, name: str, resources=None, seconds: float=0.05) -> None:
+        self.name = name
+        self.resources = resources
+        self.seconds = seconds
+        self.overlapped = set()
+
+    def test(self):
+        with self.lock:
+            self.overlapped.update(self.running)
+            for other in self.running:
+                other.overlapped.add(self)
+            self.running.add(self)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.running.discard(self)
+        return Result.PASS, None
+
+    def __repr__(self) -> str:
+        return self.name
+
+def run(testCases, workers: int=4):
+    FakeTestCase.running = set()
+    return scheduler.TestScheduler(workers, showProgress=False).run(dict(enumerate(testCases, start=1)))
+
+def testUndeclaredTestRunsAlone():
+    readOnly = [FakeTestCase(f'get{i}', ()) for i in range(3)]
+    power = FakeTestCase('power', (Resource.POWER_STATE,))
+    undeclared = FakeTestCase('undeclared')
+
+    results = run([readOnly[0], undeclared, *readOnly[1:], power])
+    assert len(results) == 5
+    assert undeclared.overlapped == set()
+
+def testDeclaredResourcesOnlyExcludeTheSameResources():
+    power = FakeTestCase('power', (Resource.POWER_STATE,), 0.2)
+    sel = FakeTestCase('sel', (Resource.SEL,), 0.2)
+    powerAgain = FakeTestCase('powerAgain', (Resource.POWER_STATE, Resource.BMC_RESET), 0.05)
+    readOnly = FakeTestCase('get', (), 0.1)
+
+    run([power, sel, powerAgain, readOnly])
+    assert sel in power.overlapped
+    assert powerAgain not in power.overlapped
+    assert readOnly.overlapped <= {sel}
+
+def testReadOnlyTestsDoNotRunDuringDisruptiveTests():
+    readOnly = [FakeTestCase(f'get{i}', (), 0.1) for i in range(4)]
+    reset = FakeTestCase('reset', (Resource.BMC_RESET,), 0.1)
+    power = FakeTestCase('power', (Resource.POWER_STATE,), 0.1)
+    sel = FakeTestCase('sel', (Resource.SEL,), 0.3)
+
+    run([readOnly[0], reset, readOnly[1], power, *readOnly[2:], sel])
+    assert {reset, power}.isdisjoint(set().union(*(test.overlapped for test in readOnly)))
+    assert any(test.overlapped & set(readOnly) for test in readOnly)       # read-only tests still run side by side
+
+def testSingleWorkerKeepsRowOrder():
+    order = []
+    testCases = [FakeTestCase(f'test{i}', () if i % 2 else None, 0) for i in range(4)]
+    for testCase in testCases:
+        testCase.test = lambda testCase=testCase: order.append(testCase) or (Result.PASS, None)
+
+    run(testCases, workers=1)
+    assert order == testCases
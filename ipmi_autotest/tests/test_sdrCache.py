@@ -0,0 +1,52 @@
+from defs.dotDict import DotDict
+from defs.functions import getHostDirName
+from sdrCache import SdrCache, parseSdrRepositoryInfo
+
+def getRepositoryInfo(recordCount: int, addTimestamp: int) -> str:
+    data = bytes([0x51, *recordCount.to_bytes(2, 'little'), 0xff, 0xff, *addTimestamp.to_bytes(4, 'little'), 0, 0, 0, 0, 0x02])
+    return ' ' + ' '.join(f'{byte:02x}' for byte in data) + '\n'
+
+class FakeBmc:
+    '''
+        answers Get SDR Repository Info and writes `sdr dump` files named after the BMC
+    '''
+    def __init__(self, name: str, recordCount: int=10, addTimestamp: int=1) -> None:
+        self.name = name
+        self.info = getRepositoryInfo(recordCount, addTimestamp)
+        self.dumps = 0
+
+    def rawCommand(self, netfn, cmd, *data):
+        return self.info, ''
+
+    def generalCommand(self, cmdType, *args):
+        self.dumps += 1
+        with open(args[-1], 'w') as f:
+            f.write(self.name)
+        return '', ''
+
+def getSdrCache(tmp_path, ip: str, port: int=None) -> SdrCache:
+    return SdrCache(getHostDirName(DotDict({"ip": ip, "port": port})), cacheDir=str(tmp_path))
+
+def testParseSdrRepositoryInfo():
+    info = parseSdrRepositoryInfo(getRepositoryInfo(300, 0x12345678))
+    assert (info.recordCount, info.addTimestamp, info.eraseTimestamp) == (300, 0x12345678, 0)
+
+def testDumpIsReusedUntilTheRepositoryChanges(tmp_path):
+    bmc = FakeBmc('bmc')
+    assert getSdrCache(tmp_path, '10.0.0.1').prepare(bmc.rawCommand, bmc.generalCommand) is not None
+    assert getSdrCache(tmp_path, '10.0.0.1', 623).prepare(bmc.rawCommand, bmc.generalCommand) is not None
+    assert bmc.dumps == 1
+
+    bmc.info = getRepositoryInfo(11, 2)
+    getSdrCache(tmp_path, '10.0.0.1').prepare(bmc.rawCommand, bmc.generalCommand)
+    assert bmc.dumps == 2
+
+def testBmcsSharingAnIpKeepTheirOwnDump(tmp_path):
+    first, second = FakeBmc('first'), FakeBmc('second')
+
+    firstPath = getSdrCache(tmp_path, '10.0.0.1', 6230).prepare(first.rawCommand, first.generalCommand)
+    secondPath = getSdrCache(tmp_path, '10.0.0.1', 6231).prepare(second.rawCommand, second.generalCommand)
+    assert firstPath != secondPath
+    assert open(firstPath).read() == 'first'
+    assert open(secondPath).read() == 'second'
+    assert (first.dumps, second.dumps) == (1, 1)
@@ -0,0 +1,40 @@
+import time
+
+from backends.asyncEngine import AsyncCommandEngine
+from timing import TimingRecorder
+
+class SleepyBackend:
+    '''
+        answers every request after `seconds`, batches are sent one request after the other
+    '''
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+
+    def rawCommandBatch(self, requests):
+        time.sleep(self.seconds * len(requests))
+        return [('00', '') for _ in requests]
+
+    def close(self) -> None:
+        pass
+
+def testAsyncEngineTimesEachBatch():
+    engine = AsyncCommandEngine(lambda: SleepyBackend(0.02), concurrency=4)
+    batches = []
+    requests = [('0x06', '0x01', f'0x{i:02x}') for i in range(16)]
+
+    responses = engine.rawCommands(requests, batchSize=2, onBatch=lambda batch, responses, elapsed: batches.append((batch, responses, elapsed)))
+    assert responses == [('00', '')] * 16
+    assert sorted(request for batch, _, _ in batches for request in batch) == requests
+    # each batch takes 2 x 20 ms whatever the concurrency, not the wall time of the whole run x 4
+    assert all(0.035 < elapsed < 0.1 for _, _, elapsed in batches)
+
+def testBatchLatenciesAreLabelledAsAverages():
+    recorder = TimingRecorder({(0x06, 0x01): 'Get Device ID'})
+    recorder.recordRequests([('0x06', '0x01')] * 4, 0.04, 'OOB/subprocess/async')
+    recorder.recordRequests([('0x06', '0x01')], 0.02, 'OOB/subprocess/async')
+    recorder.recordRequests([('0x06', '0x01')] * 2, 0, 'OOB/subprocess/async', cached=True)
+
+    entry, = recorder.getSummary()
+    assert (entry.command, entry.count, entry.cached, entry.averaged) == ('Get Device ID', 5, 2, 4)
+    assert entry.maxMs == 20
+    assert recorder.getSheetRows()[1][5:8] == [5, 2, 4]
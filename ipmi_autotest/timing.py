@@ -0,0 +1,164 @@
+import json
+import time
+import threading
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+
+from defs.dotDict import DotDict
+
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]     # upper bounds of the histogram buckets
+TIMING_COLUMNS = [
+    'Phase', 'Transport', 'NetFn', 'CMD', 'Command', 'Count', 'Cached', 'Batch Averages',
+    'Total (s)', 'Mean (ms)', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Max (ms)'
+]
+
+class LatencySample(NamedTuple):
+    phase: str
+    transport: str          # e.g. 'OOB/subprocess', 'OOB/subprocess/async'
+    netfn: str              # None for ipmitool subcommands (power status, sensor list, ...)
+    cmd: str
+    command: str            # function name of the test plan, or the ipmitool subcommand
+    latencyMs: float
+    cached: bool
+    averaged: bool          # sent in a batch, latencyMs is the measured batch time / batch size
+
+class TimingRecorder:
+    '''
+        Collects the latency of every BMC call of a run, tagged with NetFn/CMD, transport and test phase,
+        and aggregates them into p50/p95/p99 and histograms per command (the 'Timing' sheet and <output>.timing.json).
+
+        Latencies come from time.perf_counter(). Requests sent as one batch (rawCommandBatch, each batch of the async engine)
+        cannot be timed one by one, each gets the average of its batch and is counted under 'Batch Averages',
+        the percentiles of a command sent in batches are percentiles of those averages.
+    '''
+    def __init__(self, functionNames: Dict[Tuple[int, int], str]=None) -> None:
+        '''
+            functionNames: {(netfn, cmd): function name} of the test plan, to label raw commands
+        '''
+        self.functionNames = functionNames or {}
+        self.samples: List[LatencySample] = []
+        self.phaseSeconds: Dict[str, float] = {}
+        self.currentPhase = 'setup'
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        '''
+            tags the calls made inside with the phase name and adds its wall time, phases may nest (e.g. availability inside function)
+        '''
+        previous, self.currentPhase = self.currentPhase, name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.__lock:
+                self.phaseSeconds[name] = self.phaseSeconds.get(name, 0) + elapsed
+            self.currentPhase = previous
+
+    def __getCommand(self, netfn: str, cmd: str) -> Tuple[str, str, str]:
+        '''
+            (netfn, cmd, function name) with NetFn/CMD written as 0x0a, so '0x2D' and '0x2d' are aggregated together
+        '''
+        try:
+            netfn, cmd = int(str(netfn), 0), int(str(cmd), 0)
+        except ValueError:
+            return netfn, cmd, f'{netfn} {cmd}'
+        return f'0x{netfn:02x}', f'0x{cmd:02x}', self.functionNames.get((netfn, cmd), f'0x{netfn:02x} 0x{cmd:02x}')
+
+    def recordRequests(
+        self,
+        requests: List[Tuple[str]],
+        elapsed: float,
+        transport: str,
+        cached: bool=False
+    ) -> None:
+        '''
+            requests: raw requests [(netfn, cmd, *data)] sent together, elapsed: seconds taken by the whole batch
+        '''
+        if not requests:
+            return
+        latency = elapsed * 1000 / len(requests)
+        averaged = not cached and len(requests) > 1
+        samples = [
+            LatencySample(self.currentPhase, transport, *self.__getCommand(netfn, cmd), latency, cached, averaged)
+            for netfn, cmd, *_ in requests
+        ]
+        with self.__lock:
+            self.samples += samples
+
+    def recordCommand(
+        self,
+        cmdType: str,
+        args: Tuple[str],
+        elapsed: float,
+        transport: str
+    ) -> None:
+        '''
+            ipmitool subcommands, tagged by their first two words (e.g. 'sensor list', 'power status')
+        '''
+        command = ' '.join(str(arg) for arg in (cmdType, *args[:1]))
+        with self.__lock:
+            self.samples.append(LatencySample(self.currentPhase, transport, None, None, command, elapsed * 1000, False, False))
+
+    def getSummary(self) -> List[DotDict]:
+        '''
+            one entry per (phase, transport, NetFn, CMD, command), slowest total first
+        '''
+        with self.__lock:
+            samples = list(self.samples)
+
+        groups: Dict[Tuple, List[LatencySample]] = {}
+        for sample in samples:
+            groups.setdefault((sample.phase, sample.transport, sample.netfn, sample.cmd, sample.command), []).append(sample)
+
+        summary = []
+        for (phase, transport, netfn, cmd, command), group in groups.items():
+            latencies = np.array([sample.latencyMs for sample in group if not sample.cached])
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies.size else (0, 0, 0)
+            counts = np.histogram(latencies, bins=[0, *LATENCY_BUCKETS_MS, np.inf])[0].tolist()
+            histogram = {f'<={bound}ms': count for bound, count in zip(LATENCY_BUCKETS_MS, counts)}
+            histogram[f'>{LATENCY_BUCKETS_MS[-1]}ms'] = counts[-1]
+            summary.append(DotDict({
+                "phase": phase,
+                "transport": transport,
+                "netfn": netfn,
+                "cmd": cmd,
+                "command": command,
+                "count": int(latencies.size),
+                "cached": len(group) - int(latencies.size),
+                "averaged": sum(sample.averaged for sample in group),
+                "totalSeconds": round(float(latencies.sum()) / 1000, 3),
+                "meanMs": round(float(latencies.mean()), 3) if latencies.size else 0,
+                "p50Ms": round(float(p50), 3),
+                "p95Ms": round(float(p95), 3),
+                "p99Ms": round(float(p99), 3),
+                "maxMs": round(float(latencies.max()), 3) if latencies.size else 0,
+                "histogram": histogram
+            }))
+        return sorted(summary, key=lambda entry: entry.totalSeconds, reverse=True)
+
+    def getSheetRows(self, summary: List[DotDict]=None) -> List[List[Any]]:
+        summary = summary if summary is not None else self.getSummary()
+        rows = [TIMING_COLUMNS]
+        for entry in summary:
+            rows.append([
+                entry.phase, entry.transport, entry.netfn, entry.cmd, entry.command, entry.count, entry.cached, entry.averaged,
+                entry.totalSeconds, entry.meanMs, entry.p50Ms, entry.p95Ms, entry.p99Ms, entry.maxMs
+            ])
+        rows.append([])
+        rows.append(['Phase', 'Wall Time (s)'])
+        rows += [[phase, round(seconds, 3)] for phase, seconds in self.phaseSeconds.items()]
+        return rows
+
+    def save(self, path: str, summary: List[DotDict]=None) -> None:
+        summary = summary if summary is not None else self.getSummary()
+        with open(path, 'w') as f:
+            json.dump({
+                "phases": {phase: round(seconds, 3) for phase, seconds in self.phaseSeconds.items()},
+                "histogramBucketsMs": LATENCY_BUCKETS_MS,
+                "commands": summary
+            }, f, indent=4)